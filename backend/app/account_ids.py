@@ -0,0 +1,80 @@
+"""
+Canonical AWS account IDs.
+
+Account IDs are 12 digits, but exports routinely mangle them: spreadsheets drop leading
+zeros (89678062621) or switch to scientific notation (1.20594E+11). The canonical form is
+the zero-padded 12-digit string. database_records carries it in a stored generated column,
+account_id_norm, so filters compare it with an index instead of matching substrings of the
+raw value; the small aws_accounts table applies the same expression when it is joined.
+"""
+import re
+from typing import Callable, Dict, List, Optional
+
+# Any ARN carries the owning account: arn:partition:service:region:account-id:resource
+ARN_ACCOUNT = re.compile(r"arn:aws[\w-]*:[\w-]*:[\w-]*:(\d{12}):")
+
+# Generation expression for account_id_norm columns (applied to the raw ID column)
+ACCOUNT_ID_NORM_SQL = "CASE WHEN {column} ~ '^[0-9]{{1,12}}$' THEN lpad({column}, 12, '0') END"
+
+
+def normalize_account_id(value: Optional[str]) -> Optional[str]:
+    """The 12-digit form of a plain numeric account ID; None for anything else."""
+    text = (value or "").strip()
+    if text.isdigit() and len(text) <= 12:
+        return text.zfill(12)
+    return None
+
+
+def recover_account_id(raw: str, *texts: Optional[str]) -> str:
+    """
+    Return the 12-digit account ID for a row.
+
+    The exact ID of a value in scientific notation is recovered from an ARN elsewhere in the
+    row (instance profile, KMS key, CloudFormation tags) when one agrees with it; otherwise
+    the value is zero-padded if it is a plain number, or kept as given.
+    """
+    raw = raw.strip()
+    if raw.isdigit():
+        return raw.zfill(12)
+    try:
+        approximate = float(raw)
+    except ValueError:
+        return raw
+    mantissa = raw.upper().split("E")[0].replace(".", "").lstrip("-")
+    digits = len(mantissa.lstrip("0")) or 1
+    for text in texts:
+        for candidate in ARN_ACCOUNT.findall(text or ""):
+            if float(f"{int(candidate):.{digits - 1}e}") == approximate:
+                return candidate
+    return raw
+
+
+def account_ids_by_name(account_names: Dict[str, str]) -> Dict[str, List[str]]:
+    """Reverse of an account_id -> friendly name map: lower-cased name -> canonical IDs."""
+    ids: Dict[str, List[str]] = {}
+    for account_id, name in account_names.items():
+        canonical = normalize_account_id(account_id) or account_id
+        ids.setdefault(name.lower(), []).append(canonical)
+    return ids
+
+
+def subscription_predicate(subscription: str, ids_by_name: Dict[str, List[str]]) -> Callable[[Optional[str]], bool]:
+    """
+    Python form of the subscription filter, for values of a subscription column: a friendly
+    account name or an account ID matches the canonical IDs exactly; any other text (Azure
+    subscription names and IDs) matches as a case-insensitive substring.
+    """
+    ids = account_ids(subscription, ids_by_name)
+    if ids is not None:
+        wanted = set(ids)
+        return lambda value: normalize_account_id(value) in wanted
+    text = subscription.lower()
+    return lambda value: value is not None and text in value.lower()
+
+
+def account_ids(subscription: str, ids_by_name: Dict[str, List[str]]) -> Optional[List[str]]:
+    """Canonical IDs a subscription filter value stands for, or None if it is not an AWS account."""
+    if subscription.lower() in ids_by_name:
+        return ids_by_name[subscription.lower()]
+    canonical = normalize_account_id(subscription)
+    return [canonical] if canonical else None
@@ -1,32 +1,38 @@
 import csv
-from typing import List, IO
+from typing import Iterator, List, IO
+from .compression import open_decompressed
 from .schemas import AWSAccountCreate
 
 
+def _decode_lines(raw: IO[bytes]) -> Iterator[str]:
+    """Decode a binary stream line by line, falling back through common export encodings."""
+    for number, raw_line in enumerate(raw):
+        # Try different encodings
+        for encoding in ['utf-8', 'latin-1', 'cp1252']:
+            try:
+                line = raw_line.decode(encoding)
+                break
+            except UnicodeDecodeError:
+                continue
+        else:
+            # If all encodings fail, use utf-8 with error handling
+            line = raw_line.decode('utf-8', errors='replace')
+        if number == 0 and line.startswith('\ufeff'):
+            line = line[1:]
+        yield line
+
+
 def parse_aws_account_csv(file: IO) -> List[AWSAccountCreate]:
     """
     Parse AWS Account Inventory CSV file and return list of AWSAccountCreate objects.
+    The upload may be gzip/bz2/zstd compressed; it is decompressed and decoded incrementally.
     
     Expected CSV format:
     #,AccountID,Account Alias(Friendly Name),BusinessUnit,Owner,Account Type(Data Type),Account Type(Function),Comments
     """
     accounts = []
     
-    # Try different encodings
-    raw_content = file.read()
-    for encoding in ['utf-8', 'latin-1', 'cp1252']:
-        try:
-            content = raw_content.decode(encoding)
-            break
-        except UnicodeDecodeError:
-            continue
-    else:
-        # If all encodings fail, use utf-8 with error handling
-        content = raw_content.decode('utf-8', errors='replace')
-    
-    lines = content.splitlines()
-    
-    reader = csv.DictReader(lines)
+    reader = csv.DictReader(_decode_lines(open_decompressed(file)))
     
     for row in reader:
         # Skip empty rows
@@ -1,10 +1,19 @@
 from sqlalchemy.orm import Session
 from sqlalchemy import func
 from typing import List, Optional, Dict
+from .account_ids import account_ids_by_name
+from .generation import GenerationCache, bump_generation
 from .aws_account_models import AWSAccountModel
 from .schemas import AWSAccountCreate
 
 
+def _load_account_ids_by_name(db: Session) -> Dict[str, List[str]]:
+    return account_ids_by_name(AWSAccountStore(db).get_account_names_map())
+
+
+_account_ids_by_name = GenerationCache(_load_account_ids_by_name)
+
+
 class AWSAccountStore:
     def __init__(self, db: Session):
         self.db = db
@@ -13,6 +22,7 @@ class AWSAccountStore:
         """Create a new AWS account record"""
         db_account = AWSAccountModel(**account.model_dump())
         self.db.add(db_account)
+        bump_generation(self.db)
         self.db.commit()
         self.db.refresh(db_account)
         return db_account
@@ -21,6 +31,7 @@ class AWSAccountStore:
         """Bulk create AWS account records"""
         db_accounts = [AWSAccountModel(**account.model_dump()) for account in accounts]
         self.db.bulk_save_objects(db_accounts)
+        bump_generation(self.db)
         self.db.commit()
         return len(db_accounts)
 
@@ -33,6 +44,7 @@ class AWSAccountStore:
         if existing:
             for key, value in account.model_dump().items():
                 setattr(existing, key, value)
+            bump_generation(self.db)
             self.db.commit()
             self.db.refresh(existing)
             return existing
@@ -65,11 +77,16 @@ class AWSAccountStore:
         ).all()
         return {account.account_id: account.account_name for account in accounts}
 
+    def get_account_ids_by_name(self) -> Dict[str, List[str]]:
+        """Lower-cased friendly name -> canonical account IDs, rebuilt when accounts change."""
+        return _account_ids_by_name.get(self.db)
+
     def delete(self, account_id: str) -> bool:
         """Delete an AWS account record"""
         account = self.get_by_account_id(account_id)
         if account:
             self.db.delete(account)
+            bump_generation(self.db)
             self.db.commit()
             return True
         return False
@@ -0,0 +1,189 @@
+"""Batch import of many database CSV exports (loose files or a .zip/.tar.gz archive)."""
+import csv
+import io
+import os
+import tarfile
+import zipfile
+from collections import deque
+from concurrent.futures import Future, ProcessPoolExecutor
+from typing import IO, Any, Deque, Dict, Iterator, List, Optional, Tuple
+
+from sqlalchemy.orm import Session
+
+from .compression import UnsupportedCompression, open_text
+from .csv_parser import infer_provider, iter_csv_rows
+from .schemas import DatabaseProvider
+from .store import InventoryStore
+
+# Worker processes used for parsing; parsing is pure-Python CPU work so threads would serialize on the GIL
+IMPORT_WORKERS = int(os.getenv("IMPORT_WORKERS", "0")) or os.cpu_count() or 1
+
+# Members submitted to the pool but not yet collected; bounds the raw bytes and decoded text held at once
+IMPORT_IN_FLIGHT = 2 * IMPORT_WORKERS
+
+_pool: Optional[ProcessPoolExecutor] = None
+
+
+def get_pool() -> ProcessPoolExecutor:
+    """Return the shared parser pool, creating it on first use."""
+    global _pool
+    if _pool is None:
+        _pool = ProcessPoolExecutor(max_workers=IMPORT_WORKERS)
+    return _pool
+
+
+def shutdown_pool() -> None:
+    """Stop the parser pool (called from the application lifespan)."""
+    global _pool
+    if _pool is not None:
+        _pool.shutdown(cancel_futures=True)
+        _pool = None
+
+
+CSV_SUFFIXES = (".csv", ".csv.gz", ".csv.bz2", ".csv.zst")
+
+
+def _is_csv_member(name: str) -> bool:
+    base = os.path.basename(name)
+    return name.lower().endswith(CSV_SUFFIXES) and not base.startswith(".") and "__MACOSX" not in name
+
+
+def iter_upload_members(filename: str, fileobj: IO[bytes]) -> Iterator[Tuple[str, bytes]]:
+    """
+    Yield (member_name, raw_bytes) for every CSV inside an upload.
+    Archives are expanded one member at a time; tarballs are read in streaming mode
+    so the archive itself is never held in memory.
+    """
+    lower = (filename or "").lower()
+    if lower.endswith(".zip"):
+        with zipfile.ZipFile(fileobj) as archive:
+            for info in archive.infolist():
+                if info.is_dir() or not _is_csv_member(info.filename):
+                    continue
+                with archive.open(info) as member:
+                    yield info.filename, member.read()
+    elif lower.endswith((".tar.gz", ".tgz", ".tar")):
+        mode = "r|" if lower.endswith(".tar") else "r|gz"
+        with tarfile.open(fileobj=fileobj, mode=mode) as archive:
+            for info in archive:
+                if not info.isfile() or not _is_csv_member(info.name):
+                    continue
+                member = archive.extractfile(info)
+                if member is not None:
+                    yield info.name, member.read()
+    else:
+        yield filename or "upload.csv", fileobj.read()
+
+
+def parse_member(name: str, content: bytes, provider_hint: Optional[str]) -> Dict[str, Any]:
+    """
+    Parse a single CSV export. Runs inside a worker process, so it only takes and
+    returns picklable values.
+    """
+    try:
+        # Members may themselves be compressed (e.g. account.csv.gz inside a zip)
+        text = open_text(io.BytesIO(content)).read()
+    except UnicodeDecodeError as e:
+        return {"file": name, "error": f"Invalid file encoding. Please use UTF-8. Error: {e}"}
+    except (OSError, EOFError, UnsupportedCompression) as e:
+        return {"file": name, "error": f"Failed to decompress file. Error: {e}"}
+
+    if provider_hint in ("AWS", "Azure"):
+        provider = DatabaseProvider(provider_hint)
+    else:
+        header = next(csv.reader(io.StringIO(text)), [])
+        provider = infer_provider(header)
+        if provider is None:
+            return {"file": name, "error": "Could not infer provider from CSV header; pass provider=AWS or provider=Azure"}
+
+    # Rows are plain tuples, which keeps pickling back to the parent process cheap;
+    # only per-reason counts of skipped rows are returned
+    records = []
+    skipped = 0
+    skipped_by_reason: Dict[str, int] = {}
+    for _, row, skip in iter_csv_rows(text, provider):
+        if row is not None:
+            records.append(row)
+            continue
+        skipped += 1
+        reason = skip["reason"].split("\n", 1)[0]
+        skipped_by_reason[reason] = skipped_by_reason.get(reason, 0) + 1
+    return {
+        "file": name,
+        "provider": provider.value,
+        "records": records,
+        "skipped": skipped,
+        "skipped_by_reason": skipped_by_reason,
+    }
+
+
+def run_batch_import(members: Iterator[Tuple[str, bytes]], provider_hint: Optional[str], db: Session) -> Dict[str, Any]:
+    """
+    Parse all members concurrently, then write each provider's records in a single
+    transaction. Returns a per-file report plus totals.
+    """
+    pool = get_pool()
+    pending: Deque[Tuple[str, Future]] = deque()
+    results: List[Dict[str, Any]] = []
+
+    def collect() -> None:
+        name, future = pending.popleft()
+        try:
+            results.append(future.result())
+        except Exception as e:
+            results.append({"file": name, "error": f"Failed to parse CSV file. Error: {e}"})
+
+    # Submit while still reading the upload so decompression overlaps with parsing, but only
+    # IMPORT_IN_FLIGHT members at a time: the oldest is collected before reading another
+    for name, content in members:
+        if len(pending) >= IMPORT_IN_FLIGHT:
+            collect()
+        pending.append((name, pool.submit(parse_member, name, content, provider_hint)))
+    while pending:
+        collect()
+
+    by_provider: Dict[str, List[Dict[str, Any]]] = {}
+    for result in results:
+        result["parsed"] = len(result.get("records", []))
+        if "error" not in result:
+            by_provider.setdefault(result["provider"], []).append(result)
+
+    store = InventoryStore(db)
+    for provider, provider_results in by_provider.items():
+        try:
+            for result in provider_results:
+                created, duplicates = store.bulk_create_rows(result["records"], commit=False)
+                result["created"] = created
+                result["duplicates"] = len(duplicates)
+                # Written; only the counts are reported
+                del result["records"]
+            db.commit()
+        except Exception as e:
+            db.rollback()
+            print(f"Batch import save error for {provider}: {e}")
+            for result in provider_results:
+                result.pop("created", None)
+                result.pop("duplicates", None)
+                result["error"] = f"Failed to save {provider} records; no {provider} file was imported. Error: {e}"
+
+    files = []
+    for result in results:
+        files.append({
+            "file": result["file"],
+            "provider": result.get("provider"),
+            "parsed": result["parsed"],
+            "created": result.get("created", 0),
+            "duplicates": result.get("duplicates", 0),
+            "skipped": result.get("skipped", 0),
+            "skipped_by_reason": result.get("skipped_by_reason", {}),
+            "error": result.get("error"),
+        })
+
+    return {
+        "message": f"Processed {len(files)} files",
+        "files": files,
+        "created": sum(f["created"] for f in files),
+        "duplicates": sum(f["duplicates"] for f in files),
+        "skipped": sum(f["skipped"] for f in files),
+        "failed": sum(1 for f in files if f["error"]),
+    }
@@ -0,0 +1,156 @@
+"""COPY-based bulk write path used for large offline loads."""
+import io
+import json
+import uuid
+from datetime import datetime
+from enum import Enum
+from typing import Any, Iterable, List, Sequence, Tuple
+
+from sqlalchemy.orm import Session
+
+from .schemas import AzureVMCreate, DatabaseRow, EC2InstanceCreate
+from .vm_csv_parser import ip_address
+
+DATABASE_RECORD_COLUMNS = ("id",) + DatabaseRow._fields
+
+AZURE_VM_COLUMNS = (
+    "id", "computer_name", "private_ip_address", "subscription", "resource_group", "location",
+    "vm_size", "os_type", "os_name", "os_version", "os_disk_size", "data_disk_count",
+    "total_disk_size_gb", "display_status", "time_created", "tenant_id", "private_ip",
+)
+
+EC2_INSTANCE_COLUMNS = ("id",) + tuple(EC2InstanceCreate.model_fields)
+
+
+def database_record_row(row: DatabaseRow) -> Tuple[Any, ...]:
+    """Prefix a parsed row with a fresh id, giving DATABASE_RECORD_COLUMNS order."""
+    return (str(uuid.uuid4()),) + row
+
+
+def azure_vm_row(vm: AzureVMCreate) -> Tuple[Any, ...]:
+    """Flatten a parsed VM into AZURE_VM_COLUMNS order with a fresh id."""
+    data = vm.model_dump()
+    data["id"] = str(uuid.uuid4())
+    data["private_ip"] = ip_address(vm.private_ip_address)
+    return tuple(data[column] for column in AZURE_VM_COLUMNS)
+
+
+def ec2_instance_row(instance: EC2InstanceCreate) -> Tuple[Any, ...]:
+    """Flatten a parsed EC2 instance into EC2_INSTANCE_COLUMNS order with a fresh id."""
+    return (str(uuid.uuid4()),) + tuple(getattr(instance, column) for column in EC2_INSTANCE_COLUMNS[1:])
+
+
+def _quote(text: str) -> str:
+    return '"' + text.replace('"', '""') + '"'
+
+
+def _array_literal(values: Sequence[Any]) -> str:
+    items = []
+    for value in values:
+        text = str(value).replace("\\", "\\\\").replace('"', '\\"')
+        items.append(f'"{text}"')
+    return "{" + ",".join(items) + "}"
+
+
+def _copy_field(value: Any) -> str:
+    # Unquoted empty is NULL in COPY CSV format; everything else is quoted so "" stays an empty string
+    if value is None:
+        return ""
+    if type(value) is str:
+        # Most fields; checked first since this runs once per column of every loaded row
+        return _quote(value)
+    if isinstance(value, Enum):
+        value = value.value
+    if isinstance(value, bool):
+        return "true" if value else "false"
+    if isinstance(value, (int, float)):
+        return str(value)
+    if isinstance(value, datetime):
+        return _quote(value.isoformat())
+    if isinstance(value, (list, tuple)):
+        return _quote(_array_literal(value))
+    if isinstance(value, dict):
+        return _quote(json.dumps(value))
+    return _quote(str(value))
+
+
+def _copy_buffer(rows: Iterable[Sequence[Any]]) -> Tuple[io.StringIO, int]:
+    buffer = io.StringIO()
+    count = 0
+    for row in rows:
+        buffer.write(",".join(_copy_field(value) for value in row))
+        buffer.write("\n")
+        count += 1
+    buffer.seek(0)
+    return buffer, count
+
+
+def copy_rows(db: Session, table: str, columns: Sequence[str], rows: Iterable[Sequence[Any]]) -> int:
+    """
+    Stream rows into table with COPY FROM STDIN inside the session's current transaction.
+    Returns the number of rows copied; the caller commits.
+    """
+    buffer, count = _copy_buffer(rows)
+    if not count:
+        return 0
+    cursor = db.connection().connection.cursor()
+    try:
+        cursor.copy_expert(
+            f"COPY {table} ({', '.join(columns)}) FROM STDIN WITH (FORMAT csv)",
+            buffer,
+        )
+    finally:
+        cursor.close()
+    return count
+
+
+def copy_rows_ignore_conflicts(
+    db: Session, table: str, columns: Sequence[str], rows: Iterable[Sequence[Any]]
+) -> Tuple[int, List[Any]]:
+    """
+    COPY rows into a temporary staging table, then move them into table with
+    ON CONFLICT DO NOTHING so unique-constraint duplicates are skipped instead of aborting the load.
+    Returns (rows_copied, values of the first column for the rows actually inserted).
+    """
+    staging = f"_bulk_{table}"
+    db.connection().exec_driver_sql(
+        f"CREATE TEMP TABLE IF NOT EXISTS {staging} (LIKE {table} INCLUDING DEFAULTS) ON COMMIT DELETE ROWS"
+    )
+    copied = copy_rows(db, staging, columns, rows)
+    if not copied:
+        return 0, []
+    column_list = ", ".join(columns)
+    inserted = db.connection().exec_driver_sql(
+        f"INSERT INTO {table} ({column_list}) SELECT {column_list} FROM {staging} "
+        f"ON CONFLICT DO NOTHING RETURNING {columns[0]}"
+    ).scalars().all()
+    db.connection().exec_driver_sql(f"TRUNCATE {staging}")
+    return copied, inserted
+
+
+
+def copy_rows_upsert(
+    db: Session, table: str, columns: Sequence[str], rows: Iterable[Sequence[Any]], key: str
+) -> int:
+    """
+    COPY rows into a temporary staging table, then insert them into table, updating every
+    column but id on rows whose key already exists. Later rows win when key repeats within
+    one call. Returns the number of rows inserted or updated; the caller commits.
+    """
+    staging = f"_bulk_{table}"
+    db.connection().exec_driver_sql(
+        f"CREATE TEMP TABLE IF NOT EXISTS {staging} (LIKE {table} INCLUDING DEFAULTS) ON COMMIT DELETE ROWS"
+    )
+    copied = copy_rows(db, staging, columns, rows)
+    if not copied:
+        return 0
+    column_list = ", ".join(columns)
+    updates = ", ".join(f"{column} = EXCLUDED.{column}" for column in columns if column not in ("id", key))
+    # ON CONFLICT cannot touch the same row twice in one statement, so keep the last staged row per key
+    written = db.connection().exec_driver_sql(
+        f"INSERT INTO {table} ({column_list}) "
+        f"SELECT DISTINCT ON ({key}) {column_list} FROM {staging} ORDER BY {key}, ctid DESC "
+        f"ON CONFLICT ({key}) DO UPDATE SET {updates}"
+    ).rowcount
+    db.connection().exec_driver_sql(f"TRUNCATE {staging}")
+    return written
@@ -0,0 +1,265 @@
+"""
+Command-line tools for loading large inventory exports straight into PostgreSQL,
+bypassing the HTTP upload path (no request timeouts or body-size limits).
+
+Usage (from the backend directory):
+    python -m app.cli load exports/rds_all_accounts.csv.gz --kind databases --provider auto
+    python -m app.cli load exports/vms.csv --kind azure-vms
+    python -m app.cli load ec2_inventory_all_accounts.csv --kind ec2-instances
+    python -m app.cli load AWS_Account_Inventory.csv --kind aws-accounts
+
+Files may be plain or gzip/bz2/zstd compressed. Database, VM and EC2 loads are committed
+in batches through COPY; after every batch a checkpoint file records the last committed
+CSV row, so re-running the same command after a failure resumes where it stopped.
+Skipped rows are written as NDJSON to a report file next to the input.
+"""
+import argparse
+import csv
+import itertools
+import json
+import os
+import sys
+import time
+from typing import IO, Any, Dict, List, Optional
+
+from .aws_account_parser import parse_aws_account_csv
+from .aws_account_store import AWSAccountStore
+from .bulk_load import (
+    AZURE_VM_COLUMNS,
+    DATABASE_RECORD_COLUMNS,
+    EC2_INSTANCE_COLUMNS,
+    azure_vm_row,
+    copy_rows,
+    copy_rows_ignore_conflicts,
+    copy_rows_upsert,
+    database_record_row,
+    ec2_instance_row,
+)
+from .compression import open_text
+from .csv_parser import infer_provider, iter_csv_rows
+from .database import SessionLocal, init_db
+from .ec2_csv_parser import iter_ec2_csv
+from .generation import bump_generation
+from .schemas import DatabaseProvider
+from .vm_csv_parser import iter_azure_vm_csv
+# Import models to register them with SQLAlchemy Base, so init_db creates their tables
+from .ec2_models import EC2InstanceModel
+from .vm_models import AzureVMModel
+
+
+class Progress:
+    """Single-line progress bar on stderr showing bytes read, rows and throughput."""
+
+    def __init__(self, total_bytes: int, enabled: bool = True, stream: IO[str] = sys.stderr):
+        self.total_bytes = max(total_bytes, 1)
+        self.enabled = enabled
+        self.stream = stream
+        self.started = time.monotonic()
+        self._last_draw = 0.0
+
+    def update(self, bytes_read: int, rows: int, force: bool = False) -> None:
+        if not self.enabled:
+            return
+        now = time.monotonic()
+        if not force and now - self._last_draw < 0.5:
+            return
+        self._last_draw = now
+        fraction = min(bytes_read / self.total_bytes, 1.0)
+        filled = int(fraction * 30)
+        elapsed = max(now - self.started, 1e-6)
+        self.stream.write(
+            f"\r[{'#' * filled}{'.' * (30 - filled)}] {fraction * 100:5.1f}% "
+            f"{rows:,} rows {rows / elapsed:,.0f} rows/s"
+        )
+        self.stream.flush()
+
+    def finish(self, bytes_read: int, rows: int) -> None:
+        self.update(bytes_read, rows, force=True)
+        if self.enabled:
+            self.stream.write("\n")
+
+
+class Checkpoint:
+    """JSON file recording the last CSV row committed for a given source file."""
+
+    def __init__(self, path: str, source: str):
+        self.path = path
+        stat = os.stat(source)
+        self.identity = {"source": os.path.abspath(source), "size": stat.st_size, "mtime": int(stat.st_mtime)}
+
+    def load(self) -> int:
+        """Return the last committed row number, or 0 when starting fresh."""
+        if not os.path.exists(self.path):
+            return 0
+        with open(self.path) as f:
+            state = json.load(f)
+        if any(state.get(key) != value for key, value in self.identity.items()):
+            raise SystemExit(
+                f"Checkpoint {self.path} belongs to a different version of the input file; "
+                f"re-run with --restart to load from the beginning"
+            )
+        return int(state.get("row", 0))
+
+    def save(self, row: int) -> None:
+        tmp_path = self.path + ".tmp"
+        with open(tmp_path, "w") as f:
+            json.dump({**self.identity, "row": row}, f)
+        os.replace(tmp_path, self.path)
+
+    def clear(self) -> None:
+        if os.path.exists(self.path):
+            os.remove(self.path)
+
+
+def _load_rows(args: argparse.Namespace, raw: IO[bytes], rows, to_tuple, write_batch) -> Dict[str, Any]:
+    """Shared batching/checkpoint loop for the databases, azure-vms and ec2-instances loads."""
+    checkpoint = Checkpoint(args.checkpoint, args.path)
+    if args.restart:
+        checkpoint.clear()
+    resume_row = checkpoint.load()
+    if resume_row:
+        print(f"Resuming after row {resume_row:,}", file=sys.stderr)
+
+    progress = Progress(os.path.getsize(args.path), enabled=not args.quiet)
+    totals = {"rows": 0, "loaded": 0, "duplicates": 0, "skipped": 0}
+    batch: List[tuple] = []
+    pending_skips: List[Dict[str, Any]] = []
+    last_row = resume_row
+
+    with open(args.skipped_report, "a" if resume_row else "w") as report:
+        db = SessionLocal()
+        try:
+            def flush() -> None:
+                copied, inserted = write_batch(db, batch)
+                if inserted:
+                    bump_generation(db)
+                db.commit()
+                # Skips are only reported once the rows around them are committed, so resuming never repeats them
+                for skip in pending_skips:
+                    report.write(json.dumps(skip, default=str) + "\n")
+                report.flush()
+                checkpoint.save(last_row)
+                totals["loaded"] += inserted
+                totals["duplicates"] += copied - inserted
+                totals["skipped"] += len(pending_skips)
+                batch.clear()
+                pending_skips.clear()
+
+            for row_number, record, skip in rows:
+                if row_number <= resume_row:
+                    continue
+                last_row = row_number
+                totals["rows"] += 1
+                if record is not None:
+                    batch.append(to_tuple(record))
+                else:
+                    pending_skips.append(skip)
+                if len(batch) >= args.batch_size:
+                    flush()
+                progress.update(raw.tell(), totals["rows"])
+            flush()
+        finally:
+            db.close()
+
+    progress.finish(raw.tell(), totals["rows"])
+    checkpoint.clear()
+    totals["skipped_report"] = args.skipped_report
+    return totals
+
+
+def load_databases(args: argparse.Namespace, raw: IO[bytes]) -> Dict[str, Any]:
+    text = open_text(raw)
+    header = text.readline()
+    if args.provider == "auto":
+        provider = infer_provider(next(csv.reader([header]), []))
+        if provider is None:
+            raise SystemExit("Could not infer provider from CSV header; pass --provider AWS or --provider Azure")
+    else:
+        provider = DatabaseProvider(args.provider)
+
+    rows = iter_csv_rows(itertools.chain([header], text), provider)
+
+    def write_batch(db, batch):
+        copied, inserted = copy_rows_ignore_conflicts(db, "database_records", DATABASE_RECORD_COLUMNS, batch)
+        return copied, len(inserted)
+
+    totals = _load_rows(args, raw, rows, database_record_row, write_batch)
+    totals["provider"] = provider.value
+    return totals
+
+
+def load_azure_vms(args: argparse.Namespace, raw: IO[bytes]) -> Dict[str, Any]:
+    rows = iter_azure_vm_csv(open_text(raw))
+
+    def write_batch(db, batch):
+        copied = copy_rows(db, "azure_vms", AZURE_VM_COLUMNS, batch)
+        return copied, copied
+
+    return _load_rows(args, raw, rows, azure_vm_row, write_batch)
+
+
+def load_ec2_instances(args: argparse.Namespace, raw: IO[bytes]) -> Dict[str, Any]:
+    rows = iter_ec2_csv(open_text(raw))
+
+    def write_batch(db, batch):
+        # Instances already stored are updated, so re-loading a newer export refreshes them
+        written = copy_rows_upsert(db, "ec2_instances", EC2_INSTANCE_COLUMNS, batch, "instance_id")
+        return len(batch), written
+
+    return _load_rows(args, raw, rows, ec2_instance_row, write_batch)
+
+
+def load_aws_accounts(args: argparse.Namespace, raw: IO[bytes]) -> Dict[str, Any]:
+    # Account inventories are small; reuse the upsert path used by the HTTP import
+    accounts = parse_aws_account_csv(raw)
+    db = SessionLocal()
+    try:
+        imported = AWSAccountStore(db).bulk_upsert(accounts)
+    finally:
+        db.close()
+    return {"rows": len(accounts), "loaded": imported}
+
+
+LOADERS = {
+    "databases": load_databases,
+    "azure-vms": load_azure_vms,
+    "ec2-instances": load_ec2_instances,
+    "aws-accounts": load_aws_accounts,
+}
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(prog="python -m app.cli", description="Cloud DB Inventory command-line tools")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    load = commands.add_parser("load", help="Bulk-load a CSV export from local disk")
+    load.add_argument("path", help="CSV file (optionally gzip/bz2/zstd compressed)")
+    load.add_argument("--kind", choices=sorted(LOADERS), default="databases", help="What the file contains")
+    load.add_argument("--provider", choices=["AWS", "Azure", "auto"], default="auto",
+                      help="Provider for --kind databases (default: infer from header)")
+    load.add_argument("--batch-size", type=int, default=5000, help="Rows per COPY batch and checkpoint")
+    load.add_argument("--checkpoint", help="Checkpoint file (default: <path>.checkpoint.json)")
+    load.add_argument("--skipped-report", help="NDJSON report of skipped rows (default: <path>.skipped.ndjson)")
+    load.add_argument("--restart", action="store_true", help="Ignore any existing checkpoint and load from the start")
+    load.add_argument("--quiet", action="store_true", help="Disable the progress bar")
+    return parser
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    args = build_parser().parse_args(argv)
+    args.checkpoint = args.checkpoint or f"{args.path}.checkpoint.json"
+    args.skipped_report = args.skipped_report or f"{args.path}.skipped.ndjson"
+
+    init_db()
+    started = time.monotonic()
+    with open(args.path, "rb") as raw:
+        totals = LOADERS[args.kind](args, raw)
+    elapsed = time.monotonic() - started
+    totals["seconds"] = round(elapsed, 2)
+    totals["rows_per_second"] = round(totals["rows"] / elapsed) if elapsed else totals["rows"]
+    print(json.dumps(totals))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
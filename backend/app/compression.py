@@ -0,0 +1,83 @@
+"""Transparent decompression of uploaded CSV exports."""
+import bz2
+import gzip
+import io
+from typing import IO, Optional
+
+try:
+    import zstandard
+except ImportError:  # zstd uploads are only accepted when the optional package is installed
+    zstandard = None
+
+GZIP_MAGIC = b"\x1f\x8b"
+BZIP2_MAGIC = b"BZh"
+ZSTD_MAGIC = b"\x28\xb5\x2f\xfd"
+
+
+class UnsupportedCompression(ValueError):
+    """Raised when an upload uses a compression format this server cannot read."""
+
+
+class _PrefixedReader(io.RawIOBase):
+    """Re-attach bytes already read for sniffing in front of a non-seekable stream."""
+
+    def __init__(self, prefix: bytes, stream: IO[bytes]):
+        self._prefix = prefix
+        self._stream = stream
+
+    def readable(self) -> bool:
+        return True
+
+    def readinto(self, buffer) -> int:
+        if self._prefix:
+            n = min(len(buffer), len(self._prefix))
+            buffer[:n] = self._prefix[:n]
+            self._prefix = self._prefix[n:]
+            return n
+        data = self._stream.read(len(buffer))
+        n = len(data)
+        buffer[:n] = data
+        return n
+
+
+def detect_compression(head: bytes) -> Optional[str]:
+    """Return "gzip", "bz2", "zstd" or None based on the leading magic bytes."""
+    if head.startswith(GZIP_MAGIC):
+        return "gzip"
+    if head.startswith(BZIP2_MAGIC):
+        return "bz2"
+    if head.startswith(ZSTD_MAGIC):
+        return "zstd"
+    return None
+
+
+def open_decompressed(fileobj: IO[bytes]) -> IO[bytes]:
+    """
+    Wrap a binary stream so reads return decompressed bytes.
+    The format is detected from magic bytes; plain files are passed through.
+    Decompression is incremental, so the full uncompressed file is never held in memory.
+    """
+    head = fileobj.read(4)
+    # Only real io streams are passed through: on Python 3.10 SpooledTemporaryFile (Starlette
+    # uploads) is not an IOBase and has no seekable()/readable(), which TextIOWrapper needs
+    if isinstance(fileobj, io.IOBase) and fileobj.seekable():
+        fileobj.seek(-len(head), io.SEEK_CUR)
+        stream: IO[bytes] = fileobj
+    else:
+        stream = io.BufferedReader(_PrefixedReader(head, fileobj))
+
+    kind = detect_compression(head)
+    if kind == "gzip":
+        return gzip.GzipFile(fileobj=stream, mode="rb")
+    if kind == "bz2":
+        return bz2.BZ2File(stream, mode="rb")
+    if kind == "zstd":
+        if zstandard is None:
+            raise UnsupportedCompression("zstd-compressed uploads require the 'zstandard' package on the server")
+        return zstandard.ZstdDecompressor().stream_reader(stream)
+    return stream
+
+
+def open_text(fileobj: IO[bytes], encoding: str = "utf-8-sig") -> IO[str]:
+    """Decompress (if needed) and decode an upload into a text stream suitable for csv readers."""
+    return io.TextIOWrapper(open_decompressed(fileobj), encoding=encoding, newline="")
@@ -1,32 +1,156 @@
 import csv
 import io
-from typing import List, Tuple, Dict, Any
+import itertools
+from typing import IO, Iterable, Iterator, List, Optional, Sequence, Tuple, Dict, Any, Union
 import logging
 
-from .schemas import DatabaseProvider, DatabaseRecordCreate, DatabaseStatus
+from .account_ids import recover_account_id
+from .schemas import DatabaseProvider, DatabaseRecordCreate, DatabaseRow, DatabaseStatus
 
 logger = logging.getLogger(__name__)
 
 
+# Accepted header names (lower-cased) for each record field, in priority order.
+# The first column with a non-empty value in a row wins.
+COLUMN_ALIASES: Dict[str, Tuple[str, ...]] = {
+    "service": (
+        "service", "service_name", "db_service", "type", "resource & subscription", "name",
+        "dbinstanceidentifier", "db_instance_identifier", "db_instance_id", "db_identifier",
+        "database", "dbname",
+    ),
+    "engine": ("engine", "engine_type", "db_engine", "database_engine", "db_type"),
+    "region": ("region", "location", "availability_zone"),
+    "endpoint": (
+        "endpoint",
+        "endpointaddress",  # AWS camelCase
+        "endpoint_address", "endpoint.address", "address", "hostname", "host",
+        "server_name", "server", "fqdn",
+    ),
+    "storage_gb": (
+        "storage_gb", "storagegb", "storage", "allocated_storage",
+        "allocatedstorage",  # AWS camelcase variant
+        "size_gb",
+    ),
+    "status": (
+        "status",
+        "state",  # Azure 'State'
+        "db_instance_status", "dbinstancestatus", "availability", "instance_status",
+        "power_state", "resource_state",
+    ),
+    "subscription": (
+        "subscription",
+        "accountid",  # AWS Account ID
+        "account_id", "account", "aws_account_id", "owner", "owner_team", "team",
+        "department", "resource & subscription",
+    ),
+    "tags": ("tags", "tag", "labels"),
+    "version": (
+        "version", "dbversion", "engine_version",
+        "engineversion",  # AWS camelcase variant
+        "db_version", "server_version",
+    ),
+    "azure_tenant": ("azure_tenant", "tenantid", "tenant_id", "tenant"),
+    "availability_zone": ("availabilityzone", "availability_zone", "az"),
+    "auto_scaling": ("autoscaling", "auto_scaling", "autogrow", "autoioscaling"),
+    "iops": ("iops", "io_operations"),
+    "high_availability_state": ("highavailabilitystate", "high_availability_state", "ha_state", "highavailabilitymode"),
+    "replica": ("replica", "replicas", "replication"),
+    "backup_retention_days": ("backupretentiondays", "backup_retention_days", "backup_retention"),
+    "geo_redundant_backup": ("georedundantbackup", "geo_redundant_backup", "geo_backup"),
+}
+
+# Azure resource graph exports: a row with both name and a DB type column uses these columns first
+AZURE_TYPE_COLUMNS = ("db_type", "dbtype", "type")
+AZURE_SIMPLE_ALIASES: Dict[str, Tuple[str, ...]] = {
+    **COLUMN_ALIASES,
+    "service": ("name",) + COLUMN_ALIASES["service"],
+    "engine": AZURE_TYPE_COLUMNS + COLUMN_ALIASES["engine"],
+    "region": ("location",) + COLUMN_ALIASES["region"],
+    "endpoint": ("fqdn",) + COLUMN_ALIASES["endpoint"],
+}
+
+REQUIRED_FIELDS = ("service", "region")
+
+
+def _first(row: Dict[str, str], columns: Sequence[str], default: Optional[str] = "") -> Optional[str]:
+    """Return the first non-empty value among columns, else default."""
+    for column in columns:
+        value = row.get(column)
+        if value:
+            return value
+    return default
+
+
+# Header columns that only appear in one provider's export format
+AZURE_ONLY_COLUMNS = {"db_type", "dbtype", "fqdn", "resource & subscription", "tenantid", "tenant_id", "azure_tenant"}
+AWS_ONLY_COLUMNS = {"dbinstanceidentifier", "db_instance_identifier", "endpointaddress", "endpoint_address", "accountid", "aws_account_id", "dbinstancestatus", "engineversion"}
+
+
+def infer_provider(fieldnames: Optional[Sequence[str]]) -> Optional[DatabaseProvider]:
+    """Guess the provider of an export from its header columns; None when ambiguous."""
+    columns = {f.strip().lower().lstrip("\ufeff") for f in (fieldnames or []) if f}
+    azure_hits = len(columns & AZURE_ONLY_COLUMNS)
+    aws_hits = len(columns & AWS_ONLY_COLUMNS)
+    if azure_hits > aws_hits:
+        return DatabaseProvider.azure
+    if aws_hits > azure_hits:
+        return DatabaseProvider.aws
+    return None
+
+
 def parse_csv(content: str, provider: DatabaseProvider) -> List[DatabaseRecordCreate]:
     """Original parser retained for backward compatibility (tests)."""
     records, _ = parse_csv_with_report(content, provider)
     return records
 
 
-def parse_csv_with_report(content: str, provider: DatabaseProvider) -> Tuple[List[DatabaseRecordCreate], List[Dict[str, Any]]]:
+def parse_csv_with_report(content: Union[str, IO[str]], provider: DatabaseProvider) -> Tuple[List[DatabaseRecordCreate], List[Dict[str, Any]]]:
     """
     Parse CSV content producing successful records and a report of skipped rows.
     Each skipped row entry contains: row_number (1-based after header), reason, and minimal context.
     Flexible column mapping for AWS and Azure exports.
+    content may be a string or a text stream (e.g. compression.open_text), which is read row by row.
     """
-    # Strip UTF-8 BOM if present before parsing
-    if content.startswith("\ufeff"):
-        content = content[1:]
-    
-    reader = csv.DictReader(io.StringIO(content))
     records: List[DatabaseRecordCreate] = []
     skipped: List[Dict[str, Any]] = []
+    for _, record, skip in iter_csv_records(content, provider):
+        if record is not None:
+            records.append(record)
+        else:
+            skipped.append(skip)
+    return records, skipped
+
+
+def iter_csv_records(
+    content: Union[str, Iterable[str]], provider: DatabaseProvider
+) -> Iterator[Tuple[int, Optional[DatabaseRecordCreate], Optional[Dict[str, Any]]]]:
+    """
+    Streaming form of parse_csv_with_report.
+    Yields (row_number, record, None) for parsed rows and (row_number, None, skip_entry) for skipped ones,
+    so callers can process arbitrarily large exports without holding them in memory.
+    """
+    for idx, row, skip in iter_csv_rows(content, provider):
+        if row is None:
+            yield idx, None, skip
+        else:
+            # Rows are already validated by the parser
+            yield idx, DatabaseRecordCreate.model_construct(**row._asdict()), None
+
+
+def iter_csv_rows(
+    content: Union[str, Iterable[str]], provider: DatabaseProvider
+) -> Iterator[Tuple[int, Optional[DatabaseRow], Optional[Dict[str, Any]]]]:
+    """
+    Like iter_csv_records but yields DatabaseRow tuples; this is the import hot path
+    and avoids building a Pydantic model per row.
+    """
+    if isinstance(content, str):
+        # Strip UTF-8 BOM if present before parsing
+        if content.startswith("\ufeff"):
+            content = content[1:]
+        content = io.StringIO(content)
+
+    reader = csv.DictReader(content)
 
     for idx, row in enumerate(reader, start=1):
         # Normalize keys (case-insensitive, strip whitespace)
@@ -38,123 +162,42 @@ def parse_csv_with_report(content: str, provider: DatabaseProvider) -> Tuple[Lis
             normalized_row[key_norm] = (v.strip() if v and str(v).strip() else "")
 
         # Skip "SQL Server (Arc)" records - these are VMs managed in separate Azure VMs tab
-        db_type = (
-            normalized_row.get("db_type")
-            or normalized_row.get("dbtype")
-            or normalized_row.get("type")
-            or ""
-        )
+        db_type = _first(normalized_row, AZURE_TYPE_COLUMNS)
         if db_type and "sql server (arc)" in db_type.lower():
-            skipped.append({
+            yield idx, None, {
                 "row_number": idx,
                 "reason": "Skipped: SQL Server (Arc) records are managed in the Azure VMs tab",
                 "raw": {k: row[k] for k in row if k is not None}
-            })
+            }
             continue
 
-        # Base generic extraction (AWS / generic CSV)
-        service_generic = (
-            normalized_row.get("service")
-            or normalized_row.get("service_name")
-            or normalized_row.get("db_service")
-            or normalized_row.get("type")
-            or normalized_row.get("resource & subscription")
-            or normalized_row.get("name")
-            or normalized_row.get("dbinstanceidentifier")
-            or normalized_row.get("db_instance_identifier")
-            or normalized_row.get("db_instance_id")
-            or normalized_row.get("db_identifier")
-            or normalized_row.get("database")
-            or normalized_row.get("dbname")
-            or ""
-        )
-        engine_generic = (
-            normalized_row.get("engine")
-            or normalized_row.get("engine_type")
-            or normalized_row.get("db_engine")
-            or normalized_row.get("database_engine")
-            or normalized_row.get("db_type")
-            or ""
-        )
-        region_generic = (
-            normalized_row.get("region")
-            or normalized_row.get("location")
-            or normalized_row.get("availability_zone")
-            or ""
-        )
-        endpoint_generic = (
-            normalized_row.get("endpoint")
-            or normalized_row.get("endpointaddress")  # AWS camelCase
-            or normalized_row.get("endpoint_address")
-            or normalized_row.get("endpoint.address")
-            or normalized_row.get("address")
-            or normalized_row.get("hostname")
-            or normalized_row.get("host")
-            or normalized_row.get("server_name")
-            or normalized_row.get("server")
-            or normalized_row.get("fqdn")
-            or ""
-        )
-
         # Azure simple mode: prefer explicit columns (name, db_type, subscription, location, state, dbversion, storagegb)
-        if provider == DatabaseProvider.azure and (
-            (normalized_row.get("name") and (normalized_row.get("db_type") or normalized_row.get("dbtype") or normalized_row.get("type")))
-        ):
-            service = normalized_row.get("name") or service_generic
-            raw_engine = (
-                normalized_row.get("db_type")
-                or normalized_row.get("dbtype")
-                or normalized_row.get("type")
-                or engine_generic
-            )
+        azure_simple = provider == DatabaseProvider.azure and bool(normalized_row.get("name") and db_type)
+        aliases = AZURE_SIMPLE_ALIASES if azure_simple else COLUMN_ALIASES
+
+        service = _first(normalized_row, aliases["service"])
+        engine = _first(normalized_row, aliases["engine"])
+        region = _first(normalized_row, aliases["region"])
+        endpoint = _first(normalized_row, aliases["endpoint"])
+        if azure_simple:
             # Normalize verbose Azure type strings to canonical engines
-            engine_lower = raw_engine.lower()
+            engine_lower = engine.lower()
             if "mysql" in engine_lower:
                 engine = "mysql"
             elif "postgre" in engine_lower:
                 engine = "postgres"
             elif "mariadb" in engine_lower:
                 engine = "mariadb"
-            else:
-                engine = raw_engine
-            region = normalized_row.get("location") or region_generic
             # Endpoint optional in Azure simple; use FQDN if available else service as placeholder
-            endpoint = (
-                normalized_row.get("fqdn")
-                or endpoint_generic
-                or service
-            )
-        else:
-            service = service_generic
-            engine = engine_generic
-            region = region_generic
-            endpoint = endpoint_generic
-
-        storage_str = (
-            normalized_row.get("storage_gb")
-            or normalized_row.get("storagegb")
-            or normalized_row.get("storage")
-            or normalized_row.get("allocated_storage")
-            or normalized_row.get("allocatedstorage")  # AWS camelcase variant
-            or normalized_row.get("size_gb")
-            or "0"
-        )
+            endpoint = endpoint or service
+
+        storage_str = _first(normalized_row, COLUMN_ALIASES["storage_gb"], "0")
         try:
             storage_gb = int(float(storage_str.replace(",", "")))
         except (ValueError, AttributeError):
             storage_gb = 0
 
-        status_str = (
-            normalized_row.get("status")
-            or normalized_row.get("state")  # Azure 'State'
-            or normalized_row.get("db_instance_status")
-            or normalized_row.get("dbinstancestatus")
-            or normalized_row.get("availability")
-            or normalized_row.get("instance_status")
-            or normalized_row.get("power_state")
-            or normalized_row.get("resource_state")
-            or "available"
-        ).lower().strip()
+        status_str = _first(normalized_row, COLUMN_ALIASES["status"], "available").lower().strip()
         
         # Debug logging to see what status is being read
         logger.info(f"Row {idx}: Raw status_str='{status_str}', provider={provider}")
@@ -189,115 +232,24 @@ def parse_csv_with_report(content: str, provider: DatabaseProvider) -> Tuple[Lis
             else:
                 status = DatabaseStatus.available
 
-        subscription = (
-            normalized_row.get("subscription")
-            or normalized_row.get("accountid")  # AWS Account ID
-            or normalized_row.get("account_id")
-            or normalized_row.get("account")
-            or normalized_row.get("aws_account_id")
-            or normalized_row.get("owner")
-            or normalized_row.get("owner_team")
-            or normalized_row.get("team")
-            or normalized_row.get("department")
-            or normalized_row.get("resource & subscription")
-            or ""
-        )
-        tags_str = (
-            normalized_row.get("tags")
-            or normalized_row.get("tag")
-            or normalized_row.get("labels")
-            or ""
-        )
+        subscription = _first(normalized_row, COLUMN_ALIASES["subscription"])
+        tags_str = _first(normalized_row, COLUMN_ALIASES["tags"])
         tags = [t.strip() for t in tags_str.replace(";", ",").split(",") if t.strip()]
 
-        version = (
-            normalized_row.get("version")
-            or normalized_row.get("dbversion")
-            or normalized_row.get("engine_version")
-            or normalized_row.get("engineversion")  # AWS camelcase variant
-            or normalized_row.get("db_version")
-            or normalized_row.get("server_version")
-            or None
-        )
-        if version == "":
-            version = None
+        version = _first(normalized_row, COLUMN_ALIASES["version"], None)
 
         azure_tenant = None
         if provider == DatabaseProvider.azure:
-            azure_tenant = (
-                normalized_row.get("azure_tenant")
-                or normalized_row.get("tenantid")
-                or normalized_row.get("tenant_id")
-                or normalized_row.get("tenant")
-                or None
-            )
-            if azure_tenant == "":
-                azure_tenant = None
+            azure_tenant = _first(normalized_row, COLUMN_ALIASES["azure_tenant"], None)
 
         # Extract detailed fields (optional for all providers)
-        availability_zone = (
-            normalized_row.get("availabilityzone")
-            or normalized_row.get("availability_zone")
-            or normalized_row.get("az")
-            or None
-        )
-        if availability_zone == "":
-            availability_zone = None
-
-        auto_scaling = (
-            normalized_row.get("autoscaling")
-            or normalized_row.get("auto_scaling")
-            or normalized_row.get("autogrow")
-            or normalized_row.get("autoioscaling")
-            or None
-        )
-        if auto_scaling == "":
-            auto_scaling = None
-
-        iops = (
-            normalized_row.get("iops")
-            or normalized_row.get("io_operations")
-            or None
-        )
-        if iops == "":
-            iops = None
-
-        high_availability_state = (
-            normalized_row.get("highavailabilitystate")
-            or normalized_row.get("high_availability_state")
-            or normalized_row.get("ha_state")
-            or normalized_row.get("highavailabilitymode")
-            or None
-        )
-        if high_availability_state == "":
-            high_availability_state = None
-
-        replica = (
-            normalized_row.get("replica")
-            or normalized_row.get("replicas")
-            or normalized_row.get("replication")
-            or None
-        )
-        if replica == "":
-            replica = None
-
-        backup_retention_days = (
-            normalized_row.get("backupretentiondays")
-            or normalized_row.get("backup_retention_days")
-            or normalized_row.get("backup_retention")
-            or None
-        )
-        if backup_retention_days == "":
-            backup_retention_days = None
-
-        geo_redundant_backup = (
-            normalized_row.get("georedundantbackup")
-            or normalized_row.get("geo_redundant_backup")
-            or normalized_row.get("geo_backup")
-            or None
-        )
-        if geo_redundant_backup == "":
-            geo_redundant_backup = None
+        availability_zone = _first(normalized_row, COLUMN_ALIASES["availability_zone"], None)
+        auto_scaling = _first(normalized_row, COLUMN_ALIASES["auto_scaling"], None)
+        iops = _first(normalized_row, COLUMN_ALIASES["iops"], None)
+        high_availability_state = _first(normalized_row, COLUMN_ALIASES["high_availability_state"], None)
+        replica = _first(normalized_row, COLUMN_ALIASES["replica"], None)
+        backup_retention_days = _first(normalized_row, COLUMN_ALIASES["backup_retention_days"], None)
+        geo_redundant_backup = _first(normalized_row, COLUMN_ALIASES["geo_redundant_backup"], None)
 
         # Only service and region are truly required; engine and endpoint can be inferred or optional
         missing_fields = []
@@ -307,11 +259,11 @@ def parse_csv_with_report(content: str, provider: DatabaseProvider) -> Tuple[Lis
             missing_fields.append("region")
         
         if missing_fields:
-            skipped.append({
+            yield idx, None, {
                 "row_number": idx,
                 "reason": f"Missing required fields: {', '.join(missing_fields)}",
                 "raw": {k: row[k] for k in row if k is not None}
-            })
+            }
             continue
         
         # Set defaults for optional fields
@@ -322,37 +274,94 @@ def parse_csv_with_report(content: str, provider: DatabaseProvider) -> Tuple[Lis
 
         if not subscription:
             subscription = "unknown"
+        elif provider == DatabaseProvider.aws and not subscription.isdigit():
+            # Spreadsheet exports turn account IDs into 1.20594E+11; ARNs in the row (KMS key, tags) carry the exact ID
+            subscription = recover_account_id(subscription, *normalized_row.values())
 
-        try:
-            records.append(
-                DatabaseRecordCreate(
-                    provider=provider,
-                    service=service,
-                    engine=engine,
-                    region=region,
-                    endpoint=endpoint,
-                    storage_gb=storage_gb,
-                    status=status,
-                    subscription=subscription,
-                    tags=tags,
-                    version=version,
-                    azure_tenant=azure_tenant,
-                                    availability_zone=availability_zone,
-                                    auto_scaling=auto_scaling,
-                                    iops=iops,
-                                    high_availability_state=high_availability_state,
-                                    replica=replica,
-                                    backup_retention_days=backup_retention_days,
-                                    geo_redundant_backup=geo_redundant_backup,
-                )
-            )
-        except Exception as e:
-            skipped.append({
+        if storage_gb < 0:
+            yield idx, None, {
                 "row_number": idx,
-                "reason": f"Validation error: {e}",
+                "reason": "Validation error: storage_gb must be greater than or equal to 0",
                 "raw": {k: row[k] for k in row if k is not None}
-            })
+            }
             continue
 
-    return records, skipped
+        yield idx, DatabaseRow(
+            provider,
+            service,
+            engine,
+            region,
+            endpoint,
+            storage_gb,
+            status,
+            subscription,
+            tags,
+            version,
+            azure_tenant,
+            availability_zone,
+            auto_scaling,
+            iops,
+            high_availability_state,
+            replica,
+            backup_retention_days,
+            geo_redundant_backup,
+        ), None
+
+
+def preflight_csv(lines: Iterable[str], provider: Optional[DatabaseProvider] = None, max_rows: int = 200) -> Dict[str, Any]:
+    """
+    Validate the header (and optionally a few sample rows) of an export without importing it.
+    Reports the column chosen for each field, the provider, required fields with no matching
+    column, and the skip reasons the sample rows would produce.
+    """
+    lines = iter(lines)
+    header_line = next(lines, "")
+    if header_line.startswith("\ufeff"):
+        header_line = header_line[1:]
+    header = next(csv.reader([header_line]), [])
+    columns = [c.strip().lower() for c in header if c and c.strip()]
+    column_set = set(columns)
+
+    inferred = infer_provider(header)
+    effective = provider or inferred or DatabaseProvider.aws
+
+    azure_simple = (
+        effective == DatabaseProvider.azure
+        and "name" in column_set
+        and any(c in column_set for c in AZURE_TYPE_COLUMNS)
+    )
+    aliases = AZURE_SIMPLE_ALIASES if azure_simple else COLUMN_ALIASES
+    mapping = {
+        field: next((c for c in candidates if c in column_set), None)
+        for field, candidates in aliases.items()
+    }
+    if effective != DatabaseProvider.azure:
+        mapping.pop("azure_tenant")
+    used = {c for c in mapping.values() if c}
+    missing_required = [field for field in REQUIRED_FIELDS if mapping[field] is None]
+
+    sample_rows = 0
+    sample_valid = 0
+    predicted_skips: Dict[str, int] = {}
+    if columns:
+        sample = itertools.islice(lines, max_rows)
+        for _, record, skip in iter_csv_rows(itertools.chain([header_line], sample), effective):
+            sample_rows += 1
+            if record is not None:
+                sample_valid += 1
+            else:
+                predicted_skips[skip["reason"]] = predicted_skips.get(skip["reason"], 0) + 1
 
+    return {
+        "provider": effective.value,
+        "provider_inferred": provider is None and inferred is not None,
+        "azure_simple_mode": azure_simple,
+        "columns": columns,
+        "mapping": mapping,
+        "unmapped_columns": [c for c in columns if c not in used],
+        "missing_required": missing_required,
+        "sample_rows": sample_rows,
+        "sample_valid": sample_valid,
+        "predicted_skips": predicted_skips,
+        "ready": bool(columns) and not missing_required and (sample_rows == 0 or sample_valid > 0),
+    }
@@ -82,10 +82,167 @@ def init_db():
                 ADD COLUMN IF NOT EXISTS geo_redundant_backup VARCHAR NULL;
                 """
             ))
+            conn.execute(text(
+                """
+                CREATE INDEX IF NOT EXISTS ix_database_records_tags
+                ON database_records USING gin (tags);
+                """
+            ))
     except Exception as e:
         # Log and continue; table might not exist yet or permissions differ
         print(f"Schema migration check failed: {e}")
+
+    # Canonical AWS account ID; adding a stored generated column backfills existing rows
+    try:
+        from sqlalchemy import text
+        from .account_ids import ACCOUNT_ID_NORM_SQL
+        with engine.begin() as conn:
+            conn.execute(text(
+                f"""
+                ALTER TABLE database_records
+                ADD COLUMN IF NOT EXISTS account_id_norm VARCHAR
+                GENERATED ALWAYS AS ({ACCOUNT_ID_NORM_SQL.format(column="subscription")}) STORED;
+                """
+            ))
+            conn.execute(text(
+                """
+                CREATE INDEX IF NOT EXISTS ix_database_records_account_id_norm
+                ON database_records (account_id_norm);
+                """
+            ))
+    except Exception as e:
+        print(f"Account ID migration failed: {e}")
+
+    # Typed detail columns; likewise filled for existing rows when they are added
+    try:
+        from sqlalchemy import text
+        from .models import DETAIL_COLUMNS
+        with engine.begin() as conn:
+            for name, (sql, sql_type, column) in DETAIL_COLUMNS.items():
+                conn.execute(text(
+                    f"""
+                    ALTER TABLE database_records
+                    ADD COLUMN IF NOT EXISTS {name} {sql_type}
+                    GENERATED ALWAYS AS ({sql.format(column=column)}) STORED;
+                    """
+                ))
+                conn.execute(text(
+                    f"""
+                    CREATE INDEX IF NOT EXISTS ix_database_records_{name}
+                    ON database_records ({name});
+                    """
+                ))
+    except Exception as e:
+        print(f"Detail column migration failed: {e}")
+
+    # Domain-ordered endpoint for suffix filters; its function must exist first
+    try:
+        from sqlalchemy import text
+        from .models import DOMAIN_ORDER_FUNCTION_SQL
+        with engine.begin() as conn:
+            conn.execute(text(DOMAIN_ORDER_FUNCTION_SQL))
+            conn.execute(text(
+                """
+                ALTER TABLE database_records
+                ADD COLUMN IF NOT EXISTS endpoint_rev VARCHAR
+                GENERATED ALWAYS AS (domain_order(endpoint)) STORED;
+                """
+            ))
+            conn.execute(text(
+                """
+                CREATE INDEX IF NOT EXISTS ix_database_records_endpoint_rev
+                ON database_records (endpoint_rev text_pattern_ops);
+                """
+            ))
+    except Exception as e:
+        print(f"Endpoint suffix migration failed: {e}")
+
+    # Largest-databases lookups scan this backwards
+    try:
+        from sqlalchemy import text
+        with engine.begin() as conn:
+            conn.execute(text(
+                """
+                CREATE INDEX IF NOT EXISTS ix_database_records_storage_gb
+                ON database_records (storage_gb);
+                """
+            ))
+    except Exception as e:
+        print(f"Storage index migration failed: {e}")
+
+    # Parsed engine family and version key for upgrade policies, likewise filled
+    try:
+        from sqlalchemy import text
+        from .models import UPGRADE_KEY_COLUMNS
+        with engine.begin() as conn:
+            for name, (sql, sql_type) in UPGRADE_KEY_COLUMNS.items():
+                conn.execute(text(
+                    f"""
+                    ALTER TABLE database_records
+                    ADD COLUMN IF NOT EXISTS {name} {sql_type}
+                    GENERATED ALWAYS AS ({sql}) STORED;
+                    """
+                ))
+            conn.execute(text(
+                """
+                CREATE INDEX IF NOT EXISTS ix_database_records_upgrade_key
+                ON database_records (engine_family, version_major, version_minor);
+                """
+            ))
+    except Exception as e:
+        print(f"Upgrade key migration failed: {e}")
+
+    # Azure VM private IPs as inet (imports fill private_ip, this backfills rows stored before it) and indexes
+    try:
+        from sqlalchemy import text
+        with engine.begin() as conn:
+            conn.execute(text(
+                """
+                ALTER TABLE azure_vms
+                ADD COLUMN IF NOT EXISTS private_ip INET NULL;
+                """
+            ))
+            conn.execute(text(
+                r"""
+                UPDATE azure_vms
+                SET private_ip = CAST(btrim(split_part(replace(private_ip_address, ';', ','), ',', 1)) AS INET)
+                WHERE private_ip IS NULL
+                  AND btrim(split_part(replace(private_ip_address, ';', ','), ',', 1))
+                      ~ '^((25[0-5]|2[0-4][0-9]|1[0-9][0-9]|[1-9]?[0-9])\.){3}(25[0-5]|2[0-4][0-9]|1[0-9][0-9]|[1-9]?[0-9])$';
+                """
+            ))
+            conn.execute(text(
+                """
+                CREATE INDEX IF NOT EXISTS ix_azure_vms_private_ip
+                ON azure_vms USING gist (private_ip inet_ops);
+                """
+            ))
+            # Columns the VM analytics group and filter by, and the disk size largest-VM lookups scan
+            for column in (
+                "subscription", "location", "vm_size", "os_type", "display_status", "time_created", "tenant_id",
+                "total_disk_size_gb",
+            ):
+                conn.execute(text(f"CREATE INDEX IF NOT EXISTS ix_azure_vms_{column} ON azure_vms ({column});"))
+    except Exception as e:
+        print(f"Azure VM migration failed: {e}")
     
+    # Materialized summary used for dashboard aggregates (refreshed by a background task)
+    try:
+        from .summary import create_summary_view
+        with engine.begin() as conn:
+            create_summary_view(conn)
+    except Exception as e:
+        print(f"Summary view creation failed: {e}")
+
+    # Seed the default upgrade policies into an empty table
+    try:
+        from .upgrade_policy_store import UpgradePolicyStore
+        db = SessionLocal()
+        UpgradePolicyStore(db).init_defaults()
+        db.close()
+    except Exception as e:
+        print(f"Upgrade policy initialization failed: {e}")
+
     # Initialize tenant mappings
     try:
         from .tenant_mapping import init_tenant_mappings
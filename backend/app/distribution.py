@@ -0,0 +1,98 @@
+"""
+Size distributions for capacity planning: histogram, percentiles and largest items.
+
+Shared by the database and Azure VM stores. Both functions take an `apply(query)` callable
+adding the caller's filters to a query (a store's _apply_filters), so the same filter code
+answers the listing and the distribution.
+"""
+from typing import Any, Callable, Dict, List, Optional, Sequence
+
+from sqlalchemy import Float, Integer, cast, func, tuple_
+from sqlalchemy.dialects import postgresql
+from sqlalchemy.orm import Session
+
+# Histogram bucket edges in GB; sizes span orders of magnitude, so the buckets widen
+STORAGE_HISTOGRAM_EDGES = (0, 10, 20, 50, 100, 200, 500, 1000, 2000, 5000, 10000, 20000, 50000)
+
+PERCENTILES = (0.5, 0.9, 0.99)
+
+
+def size_distribution(
+    db: Session, apply: Callable[[Any], Any], size, edges: Sequence[int] = STORAGE_HISTOGRAM_EDGES
+) -> Dict[str, Any]:
+    """
+    Count, total, min, max, percentiles and a width_bucket histogram of size, from one
+    GROUPING SETS query (a set per bucket plus the overall row). Rows without a size are
+    only counted in unsized.
+    """
+    bucket = func.width_bucket(size, cast(postgresql.array(edges), postgresql.ARRAY(Integer)))
+    query = apply(db.query(
+        bucket,
+        func.grouping(bucket),
+        func.count(),
+        func.count(size),
+        func.coalesce(func.sum(size), 0),
+        func.min(size),
+        func.max(size),
+        func.percentile_cont(cast(postgresql.array(PERCENTILES), postgresql.ARRAY(Float))).within_group(size),
+    )).group_by(func.grouping_sets(tuple_(bucket), tuple_()))
+
+    # width_bucket numbers sizes below edges[0] as 0 and sizes at or above edges[-1] as len(edges)
+    counts = [0] * (len(edges) + 1)
+    result: Dict[str, Any] = {"count": 0, "unsized": 0, "total": 0, "min": None, "max": None}
+    result["percentiles"] = {f"p{round(p * 100)}": None for p in PERCENTILES}
+    for value, grouped, rows, sized, total, smallest, largest, percentiles in query:
+        if grouped:
+            result.update(count=rows, unsized=rows - sized, total=int(total), min=smallest, max=largest)
+            result["percentiles"] = {
+                f"p{round(p * 100)}": round(v, 2) if v is not None else None
+                for p, v in zip(PERCENTILES, percentiles or [None] * len(PERCENTILES))
+            }
+        elif value is not None:
+            counts[value] = sized
+    result["histogram"] = [
+        {"from": edges[i - 1] if i else None, "to": edges[i] if i < len(edges) else None, "count": counts[i]}
+        for i in range(len(edges) + 1)
+        # Nothing is ever below 0 GB
+        if i or counts[0]
+    ]
+    return result
+
+
+def largest(
+    db: Session,
+    apply: Callable[[Any], Any],
+    columns: Dict[str, Any],
+    size,
+    limit: int,
+    dimension: Optional[Any] = None,
+) -> List[Any]:
+    """
+    The limit largest rows by size as dicts of columns or, given a dimension column, the limit
+    largest for each of its values as [{"group": value, "items": [...]}] from one row_number()
+    query. An index on size serves the overall form as a backward scan stopping after limit rows.
+    """
+    selected = [column.label(name) for name, column in columns.items()]
+    if dimension is None:
+        query = apply(db.query(*selected)).filter(size.isnot(None)).order_by(size.desc()).limit(limit)
+        return [dict(row._mapping) for row in query]
+
+    rank = func.row_number().over(partition_by=dimension, order_by=size.desc())
+    ranked = (
+        apply(db.query(*selected, dimension.label("_group"), rank.label("_rank")))
+        .filter(size.isnot(None))
+        .subquery()
+    )
+    query = (
+        db.query(*[ranked.c[name] for name in columns], ranked.c._group)
+        .filter(ranked.c._rank <= limit)
+        .order_by(ranked.c._group, ranked.c._rank)
+    )
+    groups: List[Dict[str, Any]] = []
+    for row in query:
+        item = dict(row._mapping)
+        group = item.pop("_group")
+        if not groups or groups[-1]["group"] != group:
+            groups.append({"group": group, "items": []})
+        groups[-1]["items"].append(item)
+    return groups
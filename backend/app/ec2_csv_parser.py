@@ -0,0 +1,149 @@
+"""CSV parser for AWS EC2 instance exports."""
+import csv
+import json
+from io import StringIO
+from datetime import datetime
+from typing import IO, Dict, Iterable, Iterator, List, Optional, Tuple, Union
+
+from .account_ids import recover_account_id
+from .schemas import EC2InstanceCreate
+
+LAUNCH_TIME_FORMATS = ("%m/%d/%Y %H:%M", "%m/%d/%Y %H:%M:%S", "%Y-%m-%d %H:%M:%S")
+
+
+def parse_ec2_csv(file_content: Union[bytes, IO[str]]) -> Tuple[List[EC2InstanceCreate], List[dict]]:
+    """Parse an EC2 inventory CSV file.
+
+    Accepts the raw bytes of the file or an already-decoded text stream
+    (e.g. compression.open_text), which is consumed row by row.
+
+    Returns:
+        Tuple of (parsed_records, skipped_records)
+    """
+    parsed_records = []
+    skipped_records = []
+    for _, record, skip in iter_ec2_csv(file_content):
+        if record is not None:
+            parsed_records.append(record)
+        else:
+            skipped_records.append(skip)
+    return parsed_records, skipped_records
+
+
+def _int(value: Optional[str]) -> Optional[int]:
+    if not value or not value.strip():
+        return None
+    try:
+        return int(float(value))
+    except ValueError:
+        return None
+
+
+def _bool(value: Optional[str]) -> Optional[bool]:
+    text = (value or "").strip().lower()
+    if text in ("true", "yes", "1"):
+        return True
+    if text in ("false", "no", "0"):
+        return False
+    return None
+
+
+def _launch_time(value: Optional[str]) -> Optional[datetime]:
+    text = (value or "").strip()
+    if not text:
+        return None
+    try:
+        return datetime.fromisoformat(text.replace("Z", "+00:00"))
+    except ValueError:
+        pass
+    for fmt in LAUNCH_TIME_FORMATS:
+        try:
+            return datetime.strptime(text, fmt)
+        except ValueError:
+            continue
+    return None
+
+
+def _tags(value: Optional[str]) -> Dict[str, str]:
+    text = (value or "").strip()
+    if not text:
+        return {}
+    tags = json.loads(text)
+    if isinstance(tags, list):
+        # Raw API shape: [{"Key": ..., "Value": ...}]
+        tags = {tag.get("Key"): tag.get("Value") for tag in tags}
+    if not isinstance(tags, dict):
+        raise ValueError("Tags must be a JSON object")
+    return {str(k): "" if v is None else str(v) for k, v in tags.items()}
+
+
+def iter_ec2_csv(
+    file_content: Union[bytes, Iterable[str]],
+) -> Iterator[Tuple[int, Optional[EC2InstanceCreate], Optional[dict]]]:
+    """Streaming form of parse_ec2_csv.
+
+    Yields (row_number, record, None) for parsed rows and (row_number, None, skip_entry)
+    for rows that failed to parse. Entirely empty rows (common at the end of spreadsheet
+    exports) are ignored.
+    """
+    if isinstance(file_content, bytes):
+        text_content = file_content.decode('utf-8-sig')
+        reader = csv.DictReader(StringIO(text_content))
+    else:
+        reader = csv.DictReader(file_content)
+
+    if not reader.fieldnames:
+        yield 1, None, {"error": "No headers found in CSV"}
+        return
+
+    for row_num, row in enumerate(reader, start=2):
+        if not any((value or "").strip() for value in row.values() if isinstance(value, str)):
+            continue
+        try:
+            instance_id = (row.get("InstanceId") or "").strip()
+            if not instance_id:
+                raise ValueError("InstanceId is required")
+            iam_instance_profile = (row.get("IamInstanceProfile") or "").strip() or None
+            account_id = recover_account_id(row.get("AccountId") or "", iam_instance_profile, row.get("Tags"))
+            if not account_id:
+                raise ValueError("AccountId is required")
+
+            record = EC2InstanceCreate(
+                instance_id=instance_id,
+                name=(row.get("Name") or "").strip() or None,
+                account_id=account_id,
+                region=(row.get("Region") or "").strip(),
+                availability_zone=(row.get("AvailabilityZone") or "").strip() or None,
+                instance_type=(row.get("InstanceType") or "").strip() or None,
+                image_id=(row.get("ImageId") or "").strip() or None,
+                image_name=(row.get("ImageName") or "").strip() or None,
+                root_volume_size=_int(row.get("RootVolumeSize")),
+                additional_ebs_count=_int(row.get("AdditionalEBSCount")),
+                total_ebs_size=_int(row.get("TotalEBSSize")),
+                ebs_volume_types=(row.get("EBSVolumeTypes") or "").strip() or None,
+                state=(row.get("State") or "").strip() or None,
+                state_transition_reason=(row.get("StateTransitionReason") or "").strip() or None,
+                launch_time=_launch_time(row.get("LaunchTime")),
+                vpc_id=(row.get("VpcId") or "").strip() or None,
+                subnet_id=(row.get("SubnetId") or "").strip() or None,
+                private_ip_address=(row.get("PrivateIpAddress") or "").strip() or None,
+                public_ip_address=(row.get("PublicIpAddress") or "").strip() or None,
+                security_groups=(row.get("SecurityGroups") or "").strip() or None,
+                key_name=(row.get("KeyName") or "").strip() or None,
+                iam_instance_profile=iam_instance_profile,
+                monitoring_state=(row.get("MonitoringState") or "").strip() or None,
+                ebs_optimized=_bool(row.get("EbsOptimized")),
+                platform=(row.get("Platform") or "").strip() or None,
+                platform_details=(row.get("PlatformDetails") or "").strip() or None,
+                tenancy=(row.get("Tenancy") or "").strip() or None,
+                tags=_tags(row.get("Tags")),
+            )
+        except Exception as e:
+            yield row_num, None, {
+                "row": row_num,
+                "error": str(e),
+                "data": dict(row)
+            }
+            continue
+
+        yield row_num, record, None
@@ -0,0 +1,45 @@
+"""SQLAlchemy models for AWS EC2 instances."""
+from sqlalchemy import Boolean, Column, DateTime, Index, Integer, String
+from sqlalchemy.dialects.postgresql import JSONB
+import uuid
+from .database import Base
+
+
+class EC2InstanceModel(Base):
+    """Model for EC2 instance inventory."""
+    __tablename__ = "ec2_instances"
+
+    id = Column(String, primary_key=True, default=lambda: str(uuid.uuid4()))
+    instance_id = Column(String, nullable=False, unique=True)
+    name = Column(String, nullable=True)
+    account_id = Column(String, nullable=False, index=True)
+    region = Column(String, nullable=False, index=True)
+    availability_zone = Column(String, nullable=True)
+    instance_type = Column(String, nullable=True, index=True)
+    image_id = Column(String, nullable=True)
+    image_name = Column(String, nullable=True)
+    root_volume_size = Column(Integer, nullable=True)
+    additional_ebs_count = Column(Integer, nullable=True)
+    total_ebs_size = Column(Integer, nullable=True)
+    ebs_volume_types = Column(String, nullable=True)
+    state = Column(String, nullable=True, index=True)
+    state_transition_reason = Column(String, nullable=True)
+    launch_time = Column(DateTime, nullable=True)
+    vpc_id = Column(String, nullable=True)
+    subnet_id = Column(String, nullable=True)
+    private_ip_address = Column(String, nullable=True)
+    public_ip_address = Column(String, nullable=True)
+    security_groups = Column(String, nullable=True)
+    key_name = Column(String, nullable=True)
+    iam_instance_profile = Column(String, nullable=True)
+    monitoring_state = Column(String, nullable=True)
+    ebs_optimized = Column(Boolean, nullable=True)
+    platform = Column(String, nullable=True)
+    platform_details = Column(String, nullable=True)
+    tenancy = Column(String, nullable=True)
+    tags = Column(JSONB, nullable=False, default=dict)
+
+    __table_args__ = (
+        # Serves tag containment (@>) and key-exists (?) filters
+        Index("ix_ec2_instances_tags", "tags", postgresql_using="gin"),
+    )
@@ -0,0 +1,196 @@
+"""Store for AWS EC2 instance inventory."""
+from typing import Any, Dict, Iterable, Optional
+from sqlalchemy.orm import Session
+from sqlalchemy import or_, func, tuple_
+
+from .account_ids import account_ids, recover_account_id
+from .bulk_load import EC2_INSTANCE_COLUMNS, copy_rows_upsert, ec2_instance_row
+from .schemas import EC2Instance, EC2InstanceCreate, EC2Filters
+from .generation import GenerationCache, bump_generation
+from .ec2_models import EC2InstanceModel
+
+# EC2Instance fields in response order, selected directly by list_page
+EC2_ROW_COLUMNS = tuple(EC2Instance.model_fields)
+
+# Dimensions counted by stats(), each a grouping set of the one aggregate query
+EC2_STATS_DIMENSIONS = ("account_id", "region", "state", "instance_type", "platform")
+
+
+def _load_filter_options(db: Session) -> dict:
+    """Distinct values of every filterable column from one aggregate query, plus the distinct tag keys."""
+    accounts, regions, states, instance_types, platforms = db.query(
+        func.array_agg(EC2InstanceModel.account_id.distinct()),
+        func.array_agg(EC2InstanceModel.region.distinct()),
+        func.array_agg(EC2InstanceModel.state.distinct()),
+        func.array_agg(EC2InstanceModel.instance_type.distinct()),
+        func.array_agg(EC2InstanceModel.platform.distinct()),
+    ).one()
+    tag_keys = [key for key, in db.query(func.jsonb_object_keys(EC2InstanceModel.tags)).distinct()]
+    # array_agg over no rows is NULL
+    return {
+        "accounts": sorted(v for v in accounts or [] if v),
+        "regions": sorted(v for v in regions or [] if v),
+        "states": sorted(v for v in states or [] if v),
+        "instance_types": sorted(v for v in instance_types or [] if v),
+        "platforms": sorted(v for v in platforms or [] if v),
+        "tag_keys": sorted(tag_keys),
+    }
+
+
+_filter_options = GenerationCache(_load_filter_options)
+
+
+class EC2Store:
+    """PostgreSQL-backed store for EC2 instance inventory."""
+
+    def __init__(self, db: Session):
+        self.db = db
+
+    def list_page(self, filters: EC2Filters, limit: int = 100, after: Optional[str] = None) -> Dict[str, Any]:
+        """
+        One page of instances ordered by instance_id, as plain dicts in EC2Instance field order.
+        after is the last instance_id of the previous page (keyset pagination, so deep pages
+        cost the same as the first). total counts every instance matching filters.
+        """
+        columns = [getattr(EC2InstanceModel, name) for name in EC2_ROW_COLUMNS]
+        query = self._apply_filters(self.db.query(*columns), filters)
+        total = self._apply_filters(self.db.query(func.count(EC2InstanceModel.id)), filters).scalar()
+        if after:
+            query = query.filter(EC2InstanceModel.instance_id > after)
+        rows = query.order_by(EC2InstanceModel.instance_id).limit(limit + 1).all()
+        items = [dict(zip(EC2_ROW_COLUMNS, row)) for row in rows[:limit]]
+        return {
+            "items": items,
+            "total": total,
+            "next_after": items[-1]["instance_id"] if len(rows) > limit else None,
+        }
+
+    def _apply_filters(self, query, filters: EC2Filters):
+        """Apply EC2Filters to a query over EC2InstanceModel (or its columns)."""
+        if filters.account_id:
+            # A friendly account name or an account ID in any form resolves to canonical IDs
+            from .aws_account_store import AWSAccountStore
+            ids = account_ids(filters.account_id, AWSAccountStore(self.db).get_account_ids_by_name())
+            query = query.filter(EC2InstanceModel.account_id.in_(ids or [filters.account_id]))
+        if filters.region:
+            query = query.filter(func.lower(EC2InstanceModel.region) == filters.region.lower())
+        if filters.state:
+            query = query.filter(func.lower(EC2InstanceModel.state) == filters.state.lower())
+        if filters.instance_type:
+            query = query.filter(EC2InstanceModel.instance_type == filters.instance_type)
+        if filters.platform:
+            query = query.filter(func.lower(EC2InstanceModel.platform) == filters.platform.lower())
+        if filters.search:
+            text = filters.search.lower()
+            query = query.filter(
+                or_(
+                    func.lower(EC2InstanceModel.instance_id).contains(text, autoescape=True),
+                    func.lower(EC2InstanceModel.name).contains(text, autoescape=True),
+                    func.lower(EC2InstanceModel.private_ip_address).contains(text, autoescape=True),
+                    func.lower(EC2InstanceModel.public_ip_address).contains(text, autoescape=True),
+                )
+            )
+        for tag in filters.tags:
+            # Both forms are answered by the GIN index on tags
+            if "=" in tag:
+                key, value = tag.split("=", 1)
+                query = query.filter(EC2InstanceModel.tags.contains({key: value}))
+            else:
+                query = query.filter(EC2InstanceModel.tags.has_key(tag))
+        return query
+
+    def stats(self, filters: EC2Filters) -> Dict[str, Any]:
+        """
+        Instance count and EBS total per account, region, state, instance type and platform,
+        plus the overall totals, from one GROUPING SETS query.
+        """
+        columns = [getattr(EC2InstanceModel, name) for name in EC2_STATS_DIMENSIONS]
+        query = self._apply_filters(
+            self.db.query(
+                *columns,
+                func.grouping(*columns),
+                func.count(EC2InstanceModel.id),
+                func.coalesce(func.sum(EC2InstanceModel.total_ebs_size), 0),
+            ),
+            filters,
+        ).group_by(func.grouping_sets(*[tuple_(column) for column in columns], tuple_()))
+
+        n = len(EC2_STATS_DIMENSIONS)
+        everything = (1 << n) - 1
+        result: Dict[str, Any] = {f"by_{name}": {} for name in EC2_STATS_DIMENSIONS}
+        result.update(total=0, total_ebs_gb=0)
+        for row in query:
+            values, grouped, count, ebs = row[:n], row[n], row[n + 1], row[n + 2]
+            if grouped == everything:
+                result["total"] = count
+                result["total_ebs_gb"] = int(ebs)
+                continue
+            # grouping() sets the bit of every column a row is not grouped by, first column highest
+            i = next(k for k in range(n) if not grouped & (1 << (n - 1 - k)))
+            result[f"by_{EC2_STATS_DIMENSIONS[i]}"][values[i] or "unknown"] = count
+
+        from .aws_account_store import AWSAccountStore
+        account_names = AWSAccountStore(self.db).get_account_names_map()
+        result["account_names"] = {
+            account: account_names.get(account) or account_names.get(account.lstrip("0"), account)
+            for account in result["by_account_id"]
+        }
+        return result
+
+    def get(self, instance_id: str) -> Optional[EC2Instance]:
+        """Get an instance by its row id or its EC2 instance ID."""
+        instance = self.db.query(EC2InstanceModel).filter(
+            or_(EC2InstanceModel.id == instance_id, EC2InstanceModel.instance_id == instance_id)
+        ).first()
+        if not instance:
+            return None
+        return self._model_to_schema(instance)
+
+    def create(self, data: EC2InstanceCreate) -> EC2Instance:
+        """Create a new instance record, storing its canonical account ID like CSV imports do."""
+        values = data.model_dump()
+        values["account_id"] = recover_account_id(data.account_id, data.iam_instance_profile, *data.tags.values())
+        instance = EC2InstanceModel(**values)
+        self.db.add(instance)
+        bump_generation(self.db)
+        self.db.commit()
+        self.db.refresh(instance)
+        return self._model_to_schema(instance)
+
+    def upsert_bulk(self, instances: Iterable[EC2InstanceCreate]) -> int:
+        """
+        Insert instances with COPY, updating the stored row when an instance_id already
+        exists, so re-importing an export refreshes it. Returns rows inserted or updated.
+        """
+        written = copy_rows_upsert(
+            self.db, "ec2_instances", EC2_INSTANCE_COLUMNS, (ec2_instance_row(i) for i in instances), "instance_id"
+        )
+        if written:
+            bump_generation(self.db)
+        self.db.commit()
+        return written
+
+    def delete(self, instance_id: str) -> bool:
+        """Delete an instance by its row id or its EC2 instance ID."""
+        result = self.db.query(EC2InstanceModel).filter(
+            or_(EC2InstanceModel.id == instance_id, EC2InstanceModel.instance_id == instance_id)
+        ).delete()
+        if result:
+            bump_generation(self.db)
+        self.db.commit()
+        return result > 0
+
+    def purge_all(self) -> int:
+        """Delete all instance records."""
+        count = self.db.query(EC2InstanceModel).delete()
+        bump_generation(self.db)
+        self.db.commit()
+        return count
+
+    def get_filter_options(self) -> dict:
+        """Get available filter options."""
+        return _filter_options.get(self.db)
+
+    def _model_to_schema(self, instance: EC2InstanceModel) -> EC2Instance:
+        """Convert SQLAlchemy model to Pydantic schema."""
+        return EC2Instance(**{name: getattr(instance, name) for name in EC2_ROW_COLUMNS})
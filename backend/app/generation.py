@@ -0,0 +1,93 @@
+"""
+Inventory generation counter.
+
+A single-row table holding a number that every inventory write increments inside its
+own transaction. Read endpoints use it as their ETag and as part of response cache keys,
+so anything cached under an older generation is never served again.
+"""
+import os
+import threading
+import time
+from typing import Any, Callable, Optional
+
+from sqlalchemy import BigInteger, Column, Integer, event
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.orm import Session
+
+from .database import Base
+
+# How long a process trusts its last read of the counter. Writes made through this
+# process are seen immediately; writes from other workers within this many seconds.
+GENERATION_CHECK_SECONDS = float(os.getenv("GENERATION_CHECK_SECONDS", "1"))
+
+
+class InventoryGeneration(Base):
+    __tablename__ = "inventory_generation"
+
+    id = Column(Integer, primary_key=True)
+    generation = Column(BigInteger, nullable=False, default=0)
+
+
+_lock = threading.Lock()
+_known: Optional[int] = None
+_checked_at = 0.0
+
+
+def _forget(_session: Session) -> None:
+    global _known
+    with _lock:
+        _known = None
+
+
+def bump_generation(db: Session) -> None:
+    """
+    Increment the counter within db's current transaction. The new value becomes
+    visible when the caller commits, at which point this process re-reads it.
+    """
+    # Upsert so a missing counter row (e.g. a freshly created schema) starts counting instead of staying at 0
+    statement = insert(InventoryGeneration).values(id=1, generation=1)
+    db.execute(statement.on_conflict_do_update(
+        index_elements=[InventoryGeneration.id],
+        set_={"generation": InventoryGeneration.generation + 1},
+    ))
+    event.listen(db, "after_commit", _forget, once=True)
+
+
+def current_generation(db: Session) -> int:
+    """Return the inventory generation, re-reading it at most every GENERATION_CHECK_SECONDS."""
+    global _known, _checked_at
+    now = time.monotonic()
+    with _lock:
+        if _known is not None and now - _checked_at < GENERATION_CHECK_SECONDS:
+            return _known
+    value = db.query(InventoryGeneration.generation).filter(InventoryGeneration.id == 1).scalar() or 0
+    with _lock:
+        _known = value
+        _checked_at = now
+    return value
+
+
+class GenerationCache:
+    """
+    One value derived from the inventory, kept until the generation moves. Every write path
+    bumps the generation, so the value is reloaded on first use after any write.
+    """
+
+    def __init__(self, load: Callable[[Session], Any]):
+        self.load = load
+        self._lock = threading.Lock()
+        self._generation: Optional[int] = None
+        self._value: Any = None
+        self.loads = 0
+
+    def get(self, db: Session) -> Any:
+        generation = current_generation(db)
+        if self._generation == generation:
+            return self._value
+        with self._lock:
+            if self._generation != generation:
+                # Tagged with the generation read before loading, so a concurrent write forces another load
+                self._value = self.load(db)
+                self._generation = generation
+                self.loads += 1
+            return self._value
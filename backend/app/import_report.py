@@ -0,0 +1,101 @@
+"""Bounded import reports: per-reason counts and a small inline sample, full detail on disk."""
+import gzip
+import json
+import os
+import tempfile
+import time
+import uuid
+from typing import Any, Dict, List, Optional
+
+IMPORT_REPORT_DIR = os.getenv(
+    "IMPORT_REPORT_DIR",
+    os.path.join(tempfile.gettempdir(), "cloud-db-inventory-import-reports"),
+)
+IMPORT_REPORT_TTL_SECONDS = int(os.getenv("IMPORT_REPORT_TTL_SECONDS", str(7 * 24 * 3600)))
+# Rows per category returned inline in the import response
+IMPORT_REPORT_SAMPLE_SIZE = int(os.getenv("IMPORT_REPORT_SAMPLE_SIZE", "20"))
+# Distinct reasons tracked per category before the rest are counted as "Other"
+MAX_REASONS = 50
+
+CATEGORIES = ("skipped", "duplicates", "deleted")
+
+
+def _reason_key(reason: str) -> str:
+    # Validation errors carry multi-line details; aggregate on the first line only
+    return str(reason).split("\n", 1)[0][:200]
+
+
+class ImportReport:
+    """
+    Collects skipped, duplicate and deleted rows for one import.
+    Every entry is streamed to a gzip-compressed NDJSON file named after import_id;
+    in memory only the counts per reason and the first few entries are kept.
+    """
+
+    def __init__(self, directory: str = IMPORT_REPORT_DIR, sample_size: int = IMPORT_REPORT_SAMPLE_SIZE):
+        self.import_id = uuid.uuid4().hex
+        self.directory = directory
+        self.path = os.path.join(directory, f"{self.import_id}.ndjson.gz")
+        self.sample_size = sample_size
+        self.totals: Dict[str, int] = {c: 0 for c in CATEGORIES}
+        self.by_reason: Dict[str, Dict[str, int]] = {c: {} for c in CATEGORIES}
+        self.samples: Dict[str, List[Dict[str, Any]]] = {c: [] for c in CATEGORIES}
+        self._file = None
+
+    def add(self, category: str, entry: Dict[str, Any], reason: Optional[str] = None) -> None:
+        if self._file is None:
+            os.makedirs(self.directory, exist_ok=True)
+            self._file = gzip.open(self.path, "wt", encoding="utf-8")
+        self._file.write(json.dumps({"category": category, **entry}, default=str) + "\n")
+
+        self.totals[category] += 1
+        key = _reason_key(reason or entry.get("reason") or entry.get("error") or "unknown")
+        counts = self.by_reason[category]
+        if key not in counts and len(counts) >= MAX_REASONS:
+            key = "Other"
+        counts[key] = counts.get(key, 0) + 1
+        if len(self.samples[category]) < self.sample_size:
+            self.samples[category].append(entry)
+
+    def close(self) -> None:
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+    @property
+    def has_entries(self) -> bool:
+        return any(self.totals.values())
+
+    def summary(self) -> Dict[str, Any]:
+        """Fields merged into the import response."""
+        result: Dict[str, Any] = {"import_id": self.import_id if self.has_entries else None}
+        if self.has_entries:
+            result["report_url"] = f"/api/imports/{self.import_id}/report"
+        for category in CATEGORIES:
+            result[f"{category}_by_reason"] = self.by_reason[category]
+            result[f"{category}_details"] = self.samples[category]
+        return result
+
+
+def report_path(import_id: str, directory: str = IMPORT_REPORT_DIR) -> str:
+    """Return the report file for import_id; KeyError if it does not exist."""
+    if not import_id or os.path.basename(import_id) != import_id or import_id.startswith("."):
+        raise KeyError(import_id)
+    path = os.path.join(directory, f"{import_id}.ndjson.gz")
+    if not os.path.exists(path):
+        raise KeyError(import_id)
+    return path
+
+
+def purge_expired_reports(directory: str = IMPORT_REPORT_DIR) -> int:
+    """Delete reports older than IMPORT_REPORT_TTL_SECONDS."""
+    if not os.path.isdir(directory):
+        return 0
+    cutoff = time.time() - IMPORT_REPORT_TTL_SECONDS
+    removed = 0
+    for name in os.listdir(directory):
+        path = os.path.join(directory, name)
+        if name.endswith(".ndjson.gz") and os.path.getmtime(path) < cutoff:
+            os.remove(path)
+            removed += 1
+    return removed
@@ -1,10 +1,28 @@
-from fastapi import Depends, FastAPI, File, Form, HTTPException, UploadFile, Query
+from fastapi import Depends, FastAPI, File, Form, Header, HTTPException, Request, UploadFile, Query
 from contextlib import asynccontextmanager
+from datetime import date
+from fastapi.concurrency import run_in_threadpool
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import FileResponse, Response
 from sqlalchemy.orm import Session
-from typing import Optional
+from typing import IO, Any, Callable, Literal, Optional
+import asyncio
+import io
+import ipaddress
+import tarfile
+import time
+import zipfile
 
-from .csv_parser import parse_csv_with_report
+from .batch_import import iter_upload_members, run_batch_import, shutdown_pool
+from .compression import UnsupportedCompression, open_decompressed, open_text
+from .csv_parser import iter_csv_rows, preflight_csv
+from .import_report import ImportReport, purge_expired_reports, report_path
+from .generation import current_generation
+from .read_model import read_model
+from .response_cache import ResponseCache
+from .responses import dumps
+from .single_flight import SingleFlight
+from .summary import SUMMARY_REFRESH_ENABLED, run_summary_refresher
 from .database import get_db, init_db
 from .schemas import (
     DatabaseProvider,
@@ -16,14 +34,25 @@ from .schemas import (
     AzureVM,
     AzureVMCreate,
     AzureVMFilters,
+    EC2Filters,
+    EC2Instance,
+    EC2InstanceCreate,
     AWSAccount,
     AWSAccountCreate,
+    UpgradePolicy,
+    UpgradePolicyCreate,
+    UploadFinalize,
+    UploadSessionCreate,
 )
-from .store import InventoryStore
-from .vm_store import AzureVMStore
-from .vm_csv_parser import parse_azure_vm_csv
+from .store import ROLLUP_DIMENSIONS, ROLLUP_MEASURES, STORAGE_TOP_DIMENSIONS, InventoryStore
+from .vm_store import VM_ANALYTICS_DIMENSIONS, VM_TOP_DIMENSIONS, AzureVMStore
+from .vm_csv_parser import iter_azure_vm_csv
+from .ec2_store import EC2Store
+from .ec2_csv_parser import iter_ec2_csv
 from .aws_account_store import AWSAccountStore
 from .aws_account_parser import parse_aws_account_csv
+from .upload_sessions import MAX_CHUNK_BYTES, UploadSessionStore
+from .upgrade_policy_store import UpgradePolicyStore
 # Import models to register them with SQLAlchemy Base
 from .aws_account_models import AWSAccountModel
 
@@ -34,10 +63,17 @@ async def lifespan(app: FastAPI):
     db = next(get_db())
     try:
         InventoryStore(db).bootstrap()
+        # Warm the filter dropdown caches so the first page load doesn't pay for them
+        InventoryStore(db).get_filter_options()
+        AzureVMStore(db).get_filter_options()
+        EC2Store(db).get_filter_options()
     finally:
         db.close()
+    refresher = asyncio.create_task(run_summary_refresher()) if SUMMARY_REFRESH_ENABLED else None
     yield
-    # Shutdown tasks can be added here
+    if refresher is not None:
+        refresher.cancel()
+    shutdown_pool()
 
 app = FastAPI(
     title="Cloud DB Inventory",
@@ -58,38 +94,126 @@ app.add_middleware(
 # (Startup handled by lifespan context.)
 
 
+# Read endpoints are served through the inventory generation (bumped by every store write):
+# the generation is the ETag, and encoded bodies are cached per (path, filters, generation)
+response_cache = ResponseCache()
+read_flights = SingleFlight()
+
+
+def _cached_response(request: Request, db: Session, build: Callable[[], Any], dated: bool = False) -> Response:
+    """
+    Answer If-None-Match with 304 when the inventory has not changed, otherwise serve the
+    encoded result of build() from the response cache, computing it on a miss. dated marks
+    results that also depend on the current date (upgrade policies come into force on their
+    eol_date), which then becomes part of the ETag and cache key.
+    """
+    generation = current_generation(db)
+    today = date.today().isoformat() if dated else None
+    etag = f'"inv-{generation}-{today}"' if dated else f'"inv-{generation}"'
+    headers = {"ETag": etag, "Cache-Control": "no-cache"}
+    if_none_match = request.headers.get("if-none-match", "")
+    client_etags = {tag.strip().removeprefix("W/") for tag in if_none_match.split(",")}
+    if etag in client_etags or "*" in client_etags:
+        return Response(status_code=304, headers=headers)
+
+    # Empty query values behave like absent filters, and parameter order is irrelevant
+    key = (request.url.path, tuple(sorted((k, v) for k, v in request.query_params.multi_items() if v != "")), today)
+    body = response_cache.get(key, generation)
+    if body is None:
+        # End the generation read's transaction so requests waiting on another in-flight
+        # computation of the same response do not hold a pooled connection meanwhile
+        db.rollback()
+
+        def compute() -> bytes:
+            encoded = dumps(build())
+            response_cache.put(key, generation, encoded)
+            return encoded
+
+        # Identical concurrent misses (e.g. a dashboard opened by many users after an import)
+        # share one computation
+        body = read_flights.do((key, generation), compute)
+    return Response(body, media_type="application/json", headers=headers)
+
+
+def _detail_filters(
+    iops_min: Optional[int] = Query(None, ge=0),
+    iops_max: Optional[int] = Query(None, ge=0),
+    backup_retention_days_min: Optional[int] = Query(None, ge=0),
+    backup_retention_days_max: Optional[int] = Query(None, ge=0),
+    auto_scaling: Optional[bool] = Query(None),
+    replica: Optional[bool] = Query(None),
+    geo_redundant_backup: Optional[bool] = Query(None),
+) -> dict:
+    """Range and flag filters on the typed detail columns, as InventoryFilters keyword arguments."""
+    return {
+        "iops_min": iops_min,
+        "iops_max": iops_max,
+        "backup_retention_days_min": backup_retention_days_min,
+        "backup_retention_days_max": backup_retention_days_max,
+        "auto_scaling": auto_scaling,
+        "replica": replica,
+        "geo_redundant_backup": geo_redundant_backup,
+    }
+
+
+def _inventory_filters(
+    provider: Optional[DatabaseProvider] = Query(None),
+    status: Optional[DatabaseStatus] = Query(None),
+    region: Optional[str] = Query(None),
+    engine: Optional[str] = Query(None),
+    version: Optional[str] = Query(None),
+    subscription: Optional[str] = Query(None),
+    search: Optional[str] = Query(None),
+    endpoint_suffix: Optional[str] = Query(None),
+    tag: list[str] = Query([]),
+    tag_match: Literal["all", "any"] = Query("all"),
+    details: dict = Depends(_detail_filters),
+) -> InventoryFilters:
+    """The inventory filters shared by the database list and aggregate endpoints."""
+    return InventoryFilters(
+        provider=provider,
+        status=status,
+        region=region,
+        engine=engine,
+        version=version,
+        subscription=subscription,
+        search=search,
+        endpoint_suffix=endpoint_suffix,
+        tags=tag,
+        tag_match=tag_match,
+        **details,
+    )
+
+
 @app.get("/health")
 def health() -> dict:
     return {"status": "ok"}
 
 
+@app.get("/api/cache-stats", response_model=dict)
+def get_cache_stats() -> dict:
+    """Hit/miss counters and size of the in-process response cache, read coalescing and read model counters."""
+    return {**response_cache.stats(), "single_flight": read_flights.stats(), "read_model": read_model.stats()}
+
+
 @app.get("/api/databases", response_model=list[DatabaseRecord])
 def list_databases(
-    provider: str | None = None,
-    region: str | None = None,
-    status: str | None = None,
-    engine: str | None = None,
-    version: str | None = None,
-    subscription: str | None = None,
-    search: str | None = None,
+    request: Request,
+    filters: InventoryFilters = Depends(_inventory_filters),
     exclude_stopped: bool = False,
     db: Session = Depends(get_db),
-) -> list[DatabaseRecord]:
-    filters = InventoryFilters(
-        provider=DatabaseProvider(provider) if provider else None,
-        region=region,
-        status=DatabaseStatus(status) if status else None,
-        engine=engine,
-        version=version,
-        subscription=subscription,
-        search=search,
-    )
-    store = InventoryStore(db)
-    records = store.list(filters)
-    # If exclude_stopped is true, filter out stopped records
-    if exclude_stopped:
-        records = [r for r in records if r.status != DatabaseStatus.stopped]
-    return records
+) -> Response:
+    def build():
+        store = InventoryStore(db)
+        # Rows are built already shaped like DatabaseRecord and encoded directly,
+        # skipping response_model re-validation for large fleets
+        records = store.list_rows(filters)
+        # If exclude_stopped is true, filter out stopped records
+        if exclude_stopped:
+            records = [r for r in records if r["status"] != DatabaseStatus.stopped.value]
+        return records
+
+    return _cached_response(request, db, build)
 
 
 @app.post("/api/databases", response_model=DatabaseRecord, status_code=201)
@@ -147,139 +271,117 @@ def purge_databases(db: Session = Depends(get_db)) -> dict:
 
 @app.get("/api/stats", response_model=StatsResponse)
 def get_stats(
-    provider: Optional[str] = Query(None),
-    status: Optional[str] = Query(None),
-    region: Optional[str] = Query(None),
-    engine: Optional[str] = Query(None),
-    version: Optional[str] = Query(None),
-    subscription: Optional[str] = Query(None),
-    search: Optional[str] = Query(None),
+    request: Request,
+    filters: InventoryFilters = Depends(_inventory_filters),
     exclude_stopped: bool = Query(False),
     db: Session = Depends(get_db)
-) -> StatsResponse:
-    store = InventoryStore(db)
-    filters = InventoryFilters(
-        provider=provider,
-        status=status,
-        region=region,
-        engine=engine,
-        version=version,
-        subscription=subscription,
-        search=search
-    )
-    stats = store.stats(filters)
-    # If exclude_stopped is true, update stats to exclude stopped records
-    if exclude_stopped:
-        records = store.list(filters)
-        filtered_records = [r for r in records if r.status != DatabaseStatus.stopped]
-        # Recalculate stats from filtered records
-        stats = {
-            "total": len(filtered_records),
-            "by_provider": {},
-            "by_status": {},
-            "storage_gb_total": 0,
-        }
-        for record in filtered_records:
-            stats["storage_gb_total"] += record.storage_gb
-            provider_key = record.provider.value if hasattr(record.provider, 'value') else str(record.provider)
-            stats["by_provider"][provider_key] = stats["by_provider"].get(provider_key, 0) + 1
-            status_key = record.status.value if hasattr(record.status, 'value') else str(record.status)
-            stats["by_status"][status_key] = stats["by_status"].get(status_key, 0) + 1
-    return StatsResponse(**stats)
+) -> Response:
+    def build():
+        store = InventoryStore(db)
+        stats = store.stats(filters, exclude_stopped)
+        return StatsResponse(**stats)
+
+    return _cached_response(request, db, build)
+
+
+@app.get("/api/dashboard", response_model=dict)
+def get_dashboard(
+    request: Request,
+    filters: InventoryFilters = Depends(_inventory_filters),
+    exclude_stopped: bool = Query(False),
+    db: Session = Depends(get_db)
+) -> Response:
+    """
+    Everything the dashboard page shows in one response: stats, RDBMS/version metrics,
+    upgrade counts and cost totals, all computed from the same snapshot with the same filters.
+    """
+    def build():
+        return InventoryStore(db).dashboard(filters, exclude_stopped)
+
+    return _cached_response(request, db, build, dated=True)
 
 
 @app.get("/api/metrics", response_model=dict)
-def get_metrics(exclude_stopped: bool = Query(False), db: Session = Depends(get_db)) -> dict:
+def get_metrics(request: Request, exclude_stopped: bool = Query(False), db: Session = Depends(get_db)) -> Response:
     """Dashboard metrics: counts by RDBMS and version breakdown."""
-    store = InventoryStore(db)
-    metrics = store.metrics()
-    
-    # If exclude_stopped is true, filter out stopped records from metrics
-    if exclude_stopped:
-        from sqlalchemy import func as sa_func
-        from .models import DatabaseRecord as DatabaseRecordModel
-        
-        # Get all records and filter out stopped ones
-        query = db.query(DatabaseRecordModel)
-        all_records = query.all()
-        filtered_records = [r for r in all_records if r.status != "stopped"]
-        
-        # Recalculate metrics from filtered records
-        def normalize_engine(name: str) -> str:
-            n = (name or "").lower()
-            if "postgre" in n:
-                return "postgres"
-            if "mysql" in n:
-                return "mysql"
-            if "mssql" in n or "sql server" in n or "sqlserver" in n:
-                return "mssql"
-            return "unknown"
-        
-        rdbms_counts = {"postgres": 0, "mysql": 0, "mssql": 0}
-        version_counts = {"postgres": {}, "mysql": {}, "mssql": {}}
-        
-        for record in filtered_records:
-            engine = normalize_engine(record.engine)
-            if engine in rdbms_counts:
-                rdbms_counts[engine] += 1
-                
-                # Count by version
-                version = record.version or "unknown"
-                if version not in version_counts[engine]:
-                    version_counts[engine][version] = 0
-                version_counts[engine][version] += 1
-        
-        metrics["rdbms_counts"] = rdbms_counts
-        metrics["version_counts"] = version_counts
-    
-    return metrics
+    def build():
+        return InventoryStore(db).metrics(exclude_stopped)
+
+    return _cached_response(request, db, build)
 
 
 @app.get("/api/upgrades", response_model=dict)
 def get_upgrades(
+    request: Request,
     provider: Optional[str] = Query(None),
     engine: Optional[str] = Query(None),
     version: Optional[str] = Query(None),
     subscription: Optional[str] = Query(None),
     status: Optional[str] = Query(None),
+    endpoint_suffix: Optional[str] = Query(None),
     exclude_stopped: bool = Query(False),
+    limit: Optional[int] = Query(None, ge=0, le=5000, description="Page size; omit for every database, 0 for counts only"),
+    after: Optional[str] = Query(None, description="next_after from the previous page"),
     db: Session = Depends(get_db)
-) -> dict:
-    """Get databases needing version upgrades with optional filters."""
-    filters = InventoryFilters(
-        provider=DatabaseProvider(provider) if provider else None,
-        engine=engine,
-        version=version,
-        subscription=subscription,
-        status=DatabaseStatus(status) if status else None,
-    )
-    store = InventoryStore(db)
-    result = store.upgrades_needed(filters)
-    
-    # If exclude_stopped is true, filter out stopped records from results
-    if exclude_stopped:
-        result["databases"] = [r for r in result["databases"] if r.status != DatabaseStatus.stopped]
-        result["total"] = len(result["databases"])
-        
-        # Recalculate by_engine counts
-        result["by_engine"] = {"postgres": 0, "mysql": 0, "mssql": 0}
-        for db_rec in result["databases"]:
-            engine_key = db_rec.engine.lower()
-            if "postgre" in engine_key:
-                result["by_engine"]["postgres"] += 1
-            elif "mysql" in engine_key:
-                result["by_engine"]["mysql"] += 1
-            elif "mssql" in engine_key or "sql server" in engine_key:
-                result["by_engine"]["mssql"] += 1
-    
-    return result
+) -> Response:
+    """Get databases below the minimum version of an upgrade policy in force, with optional filters."""
+    def build():
+        filters = InventoryFilters(
+            provider=DatabaseProvider(provider) if provider else None,
+            engine=engine,
+            version=version,
+            subscription=subscription,
+            status=DatabaseStatus(status) if status else None,
+            endpoint_suffix=endpoint_suffix,
+        )
+        return InventoryStore(db).upgrades_needed(filters, exclude_stopped, limit, after)
+
+    return _cached_response(request, db, build, dated=True)
+
+
+@app.get("/api/upgrade-policies", response_model=list[UpgradePolicy])
+def list_upgrade_policies(db: Session = Depends(get_db)) -> list[UpgradePolicy]:
+    """List upgrade policies."""
+    return UpgradePolicyStore(db).list()
+
+
+@app.post("/api/upgrade-policies", response_model=UpgradePolicy)
+def create_upgrade_policy(policy: UpgradePolicyCreate, db: Session = Depends(get_db)) -> UpgradePolicy:
+    """Create an upgrade policy."""
+    try:
+        return UpgradePolicyStore(db).create(policy)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e)) from None
+
+
+@app.put("/api/upgrade-policies/{policy_id}", response_model=UpgradePolicy)
+def update_upgrade_policy(policy_id: str, policy: UpgradePolicyCreate, db: Session = Depends(get_db)) -> UpgradePolicy:
+    """Update an upgrade policy."""
+    try:
+        updated = UpgradePolicyStore(db).update(policy_id, policy)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e)) from None
+    if not updated:
+        raise HTTPException(status_code=404, detail="Upgrade policy not found")
+    return updated
+
+
+@app.delete("/api/upgrade-policies/{policy_id}")
+def delete_upgrade_policy(policy_id: str, db: Session = Depends(get_db)) -> dict:
+    """Delete an upgrade policy."""
+    if not UpgradePolicyStore(db).delete(policy_id):
+        raise HTTPException(status_code=404, detail="Upgrade policy not found")
+    return {"message": "Upgrade policy deleted successfully"}
 
 
 @app.get("/api/duplicates", response_model=dict)
-def get_duplicates(db: Session = Depends(get_db)) -> dict:
+def get_duplicates(request: Request, db: Session = Depends(get_db)) -> Response:
     """Get potential duplicate records by provider+service+region."""
-    store = InventoryStore(db)
-    return store.find_duplicates()
+    def build():
+        store = InventoryStore(db)
+        return store.find_duplicates()
+
+    return _cached_response(request, db, build)
 
 @app.post("/api/duplicates/resolve", response_model=dict)
 def resolve_duplicates(db: Session = Depends(get_db)) -> dict:
@@ -293,41 +395,137 @@ def resolve_duplicates(db: Session = Depends(get_db)) -> dict:
 
 @app.get("/api/filter-options", response_model=dict)
 def get_filter_options(
+    request: Request,
     provider: Optional[str] = Query(None),
     db: Session = Depends(get_db)
-) -> dict:
+) -> Response:
     """Get unique values for filter dropdowns, optionally filtered by provider."""
-    store = InventoryStore(db)
-    provider_enum = DatabaseProvider(provider) if provider else None
-    return store.get_filter_options(provider_enum)
+    def build():
+        store = InventoryStore(db)
+        provider_enum = DatabaseProvider(provider) if provider else None
+        return store.get_filter_options(provider_enum)
+
+    return _cached_response(request, db, build)
+
+
+@app.get("/api/facets", response_model=dict)
+def get_facets(
+    request: Request,
+    filters: InventoryFilters = Depends(_inventory_filters),
+    exclude_stopped: bool = Query(False),
+    db: Session = Depends(get_db)
+) -> Response:
+    """Record count per value of each filter dimension, each counted under the other active filters."""
+    def build():
+        store = InventoryStore(db)
+        return store.facets(filters, exclude_stopped)
+
+    return _cached_response(request, db, build)
+
+
+@app.get("/api/tags", response_model=dict)
+def get_tags(
+    request: Request,
+    prefix: Optional[str] = Query(None),
+    limit: int = Query(100, ge=1, le=10000),
+    db: Session = Depends(get_db)
+) -> Response:
+    """Distinct database tags with record counts, most common first."""
+    def build():
+        return InventoryStore(db).tag_counts(prefix, limit)
+
+    return _cached_response(request, db, build)
+
+
+@app.get("/api/endpoint-domains", response_model=dict)
+def get_endpoint_domains(
+    request: Request,
+    depth: int = Query(3, ge=1, le=16),
+    suffix: Optional[str] = Query(None),
+    limit: int = Query(100, ge=1, le=10000),
+    db: Session = Depends(get_db)
+) -> Response:
+    """Record counts and storage per endpoint domain (the last depth labels), optionally under suffix."""
+    def build():
+        return InventoryStore(db).endpoint_domains(depth, suffix, limit)
+
+    return _cached_response(request, db, build)
+
+
+@app.get("/api/rollup", response_model=dict)
+def get_rollup(
+    request: Request,
+    group_by: list[str] = Query(..., description=f"One or more of: {', '.join(ROLLUP_DIMENSIONS)}"),
+    measure: list[str] = Query(list(ROLLUP_MEASURES), description=f"Any of: {', '.join(ROLLUP_MEASURES)}"),
+    mode: Literal["rollup", "cube"] = Query("rollup"),
+    filters: InventoryFilters = Depends(_inventory_filters),
+    exclude_stopped: bool = Query(False),
+    db: Session = Depends(get_db)
+) -> Response:
+    """
+    Record count, storage and cost per combination of the group_by dimensions, with
+    ROLLUP (hierarchical) or CUBE (all combinations) subtotals, under the inventory filters.
+    """
+    def build():
+        return InventoryStore(db).rollup(group_by, measure, filters, exclude_stopped, mode)
+
+    try:
+        return _cached_response(request, db, build)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e)) from None
+
+
+@app.get("/api/storage-distribution", response_model=dict)
+def get_storage_distribution(
+    request: Request,
+    top: int = Query(10, ge=1, le=100),
+    top_by: Optional[str] = Query(None, description=f"Rank within each value of one of: {', '.join(STORAGE_TOP_DIMENSIONS)}"),
+    filters: InventoryFilters = Depends(_inventory_filters),
+    exclude_stopped: bool = Query(False),
+    db: Session = Depends(get_db)
+) -> Response:
+    """
+    storage_gb histogram, p50/p90/p99 and the largest databases (overall or per top_by value)
+    under the inventory filters, computed in SQL.
+    """
+    if top_by is not None and top_by not in STORAGE_TOP_DIMENSIONS:
+        raise HTTPException(status_code=400, detail=f"Unknown dimension: {top_by}")
+
+    def build():
+        return InventoryStore(db).storage_distribution(filters, exclude_stopped, top, top_by)
+
+    return _cached_response(request, db, build)
 
 
 @app.get("/api/pricing", response_model=dict)
-def get_pricing(exclude_stopped: bool = Query(False), db: Session = Depends(get_db)) -> dict:
+def get_pricing(request: Request, exclude_stopped: bool = Query(False), db: Session = Depends(get_db)) -> Response:
     """Get pricing estimates for all database instances."""
-    store = InventoryStore(db)
-    pricing_data = store.calculate_pricing()
+    def build():
+        store = InventoryStore(db)
+        pricing_data = store.calculate_pricing()
     
-    # If exclude_stopped is true, filter out stopped records
-    if exclude_stopped:
-        pricing_data["databases"] = [
-            db_rec for db_rec in pricing_data["databases"] 
-            if db_rec.get("status") != "stopped"
-        ]
+        # If exclude_stopped is true, filter out stopped records
+        if exclude_stopped:
+            pricing_data["databases"] = [
+                db_rec for db_rec in pricing_data["databases"] 
+                if db_rec.get("status") != "stopped"
+            ]
         
-        # Recalculate totals
-        total_hourly = sum(db_rec.get("hourly_cost", 0) for db_rec in pricing_data["databases"])
-        total_monthly = sum(db_rec.get("monthly_cost", 0) for db_rec in pricing_data["databases"])
+            # Recalculate totals
+            total_hourly = sum(db_rec.get("hourly_cost", 0) for db_rec in pricing_data["databases"])
+            total_monthly = sum(db_rec.get("monthly_cost", 0) for db_rec in pricing_data["databases"])
         
-        pricing_data["total_hourly"] = total_hourly
-        pricing_data["total_monthly"] = total_monthly
-        pricing_data["count"] = len(pricing_data["databases"])
+            pricing_data["total_hourly"] = total_hourly
+            pricing_data["total_monthly"] = total_monthly
+            pricing_data["count"] = len(pricing_data["databases"])
     
-    return pricing_data
+        return pricing_data
+
+    return _cached_response(request, db, build)
 
 
 @app.post("/api/databases/import-csv", response_model=dict)
-async def import_csv(
+def import_csv(
     file: UploadFile = File(...),
     provider: str = Form("AWS"),
     purge_first: bool = Form(False),
@@ -337,24 +535,49 @@ async def import_csv(
     """
     Import database inventory from CSV file.
     Supports AWS and Azure CSV exports with flexible column mapping.
+    The file may be uploaded gzip, bz2 or (if zstandard is installed) zstd compressed.
     """
     if provider not in ["AWS", "Azure"]:
         raise HTTPException(status_code=400, detail="Provider must be AWS or Azure")
 
     # Convert string to DatabaseProvider enum by value
     provider_enum = DatabaseProvider.aws if provider == "AWS" else DatabaseProvider.azure
+    return _import_database_csv(file.file, provider_enum, purge_first, sync, db)
+
 
+def _import_database_csv(
+    source: IO[bytes],
+    provider_enum: DatabaseProvider,
+    purge_first: bool,
+    sync: bool,
+    db: Session,
+) -> dict:
+    """
+    Parse and store a database CSV export (shared by direct and chunked uploads).
+    Skipped, duplicate and deleted rows go to an ImportReport: the response carries
+    per-reason counts and a small sample, the full list is downloadable by import_id.
+    """
+    purge_expired_reports()
+    report = ImportReport()
+    records = []
     try:
-        content = (await file.read()).decode("utf-8")
+        # Compressed uploads (gzip/bz2/zstd) are decompressed while the parser reads rows
+        for _, record, skip in iter_csv_rows(open_text(source), provider_enum):
+            if record is not None:
+                records.append(record)
+            else:
+                report.add("skipped", skip)
     except UnicodeDecodeError as e:
+        report.close()
         raise HTTPException(
             status_code=400,
             detail=f"Invalid file encoding. Please use UTF-8. Error: {str(e)}"
         )
-
-    try:
-        records, skipped = parse_csv_with_report(content, provider_enum)
+    except UnsupportedCompression as e:
+        report.close()
+        raise HTTPException(status_code=400, detail=str(e))
     except Exception as e:
+        report.close()
         import traceback
         error_trace = traceback.format_exc()
         error_detail = (
@@ -365,13 +588,14 @@ async def import_csv(
         raise HTTPException(status_code=400, detail=error_detail)
 
     if not records:
+        report.close()
         # Provide aggregated reasons for easier debugging
         missing_counts: dict[str, int] = {}
-        for item in skipped:
-            if item["reason"].startswith("Missing required fields"):
-                for field in item["reason"].split(":", 1)[1].strip().split(","):
+        for reason, count in report.by_reason["skipped"].items():
+            if reason.startswith("Missing required fields"):
+                for field in reason.split(":", 1)[1].strip().split(","):
                     field_name = field.strip()
-                    missing_counts[field_name] = missing_counts.get(field_name, 0) + 1
+                    missing_counts[field_name] = missing_counts.get(field_name, 0) + count
         detail_parts = [
             "No valid records found in CSV.",
             "Required columns for Azure: name (or Resource & Subscription), DB_Type, Location, FQDN.",
@@ -388,12 +612,13 @@ async def import_csv(
     if purge_first:
         store.purge_all()
     try:
-        created, duplicates = store.bulk_create(records)
+        created, duplicates = store.bulk_create_rows(records)
         # Only sync (delete records not in CSV) if explicitly requested
         deleted = []
         if sync:
             deleted = store.delete_records_not_in_csv(provider_enum, records)
     except Exception as e:
+        report.close()
         import traceback
         error_trace = traceback.format_exc()
         print(f"Database Save Error:\n{error_trace}")
@@ -402,41 +627,272 @@ async def import_csv(
         )
         raise HTTPException(status_code=500, detail=error_detail)
 
+    for item in duplicates:
+        report.add("duplicates", item)
+    for item in deleted:
+        report.add("deleted", item, reason="Not present in CSV (sync)")
+    report.close()
+
     return {
-        "message": f"Successfully imported {len(created)} database records",
-        "created": len(created),
-        "skipped": len(skipped),
+        "message": f"Successfully imported {created} database records",
+        "created": created,
+        "skipped": report.totals["skipped"],
         "duplicates": len(duplicates),
         "deleted": len(deleted),
-        "skipped_details": skipped,
-        "duplicates_details": duplicates,
-        "deleted_details": deleted,
+        **report.summary(),
     }
 
 
+@app.get("/api/imports/{import_id}/report")
+def get_import_report(import_id: str) -> FileResponse:
+    """Download every skipped/duplicate/deleted row of an import as gzip-compressed NDJSON."""
+    try:
+        path = report_path(import_id)
+    except KeyError:
+        raise HTTPException(status_code=404, detail="Import report not found") from None
+    return FileResponse(path, media_type="application/gzip", filename=f"import-{import_id}.ndjson.gz")
+
+
+# Only the head of an upload is inspected by the preflight check
+PREFLIGHT_BYTES = 64 * 1024
+
+
+@app.post("/api/databases/import-csv/preflight", response_model=dict)
+def preflight_import_csv(
+    file: Optional[UploadFile] = File(None),
+    header: Optional[str] = Form(None),
+    sample: Optional[str] = Form(None),
+    provider: str = Form("auto"),
+) -> dict:
+    """
+    Check an import before transferring it: send either the file (only its first 64 KB
+    are read; clients may send just a slice) or the header line plus optional sample rows.
+    Returns the resolved column mapping, provider, missing required fields and predicted skip reasons.
+    """
+    if provider not in ["AWS", "Azure", "auto"]:
+        raise HTTPException(status_code=400, detail="Provider must be AWS, Azure or auto")
+    started = time.perf_counter()
+
+    if file is not None:
+        try:
+            head = open_decompressed(file.file).read(PREFLIGHT_BYTES + 1)
+        except (OSError, EOFError, UnsupportedCompression) as e:
+            raise HTTPException(status_code=400, detail=f"Could not read upload: {str(e)}")
+        truncated = len(head) > PREFLIGHT_BYTES
+        text = head[:PREFLIGHT_BYTES].decode("utf-8-sig", errors="replace")
+        if truncated:
+            # Drop the partial last line
+            text = text[: text.rfind("\n") + 1]
+    elif header:
+        text = header.rstrip("\r\n") + "\n" + (sample or "")
+    else:
+        raise HTTPException(status_code=400, detail="Provide a file or a header line")
+
+    if not text.strip():
+        raise HTTPException(status_code=400, detail="No CSV header found in the first 64 KB")
+
+    provider_enum = DatabaseProvider(provider) if provider != "auto" else None
+    report = preflight_csv(io.StringIO(text), provider_enum)
+    report["elapsed_ms"] = round((time.perf_counter() - started) * 1000, 2)
+    return report
+
+
+@app.post("/api/databases/import-batch", response_model=dict)
+def import_csv_batch(
+    files: list[UploadFile] = File(...),
+    provider: str = Form("auto"),
+    db: Session = Depends(get_db),
+) -> dict:
+    """
+    Import many database CSV exports at once. Each upload may be a CSV or a
+    .zip/.tar.gz archive of CSVs. Files are parsed in parallel and each provider's
+    records are written in one transaction. provider=auto infers it per file from the header.
+    """
+    if provider not in ["AWS", "Azure", "auto"]:
+        raise HTTPException(status_code=400, detail="Provider must be AWS, Azure or auto")
+
+    def members():
+        for upload in files:
+            yield from iter_upload_members(upload.filename, upload.file)
+
+    try:
+        return run_batch_import(members(), provider, db)
+    except (zipfile.BadZipFile, tarfile.TarError) as e:
+        raise HTTPException(status_code=400, detail=f"Invalid archive: {str(e)}")
+
+
+# ============= Chunked Upload Endpoints =============
+# Large exports are sent as a session: create, PUT chunks by byte offset (in any order,
+# retrying as needed), then finalize to run the normal import on the assembled file.
+
+upload_sessions = UploadSessionStore()
+
+
+@app.post("/api/uploads", response_model=dict, status_code=201)
+def create_upload_session(payload: UploadSessionCreate) -> dict:
+    """Start a resumable upload session."""
+    try:
+        return upload_sessions.create(payload.filename, payload.total_size, payload.kind)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+
+@app.get("/api/uploads/{upload_id}", response_model=dict)
+def get_upload_session(upload_id: str) -> dict:
+    """Report received chunks and the next missing offset, so a client can resume."""
+    try:
+        return upload_sessions.status(upload_id)
+    except KeyError:
+        raise HTTPException(status_code=404, detail="Upload session not found") from None
+
+
+@app.put("/api/uploads/{upload_id}/chunks", response_model=dict)
+async def put_upload_chunk(
+    upload_id: str,
+    request: Request,
+    offset: int = Query(..., ge=0),
+    x_chunk_sha256: Optional[str] = Header(None),
+) -> dict:
+    """Store the raw request body as the chunk starting at offset (optional X-Chunk-SHA256 is verified)."""
+    too_large = HTTPException(status_code=413, detail=f"Chunk exceeds {MAX_CHUNK_BYTES} bytes")
+    declared = request.headers.get("content-length", "")
+    if declared.isdigit() and int(declared) > MAX_CHUNK_BYTES:
+        raise too_large
+    # Bodies without a Content-Length are cut off as soon as they pass the limit
+    data = bytearray()
+    async for part in request.stream():
+        data += part
+        if len(data) > MAX_CHUNK_BYTES:
+            raise too_large
+    try:
+        # Hashing and writing up to MAX_CHUNK_BYTES is blocking work, kept off the event loop
+        return await run_in_threadpool(upload_sessions.put_chunk, upload_id, offset, bytes(data), x_chunk_sha256)
+    except KeyError:
+        raise HTTPException(status_code=404, detail="Upload session not found") from None
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+
+@app.post("/api/uploads/{upload_id}/finalize", response_model=dict)
+def finalize_upload_session(
+    upload_id: str,
+    payload: UploadFinalize,
+    db: Session = Depends(get_db),
+) -> dict:
+    """Verify and assemble the chunks, then import the file. The session is removed after a successful import."""
+    try:
+        kind = upload_sessions.status(upload_id)["kind"]
+        path = upload_sessions.assemble(upload_id)
+    except KeyError:
+        raise HTTPException(status_code=404, detail="Upload session not found") from None
+    except ValueError as e:
+        raise HTTPException(status_code=409, detail=str(e))
+
+    with open(path, "rb") as source:
+        if kind == "azure-vms":
+            result = _import_azure_vm_csv(source, payload.purge_first, db)
+        elif kind == "ec2-instances":
+            result = _import_ec2_csv(source, payload.purge_first, db)
+        else:
+            result = _import_database_csv(source, payload.provider, payload.purge_first, payload.sync, db)
+    upload_sessions.delete(upload_id)
+    return result
+
+
+@app.delete("/api/uploads/{upload_id}", status_code=204)
+def delete_upload_session(upload_id: str) -> None:
+    """Abandon an upload session and delete its spooled chunks."""
+    try:
+        deleted = upload_sessions.delete(upload_id)
+    except KeyError:
+        deleted = False
+    if not deleted:
+        raise HTTPException(status_code=404, detail="Upload session not found")
+
+
 # ============= Azure VMs Endpoints =============
 
-@app.get("/api/azure-vms", response_model=list[AzureVM])
-def list_azure_vms(
+def _vm_filters(
     region: Optional[str] = Query(None),
     subscription: Optional[str] = Query(None),
     tenant_id: Optional[str] = Query(None),
     status: Optional[str] = Query(None),
     os_type: Optional[str] = Query(None),
     search: Optional[str] = Query(None),
-    db: Session = Depends(get_db),
-) -> list[AzureVM]:
-    """List Azure VMs with optional filters."""
-    store = AzureVMStore(db)
-    filters = AzureVMFilters(
+    cidr: Optional[str] = Query(None, description="Private IP within this network, e.g. 10.162.224.0/20"),
+    ip_from: Optional[str] = Query(None, description="Private IP at or above this address"),
+    ip_to: Optional[str] = Query(None, description="Private IP at or below this address"),
+) -> AzureVMFilters:
+    """Filters shared by the Azure VM read endpoints; network bounds are validated and normalized."""
+    try:
+        cidr = str(ipaddress.ip_network(cidr, strict=False)) if cidr else None
+        ip_from = str(ipaddress.ip_address(ip_from)) if ip_from else None
+        ip_to = str(ipaddress.ip_address(ip_to)) if ip_to else None
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e)) from None
+    return AzureVMFilters(
         region=region,
         subscription=subscription,
         tenant_id=tenant_id,
         status=status,
         os_type=os_type,
         search=search,
+        cidr=cidr,
+        ip_from=ip_from,
+        ip_to=ip_to,
     )
-    return store.list(filters)
+
+
+@app.get("/api/azure-vms", response_model=list[AzureVM])
+def list_azure_vms(
+    request: Request,
+    filters: AzureVMFilters = Depends(_vm_filters),
+    db: Session = Depends(get_db),
+) -> Response:
+    """List Azure VMs with optional filters."""
+    def build():
+        return AzureVMStore(db).list_rows(filters)
+
+    return _cached_response(request, db, build)
+
+
+@app.get("/api/azure-vms/analytics", response_model=dict)
+def get_azure_vm_analytics(
+    request: Request,
+    filters: AzureVMFilters = Depends(_vm_filters),
+    combine: list[str] = Query([], description="Dimensions to also group by together, e.g. vm_size and os_type"),
+    db: Session = Depends(get_db),
+) -> Response:
+    """
+    VM counts, disk GB and age buckets per subscription, location, VM size, OS type, status
+    and tenant, computed in SQL.
+    """
+    unknown = sorted(set(combine) - set(VM_ANALYTICS_DIMENSIONS))
+    if unknown:
+        raise HTTPException(status_code=400, detail=f"Unknown dimensions: {', '.join(unknown)}")
+
+    def build():
+        return AzureVMStore(db).analytics(filters, combine)
+
+    return _cached_response(request, db, build)
+
+
+@app.get("/api/azure-vms/storage-distribution", response_model=dict)
+def get_azure_vm_storage_distribution(
+    request: Request,
+    top: int = Query(10, ge=1, le=100),
+    top_by: Optional[str] = Query(None, description=f"Rank within each value of one of: {', '.join(VM_TOP_DIMENSIONS)}"),
+    filters: AzureVMFilters = Depends(_vm_filters),
+    db: Session = Depends(get_db),
+) -> Response:
+    """Disk size histogram, p50/p90/p99 and the largest VMs (overall or per top_by value), computed in SQL."""
+    if top_by is not None and top_by not in VM_TOP_DIMENSIONS:
+        raise HTTPException(status_code=400, detail=f"Unknown dimension: {top_by}")
+
+    def build():
+        return AzureVMStore(db).storage_distribution(filters, top, top_by)
+
+    return _cached_response(request, db, build)
 
 
 @app.get("/api/azure-vms/{vm_id}", response_model=AzureVM)
@@ -472,6 +928,11 @@ def import_azure_vms_csv(
     db: Session = Depends(get_db),
 ) -> dict:
     """Import Azure VMs from CSV file."""
+    return _import_azure_vm_csv(file.file, purge_first, db)
+
+
+def _import_azure_vm_csv(source: IO[bytes], purge_first: bool, db: Session) -> dict:
+    """Parse and store an Azure VM CSV export (shared by direct and chunked uploads)."""
     store = AzureVMStore(db)
     
     # Purge if requested
@@ -481,9 +942,15 @@ def import_azure_vms_csv(
         deleted_count = 0
     
     # Parse and import CSV
+    purge_expired_reports()
+    report = ImportReport()
     try:
-        content = file.file.read()
-        parsed_vms, skipped = parse_azure_vm_csv(content)
+        parsed_vms = []
+        for _, vm, skip in iter_azure_vm_csv(open_text(source)):
+            if vm is not None:
+                parsed_vms.append(vm)
+            else:
+                report.add("skipped", skip)
         
         if parsed_vms:
             imported_count = store.create_bulk(parsed_vms)
@@ -493,12 +960,17 @@ def import_azure_vms_csv(
         return {
             "message": "Import completed",
             "imported": imported_count,
-            "skipped": len(skipped),
+            "skipped": report.totals["skipped"],
             "purged": deleted_count,
-            "skipped_details": skipped,
+            "import_id": report.import_id if report.has_entries else None,
+            "report_url": f"/api/imports/{report.import_id}/report" if report.has_entries else None,
+            "skipped_by_reason": report.by_reason["skipped"],
+            "skipped_details": report.samples["skipped"],
         }
     except Exception as e:
         raise HTTPException(status_code=400, detail=f"CSV parsing error: {str(e)}")
+    finally:
+        report.close()
 
 
 @app.delete("/api/azure-vms")
@@ -510,10 +982,159 @@ def purge_all_azure_vms(db: Session = Depends(get_db)) -> dict:
 
 
 @app.get("/api/azure-vms-filter-options")
-def get_azure_vms_filter_options(db: Session = Depends(get_db)) -> dict:
+def get_azure_vms_filter_options(request: Request, db: Session = Depends(get_db)) -> Response:
     """Get available filter options for Azure VMs."""
-    store = AzureVMStore(db)
-    return store.get_filter_options()
+    def build():
+        store = AzureVMStore(db)
+        return store.get_filter_options()
+
+    return _cached_response(request, db, build)
+
+
+# ============= EC2 Instances Endpoints =============
+
+@app.get("/api/ec2-instances", response_model=dict)
+def list_ec2_instances(
+    request: Request,
+    account_id: Optional[str] = Query(None),
+    region: Optional[str] = Query(None),
+    state: Optional[str] = Query(None),
+    instance_type: Optional[str] = Query(None),
+    platform: Optional[str] = Query(None),
+    search: Optional[str] = Query(None),
+    tag: list[str] = Query([]),
+    limit: int = Query(100, ge=1, le=1000),
+    after: Optional[str] = Query(None, description="Last instance_id of the previous page"),
+    db: Session = Depends(get_db),
+) -> Response:
+    """
+    One page of EC2 instances ordered by instance ID. Pass next_after from the response as
+    after to get the following page. tag is key=value (exact) or key (has the tag).
+    """
+    def build():
+        filters = EC2Filters(
+            account_id=account_id,
+            region=region,
+            state=state,
+            instance_type=instance_type,
+            platform=platform,
+            search=search,
+            tags=tag,
+        )
+        return EC2Store(db).list_page(filters, limit, after)
+
+    return _cached_response(request, db, build)
+
+
+@app.get("/api/ec2-instances/stats", response_model=dict)
+def get_ec2_stats(
+    request: Request,
+    account_id: Optional[str] = Query(None),
+    region: Optional[str] = Query(None),
+    state: Optional[str] = Query(None),
+    instance_type: Optional[str] = Query(None),
+    platform: Optional[str] = Query(None),
+    search: Optional[str] = Query(None),
+    tag: list[str] = Query([]),
+    db: Session = Depends(get_db),
+) -> Response:
+    """Instance counts per account, region, state, instance type and platform, with EBS totals."""
+    def build():
+        filters = EC2Filters(
+            account_id=account_id,
+            region=region,
+            state=state,
+            instance_type=instance_type,
+            platform=platform,
+            search=search,
+            tags=tag,
+        )
+        return EC2Store(db).stats(filters)
+
+    return _cached_response(request, db, build)
+
+
+@app.get("/api/ec2-instances/{instance_id}", response_model=EC2Instance)
+def get_ec2_instance(instance_id: str, db: Session = Depends(get_db)) -> EC2Instance:
+    """Get an EC2 instance by record id or EC2 instance ID."""
+    store = EC2Store(db)
+    instance = store.get(instance_id)
+    if not instance:
+        raise HTTPException(status_code=404, detail="Instance not found")
+    return instance
+
+
+@app.post("/api/ec2-instances", response_model=EC2Instance, status_code=201)
+def create_ec2_instance(instance: EC2InstanceCreate, db: Session = Depends(get_db)) -> EC2Instance:
+    """Create a new EC2 instance record."""
+    store = EC2Store(db)
+    return store.create(instance)
+
+
+@app.delete("/api/ec2-instances/{instance_id}")
+def delete_ec2_instance(instance_id: str, db: Session = Depends(get_db)) -> dict:
+    """Delete an EC2 instance by record id or EC2 instance ID."""
+    store = EC2Store(db)
+    if not store.delete(instance_id):
+        raise HTTPException(status_code=404, detail="Instance not found")
+    return {"message": "Instance deleted successfully"}
+
+
+@app.post("/api/ec2-instances/import-csv")
+def import_ec2_instances_csv(
+    file: UploadFile = File(...),
+    purge_first: bool = Form(False),
+    db: Session = Depends(get_db),
+) -> dict:
+    """Import an EC2 inventory CSV export. Instances already stored are updated."""
+    return _import_ec2_csv(file.file, purge_first, db)
+
+
+def _import_ec2_csv(source: IO[bytes], purge_first: bool, db: Session) -> dict:
+    """Stream an EC2 CSV export into the store with COPY (shared by direct and chunked uploads)."""
+    store = EC2Store(db)
+    deleted_count = store.purge_all() if purge_first else 0
+
+    purge_expired_reports()
+    report = ImportReport()
+    try:
+        def instances():
+            for _, instance, skip in iter_ec2_csv(open_text(source)):
+                if instance is not None:
+                    yield instance
+                else:
+                    report.add("skipped", skip)
+
+        imported_count = store.upsert_bulk(instances())
+        return {
+            "message": "Import completed",
+            "imported": imported_count,
+            "skipped": report.totals["skipped"],
+            "purged": deleted_count,
+            **report.summary(),
+        }
+    except Exception as e:
+        db.rollback()
+        raise HTTPException(status_code=400, detail=f"CSV parsing error: {str(e)}")
+    finally:
+        report.close()
+
+
+@app.delete("/api/ec2-instances")
+def purge_all_ec2_instances(db: Session = Depends(get_db)) -> dict:
+    """Delete all EC2 instance records."""
+    store = EC2Store(db)
+    count = store.purge_all()
+    return {"message": "Purged all EC2 instance records", "deleted": count}
+
+
+@app.get("/api/ec2-instances-filter-options")
+def get_ec2_filter_options(request: Request, db: Session = Depends(get_db)) -> Response:
+    """Get available filter options for EC2 instances."""
+    def build():
+        return EC2Store(db).get_filter_options()
+
+    return _cached_response(request, db, build)
 
 
 @app.get("/api/tenant-names")
@@ -550,10 +1171,13 @@ def import_aws_accounts_csv(
 
 
 @app.get("/api/aws-account-names")
-def get_aws_account_names(db: Session = Depends(get_db)) -> dict:
+def get_aws_account_names(request: Request, db: Session = Depends(get_db)) -> Response:
     """Get mapping of AWS account IDs to friendly names."""
-    store = AWSAccountStore(db)
-    return store.get_account_names_map()
+    def build():
+        store = AWSAccountStore(db)
+        return store.get_account_names_map()
+
+    return _cached_response(request, db, build)
 
 
 @app.get("/api/aws-accounts")
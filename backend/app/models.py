@@ -1,8 +1,78 @@
-from sqlalchemy import Column, String, Integer, Enum as SQLEnum, ARRAY
+from sqlalchemy import DDL, Boolean, Column, Computed, String, Integer, Enum as SQLEnum, ARRAY, Index, event
 import uuid
+from .account_ids import ACCOUNT_ID_NORM_SQL
 from .database import Base
 from .schemas import DatabaseProvider, DatabaseStatus
 
+# Generation expressions for the typed shadows of the free-form detail columns.
+# The leading integer of a value ("3000", "3,000", "7 days"); NULL when there is none.
+DETAIL_INT_SQL = "CAST(substring(replace({column}, ',', '') FROM '^\\s*([0-9]{{1,9}})(?![0-9])') AS INTEGER)"
+# Enabled/Disabled, true/false, yes/no, on/off; NULL for anything else.
+DETAIL_BOOL_SQL = (
+    "CASE WHEN lower(btrim({column})) IN ('true', 'yes', 'enabled', 'on', '1') THEN true "
+    "WHEN lower(btrim({column})) IN ('false', 'no', 'disabled', 'off', '0', 'none') THEN false END"
+)
+
+# Typed shadow column -> (generation expression, SQL type, source column)
+DETAIL_COLUMNS = {
+    "iops_int": (DETAIL_INT_SQL, "INTEGER", "iops"),
+    "backup_retention_days_int": (DETAIL_INT_SQL, "INTEGER", "backup_retention_days"),
+    "auto_scaling_bool": (DETAIL_BOOL_SQL, "BOOLEAN", "auto_scaling"),
+    "replica_bool": (DETAIL_BOOL_SQL, "BOOLEAN", "replica"),
+    "geo_redundant_backup_bool": (DETAIL_BOOL_SQL, "BOOLEAN", "geo_redundant_backup"),
+}
+
+
+# Engine families upgrade policies apply to, and the generation expression classifying an
+# engine into one of them ('unknown' for anything else); store.normalize_engine is its Python form
+ENGINE_FAMILIES = ("postgres", "mysql", "mssql")
+ENGINE_FAMILY_SQL = (
+    "CASE WHEN strpos(lower(engine), 'postgre') > 0 THEN 'postgres' "
+    "WHEN strpos(lower(engine), 'mysql') > 0 THEN 'mysql' "
+    "WHEN strpos(lower(engine), 'mssql') > 0 OR strpos(lower(engine), 'sql server') > 0 "
+    "OR strpos(lower(engine), 'sqlserver') > 0 THEN 'mssql' ELSE 'unknown' END"
+)
+
+# The parsed version key upgrade policies compare against: the leading major.minor number
+# ("15.4" -> 15, 4), or for SQL Server the release year ("SQL Server 2019" -> 2019, 0).
+# major is NULL when the version has no such number; upgrade_policy_store.version_key is the Python form.
+VERSION_NUMBER_PATTERN = r"^\s*([0-9]{1,6})"
+VERSION_MINOR_PATTERN = r"^\s*[0-9]{1,6}\.([0-9]{1,6})"
+VERSION_YEAR_PATTERN = r"((19|20)[0-9]{2})"
+VERSION_MAJOR_SQL = (
+    f"CASE WHEN ({ENGINE_FAMILY_SQL}) = 'mssql' "
+    f"THEN CAST(substring(version FROM '{VERSION_YEAR_PATTERN}') AS INTEGER) "
+    f"ELSE CAST(substring(version FROM '{VERSION_NUMBER_PATTERN}') AS INTEGER) END"
+)
+VERSION_MINOR_SQL = (
+    f"CASE WHEN ({ENGINE_FAMILY_SQL}) = 'mssql' THEN 0 "
+    f"ELSE COALESCE(CAST(substring(version FROM '{VERSION_MINOR_PATTERN}') AS INTEGER), 0) END"
+)
+
+# Upgrade key column -> (generation expression, SQL type)
+UPGRADE_KEY_COLUMNS = {
+    "engine_family": (ENGINE_FAMILY_SQL, "VARCHAR"),
+    "version_major": (VERSION_MAJOR_SQL, "INTEGER"),
+    "version_minor": (VERSION_MINOR_SQL, "INTEGER"),
+}
+
+
+# Hostname labels in domain order, lower-cased: db1.abc.us-west-2.rds.amazonaws.com ->
+# com.amazonaws.rds.us-west-2.abc.db1. A hostname suffix becomes a prefix of this form,
+# which a b-tree index answers with a range scan. Must exist before database_records.
+DOMAIN_ORDER_FUNCTION_SQL = """
+CREATE OR REPLACE FUNCTION domain_order(host text) RETURNS text
+LANGUAGE sql IMMUTABLE STRICT PARALLEL SAFE AS $$
+    SELECT string_agg(label, '.' ORDER BY n DESC)
+    FROM unnest(string_to_array(lower(host), '.')) WITH ORDINALITY AS t(label, n)
+$$
+"""
+
+
+def _detail(name: str, type_):
+    sql, _, column = DETAIL_COLUMNS[name]
+    return Column(type_, Computed(sql.format(column=column), persisted=True), index=True)
+
 
 class DatabaseRecordModel(Base):
     __tablename__ = "database_records"
@@ -13,7 +83,7 @@ class DatabaseRecordModel(Base):
     engine = Column(String, nullable=False)
     region = Column(String, nullable=False)
     endpoint = Column(String, nullable=False, unique=True)
-    storage_gb = Column(Integer, nullable=False)
+    storage_gb = Column(Integer, nullable=False, index=True)
     status = Column(SQLEnum(DatabaseStatus, values_callable=lambda x: [e.value for e in x]), nullable=False, default=DatabaseStatus.available)
     subscription = Column(String, nullable=False)
     tags = Column(ARRAY(String), default=lambda: [])
@@ -29,3 +99,33 @@ class DatabaseRecordModel(Base):
     backup_retention_days = Column(String, nullable=True)
     geo_redundant_backup = Column(String, nullable=True)
 
+    # Canonical 12-digit AWS account ID derived from subscription (NULL for non-numeric subscriptions)
+    account_id_norm = Column(String, Computed(ACCOUNT_ID_NORM_SQL.format(column="subscription"), persisted=True), index=True)
+
+    # Typed shadows of the detail columns above, for range and boolean filters
+    iops_int = _detail("iops_int", Integer)
+    backup_retention_days_int = _detail("backup_retention_days_int", Integer)
+    auto_scaling_bool = _detail("auto_scaling_bool", Boolean)
+    replica_bool = _detail("replica_bool", Boolean)
+    geo_redundant_backup_bool = _detail("geo_redundant_backup_bool", Boolean)
+
+    # endpoint in domain order, for hostname-suffix filters and domain rollups
+    endpoint_rev = Column(String, Computed("domain_order(endpoint)", persisted=True))
+
+    # Parsed engine family and version that upgrade policies compile to predicates over
+    engine_family = Column(String, Computed(ENGINE_FAMILY_SQL, persisted=True))
+    version_major = Column(Integer, Computed(VERSION_MAJOR_SQL, persisted=True))
+    version_minor = Column(Integer, Computed(VERSION_MINOR_SQL, persisted=True))
+
+    __table_args__ = (
+        # Serves tag containment (@>) and overlap (&&) filters
+        Index("ix_database_records_tags", "tags", postgresql_using="gin"),
+        # text_pattern_ops lets LIKE 'prefix%' use the index whatever the database collation
+        Index("ix_database_records_endpoint_rev", "endpoint_rev", postgresql_ops={"endpoint_rev": "text_pattern_ops"}),
+        # Answers each family's (version_major, version_minor) < minimum with a range scan
+        Index("ix_database_records_upgrade_key", "engine_family", "version_major", "version_minor"),
+    )
+
+
+event.listen(DatabaseRecordModel.__table__, "before_create", DDL(DOMAIN_ORDER_FUNCTION_SQL))
+
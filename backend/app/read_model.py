@@ -0,0 +1,239 @@
+"""
+Optional in-process columnar read model.
+
+With READ_MODEL_ENABLED set (and numpy installed) a snapshot of database_records and
+azure_vms is kept in memory column by column. String columns are dictionary-encoded (an
+int32 code per row plus the list of distinct values), so a filter predicate is evaluated
+once per distinct value and applied to every row with one vectorized gather, and group-by
+aggregates reduce to bincount over combined codes.
+
+A snapshot is tagged with the inventory generation it was read at and is only used while
+that is still the current generation. After a write the next read schedules a rebuild in
+a background thread and SQL answers until it is ready. READ_MODEL_VERIFY additionally
+runs the SQL path for every answer and logs any difference.
+"""
+import os
+import threading
+import time
+from typing import Any, Callable, Dict, Iterable, List, Optional, Sequence
+
+from sqlalchemy.orm import Session
+
+from .database import SessionLocal
+from .generation import InventoryGeneration, current_generation
+
+try:
+    import numpy as np
+except ImportError:  # the read model is unavailable without numpy; SQL answers everything
+    np = None
+
+READ_MODEL_ENABLED = os.getenv("READ_MODEL_ENABLED", "false").lower() in ("1", "true", "yes")
+READ_MODEL_VERIFY = os.getenv("READ_MODEL_VERIFY", "false").lower() in ("1", "true", "yes")
+
+
+class ColumnarTable:
+    """
+    Rows held column-wise. Columns named in encoded are dictionary-encoded; columns in
+    numeric become int64 arrays (NULL as 0) for sums. Row tuples are kept for output.
+    """
+
+    def __init__(self, columns: Sequence[str], rows: Sequence[tuple], encoded: Iterable[str], numeric: Iterable[str] = ()):
+        self.columns = tuple(columns)
+        self.rows = list(rows)
+        self.codes: Dict[str, "np.ndarray"] = {}
+        self.values: Dict[str, List[Any]] = {}
+        self.numbers: Dict[str, "np.ndarray"] = {}
+        position = {name: i for i, name in enumerate(self.columns)}
+        for name in encoded:
+            i = position[name]
+            lookup: Dict[Any, int] = {}
+            self.codes[name] = np.fromiter(
+                (lookup.setdefault(row[i], len(lookup)) for row in self.rows), dtype=np.int32, count=len(self.rows)
+            )
+            self.values[name] = list(lookup)
+        for name in numeric:
+            i = position[name]
+            self.numbers[name] = np.fromiter((row[i] or 0 for row in self.rows), dtype=np.int64, count=len(self.rows))
+
+    def __len__(self) -> int:
+        return len(self.rows)
+
+    def everything(self) -> "np.ndarray":
+        return np.ones(len(self.rows), dtype=bool)
+
+    def match(self, name: str, predicate: Callable[[Any], bool]) -> "np.ndarray":
+        """Row mask for an encoded column: predicate runs once per distinct value."""
+        hits = np.fromiter((bool(predicate(v)) for v in self.values[name]), dtype=bool, count=len(self.values[name]))
+        return hits[self.codes[name]]
+
+    def match_rows(self, name: str, predicate: Callable[[Any], bool]) -> "np.ndarray":
+        """Row mask for a column that is not encoded (such as a list): predicate runs once per row."""
+        i = self.columns.index(name)
+        return np.fromiter((bool(predicate(row[i])) for row in self.rows), dtype=bool, count=len(self.rows))
+
+    def select(self, mask: "np.ndarray") -> List[tuple]:
+        return [self.rows[i] for i in np.flatnonzero(mask)]
+
+    def group_sum(self, keys: Sequence[str], mask: "np.ndarray", value: str) -> List[tuple]:
+        """(key values..., row count, sum of value) for each combination of keys present under mask."""
+        combined = np.zeros(len(self.rows), dtype=np.int64)
+        for name in keys:
+            combined = combined * len(self.values[name]) + self.codes[name]
+        combined = combined[mask]
+        if not len(combined):
+            return []
+        unique, inverse = np.unique(combined, return_inverse=True)
+        counts = np.bincount(inverse)
+        sums = np.bincount(inverse, weights=self.numbers[value][mask])
+        groups = []
+        for key, count, total in zip(unique.tolist(), counts.tolist(), sums.tolist()):
+            decoded = []
+            for name in reversed(keys):
+                key, code = divmod(key, len(self.values[name]))
+                decoded.append(self.values[name][code])
+            groups.append((*reversed(decoded), count, int(total)))
+        return groups
+
+
+def pg_array_text(values: Optional[Sequence[str]]) -> Optional[str]:
+    """Text form PostgreSQL gives a text[] (what CAST(tags AS VARCHAR) returns)."""
+    if values is None:
+        return None
+    items = []
+    for value in values:
+        if value == "" or value.upper() == "NULL" or any(c in value for c in '{},"\\') or any(c.isspace() for c in value):
+            value = '"' + value.replace("\\", "\\\\").replace('"', '\\"') + '"'
+        items.append(value)
+    return "{" + ",".join(items) + "}"
+
+
+class InventorySnapshot:
+    """Columnar copy of the inventory as of one generation, plus the display-name maps."""
+
+    def __init__(
+        self,
+        generation: int,
+        databases: ColumnarTable,
+        azure_vms: ColumnarTable,
+        tenant_names: Dict[str, str],
+        account_names: Dict[str, str],
+        build_seconds: float,
+    ):
+        self.generation = generation
+        self.databases = databases
+        self.azure_vms = azure_vms
+        self.tenant_names = tenant_names
+        self.account_names = account_names
+        self.build_seconds = build_seconds
+
+
+def build_snapshot(db: Session) -> InventorySnapshot:
+    """Read the whole inventory in one REPEATABLE READ transaction on db."""
+    # Imported here: the stores import this module
+    from .aws_account_store import AWSAccountStore
+    from .models import DatabaseRecordModel
+    from .store import DETAIL_FILTERS, LIST_ROW_COLUMNS
+    from .tenant_mapping import get_tenant_names_map
+    from .vm_models import AzureVMModel
+    from .vm_store import VM_ROW_COLUMNS
+
+    # Typed detail columns follow the row fields and tags_text, only for filtering
+    detail_columns = tuple(dict.fromkeys(column for _, column, _ in DETAIL_FILTERS))
+    started = time.monotonic()
+    # One snapshot for the data and the generation it is tagged with
+    db.rollback()
+    db.connection(execution_options={"isolation_level": "REPEATABLE READ"})
+    try:
+        generation = db.query(InventoryGeneration.generation).filter(InventoryGeneration.id == 1).scalar() or 0
+        n = len(LIST_ROW_COLUMNS)
+        database_rows = [
+            tuple(row[:n]) + (pg_array_text(row.tags),) + tuple(row[n:])
+            for row in db.query(*[getattr(DatabaseRecordModel, name) for name in LIST_ROW_COLUMNS + detail_columns])
+        ]
+        vm_rows = [tuple(row) for row in db.query(*[getattr(AzureVMModel, name) for name in VM_ROW_COLUMNS])]
+        tenant_names = get_tenant_names_map(db)
+        account_names = AWSAccountStore(db).get_account_names_map()
+    finally:
+        db.rollback()
+
+    databases = ColumnarTable(
+        LIST_ROW_COLUMNS + ("tags_text",) + detail_columns,
+        database_rows,
+        encoded=("provider", "status", "engine", "version", "region", "subscription",
+                 "service", "endpoint", "tags_text") + detail_columns,
+        numeric=("storage_gb",),
+    )
+    azure_vms = ColumnarTable(
+        VM_ROW_COLUMNS,
+        vm_rows,
+        encoded=("location", "subscription", "tenant_id", "display_status", "os_type",
+                 "computer_name", "resource_group"),
+    )
+    return InventorySnapshot(generation, databases, azure_vms, tenant_names, account_names,
+                             time.monotonic() - started)
+
+
+class ReadModel:
+    """Holds the current snapshot and rebuilds it in the background when the generation moves."""
+
+    def __init__(self, enabled: bool = READ_MODEL_ENABLED, verify: bool = READ_MODEL_VERIFY, session_factory=SessionLocal):
+        self.enabled = enabled and np is not None
+        self.verify = verify
+        self.session_factory = session_factory
+        self._snapshot: Optional[InventorySnapshot] = None
+        self._lock = threading.Lock()
+        self._building = False
+        self.builds = 0
+        self.mismatches = 0
+
+    def current(self, db: Session) -> Optional[InventorySnapshot]:
+        """The snapshot if it matches the current generation, else None (and a rebuild is scheduled)."""
+        if not self.enabled:
+            return None
+        snapshot = self._snapshot
+        if snapshot is not None and snapshot.generation == current_generation(db):
+            return snapshot
+        self._schedule_rebuild()
+        return None
+
+    def _schedule_rebuild(self) -> None:
+        with self._lock:
+            if self._building:
+                return
+            self._building = True
+        threading.Thread(target=self.rebuild, name="read-model-rebuild", daemon=True).start()
+
+    def rebuild(self) -> None:
+        """Build a fresh snapshot now (the background thread's target)."""
+        db = self.session_factory()
+        try:
+            self._snapshot = build_snapshot(db)
+            self.builds += 1
+        except Exception as e:
+            print(f"Read model rebuild failed: {e}")
+        finally:
+            db.close()
+            with self._lock:
+                self._building = False
+
+    def compare(self, what: str, from_snapshot: Any, from_sql: Any) -> None:
+        """Log a difference between a read-model answer and the SQL answer (verify mode)."""
+        if from_snapshot != from_sql:
+            self.mismatches += 1
+            print(f"Read model mismatch for {what}: read model and SQL answers differ")
+
+    def stats(self) -> Dict[str, Any]:
+        snapshot = self._snapshot
+        return {
+            "enabled": self.enabled,
+            "verify": self.verify,
+            "generation": snapshot.generation if snapshot else None,
+            "databases": len(snapshot.databases) if snapshot else 0,
+            "azure_vms": len(snapshot.azure_vms) if snapshot else 0,
+            "last_build_ms": round(snapshot.build_seconds * 1000, 1) if snapshot else None,
+            "builds": self.builds,
+            "mismatches": self.mismatches,
+        }
+
+
+read_model = ReadModel()
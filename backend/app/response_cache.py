@@ -0,0 +1,75 @@
+"""Bounded in-process LRU of encoded read responses, keyed by request and inventory generation."""
+import os
+import threading
+from collections import OrderedDict
+from typing import Any, Dict, Hashable, Optional, Tuple
+
+RESPONSE_CACHE_ENTRIES = int(os.getenv("RESPONSE_CACHE_ENTRIES", "256"))
+RESPONSE_CACHE_MAX_BYTES = int(os.getenv("RESPONSE_CACHE_MAX_BYTES", str(256 * 1024 * 1024)))
+
+
+class ResponseCache:
+    """
+    LRU of response bodies bounded by entry count and total size. Entries from an older
+    generation can never be hit again, so they are dropped as soon as a newer one is stored.
+    """
+
+    def __init__(self, max_entries: int = RESPONSE_CACHE_ENTRIES, max_bytes: int = RESPONSE_CACHE_MAX_BYTES):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self._entries: "OrderedDict[Tuple[Hashable, int], bytes]" = OrderedDict()
+        self._bytes = 0
+        self._generation = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, key: Hashable, generation: int) -> Optional[bytes]:
+        with self._lock:
+            body = self._entries.get((key, generation))
+            if body is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end((key, generation))
+            self.hits += 1
+            return body
+
+    def put(self, key: Hashable, generation: int, body: bytes) -> None:
+        if len(body) > self.max_bytes:
+            return
+        with self._lock:
+            if generation < self._generation:
+                return
+            if generation > self._generation:
+                self._generation = generation
+                self._drop(lambda k: k[1] < generation)
+            old = self._entries.pop((key, generation), None)
+            if old is not None:
+                self._bytes -= len(old)
+            self._entries[(key, generation)] = body
+            self._bytes += len(body)
+            while len(self._entries) > self.max_entries or self._bytes > self.max_bytes:
+                _, evicted = self._entries.popitem(last=False)
+                self._bytes -= len(evicted)
+                self.evictions += 1
+
+    def _drop(self, predicate) -> None:
+        for entry_key in [k for k in self._entries if predicate(k)]:
+            self._bytes -= len(self._entries.pop(entry_key))
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "entries": len(self._entries),
+                "bytes": self._bytes,
+                "generation": self._generation,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+            }
@@ -1,6 +1,6 @@
 from enum import Enum
-from typing import List, Optional
-from datetime import datetime
+from typing import Dict, List, Literal, NamedTuple, Optional
+from datetime import date, datetime
 
 from pydantic import BaseModel, Field
 
@@ -49,6 +49,32 @@ class DatabaseRecord(DatabaseRecordBase):
     id: str
 
 
+class DatabaseRow(NamedTuple):
+    """
+    Lightweight parsed row used on the import hot path instead of DatabaseRecordCreate.
+    Field order matches the database_records columns (minus id), so rows can be sent to
+    bulk inserts as plain tuples. Values are validated by the parser.
+    """
+    provider: DatabaseProvider
+    service: str
+    engine: str
+    region: str
+    endpoint: str
+    storage_gb: int
+    status: DatabaseStatus
+    subscription: str
+    tags: List[str]
+    version: Optional[str]
+    azure_tenant: Optional[str]
+    availability_zone: Optional[str]
+    auto_scaling: Optional[str]
+    iops: Optional[str]
+    high_availability_state: Optional[str]
+    replica: Optional[str]
+    backup_retention_days: Optional[str]
+    geo_redundant_backup: Optional[str]
+
+
 class StatsResponse(BaseModel):
     total: int
     by_provider: dict
@@ -64,6 +90,19 @@ class InventoryFilters(BaseModel):
     version: Optional[str] = None
     subscription: Optional[str] = None
     search: Optional[str] = None
+    # Exact tags; records must carry all of them, or any of them with tag_match="any"
+    tags: List[str] = Field(default_factory=list)
+    tag_match: Literal["all", "any"] = "all"
+    # The endpoint host or a domain it is under, matched on whole labels
+    endpoint_suffix: Optional[str] = None
+    # Ranges (inclusive) and flags over the typed shadows of the detail columns
+    iops_min: Optional[int] = None
+    iops_max: Optional[int] = None
+    backup_retention_days_min: Optional[int] = None
+    backup_retention_days_max: Optional[int] = None
+    auto_scaling: Optional[bool] = None
+    replica: Optional[bool] = None
+    geo_redundant_backup: Optional[bool] = None
 
 
 class AzureVMBase(BaseModel):
@@ -99,6 +138,60 @@ class AzureVMFilters(BaseModel):
     status: Optional[str] = None
     os_type: Optional[str] = None
     search: Optional[str] = None
+    # Private IP within a network (CIDR) and/or between two addresses (inclusive)
+    cidr: Optional[str] = None
+    ip_from: Optional[str] = None
+    ip_to: Optional[str] = None
+
+
+class EC2InstanceBase(BaseModel):
+    instance_id: str
+    name: Optional[str] = None
+    account_id: str
+    region: str
+    availability_zone: Optional[str] = None
+    instance_type: Optional[str] = None
+    image_id: Optional[str] = None
+    image_name: Optional[str] = None
+    root_volume_size: Optional[int] = None
+    additional_ebs_count: Optional[int] = None
+    total_ebs_size: Optional[int] = None
+    ebs_volume_types: Optional[str] = None
+    state: Optional[str] = None
+    state_transition_reason: Optional[str] = None
+    launch_time: Optional[datetime] = None
+    vpc_id: Optional[str] = None
+    subnet_id: Optional[str] = None
+    private_ip_address: Optional[str] = None
+    public_ip_address: Optional[str] = None
+    security_groups: Optional[str] = None
+    key_name: Optional[str] = None
+    iam_instance_profile: Optional[str] = None
+    monitoring_state: Optional[str] = None
+    ebs_optimized: Optional[bool] = None
+    platform: Optional[str] = None
+    platform_details: Optional[str] = None
+    tenancy: Optional[str] = None
+    tags: Dict[str, str] = Field(default_factory=dict)
+
+
+class EC2InstanceCreate(EC2InstanceBase):
+    pass
+
+
+class EC2Instance(EC2InstanceBase):
+    id: str
+
+
+class EC2Filters(BaseModel):
+    account_id: Optional[str] = None
+    region: Optional[str] = None
+    state: Optional[str] = None
+    instance_type: Optional[str] = None
+    platform: Optional[str] = None
+    search: Optional[str] = None
+    # "key=value" matches a tag value exactly, "key" matches instances carrying the key
+    tags: List[str] = Field(default_factory=list)
 
 
 class AWSAccountBase(BaseModel):
@@ -117,3 +210,31 @@ class AWSAccountCreate(AWSAccountBase):
 
 class AWSAccount(AWSAccountBase):
     pass
+
+
+class UpgradePolicyBase(BaseModel):
+    engine_family: str = Field(..., description="postgres, mysql or mssql")
+    min_version: str = Field(..., description="Versions below this need upgrading, e.g. 13, 8.0 or (SQL Server) 2017")
+    eol_date: Optional[date] = Field(None, description="Date from which the policy applies; none means it applies now")
+    description: Optional[str] = None
+
+
+class UpgradePolicyCreate(UpgradePolicyBase):
+    pass
+
+
+class UpgradePolicy(UpgradePolicyBase):
+    id: str
+    in_force: bool
+
+
+class UploadSessionCreate(BaseModel):
+    filename: str
+    total_size: int = Field(..., gt=0, description="Size of the complete file in bytes")
+    kind: str = Field("databases", description="databases, azure-vms or ec2-instances")
+
+
+class UploadFinalize(BaseModel):
+    provider: DatabaseProvider = DatabaseProvider.aws
+    purge_first: bool = False
+    sync: bool = False
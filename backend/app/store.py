@@ -1,17 +1,263 @@
-from typing import List, Optional, Tuple, Dict, Any
+import operator
+from enum import Enum
+from typing import List, Optional, Sequence, Tuple, Dict, Any
 from sqlalchemy.orm import Session
-from sqlalchemy import or_, func, String
+from sqlalchemy import and_, or_, case, cast, func, literal, select, tuple_, String
+from sqlalchemy.dialects import postgresql
 
 from .schemas import (
     DatabaseRecord,
     DatabaseRecordCreate,
+    DatabaseRow,
     DatabaseStatus,
     DatabaseProvider,
     InventoryFilters,
 )
-from .models import DatabaseRecordModel
+from .account_ids import account_ids, account_ids_by_name, subscription_predicate
+from .aws_account_models import AWSAccountModel
+from .bulk_load import DATABASE_RECORD_COLUMNS, copy_rows_ignore_conflicts, database_record_row
+from .distribution import largest, size_distribution
+from .generation import GenerationCache, bump_generation
+from .models import ENGINE_FAMILIES, DatabaseRecordModel
+from .read_model import read_model
 from .seed_data import SEED_DATABASES
-from .tenant_mapping import get_tenant_name
+from .summary import inventory_summary, summary_is_current
+from .tenant_mapping import get_tenant_names_map
+from .upgrade_policy_store import UpgradePolicyStore, requires_upgrade, upgrade_predicate
+
+# DatabaseRecord fields in response order, selected directly by list_rows
+LIST_ROW_COLUMNS = tuple(DatabaseRecord.model_fields)
+
+# Filter dimensions counted by facets(); provider must precede subscription
+FACET_DIMENSIONS = ("provider", "region", "status", "engine", "version", "subscription")
+
+# InventoryFilters fields answered by the typed detail columns: (field, column, comparison)
+DETAIL_FILTERS = (
+    ("iops_min", "iops_int", operator.ge),
+    ("iops_max", "iops_int", operator.le),
+    ("backup_retention_days_min", "backup_retention_days_int", operator.ge),
+    ("backup_retention_days_max", "backup_retention_days_int", operator.le),
+    ("auto_scaling", "auto_scaling_bool", operator.eq),
+    ("replica", "replica_bool", operator.eq),
+    ("geo_redundant_backup", "geo_redundant_backup_bool", operator.eq),
+)
+
+# Dimensions and measures rollup() can group by and compute
+ROLLUP_DIMENSIONS = ("provider", "engine_family", "version_major", "region", "subscription", "business_unit", "status")
+ROLLUP_MEASURES = ("count", "storage_gb", "cost")
+
+# Dimensions storage_distribution() can rank the largest databases within
+STORAGE_TOP_DIMENSIONS = ("provider", "engine", "region", "subscription", "status")
+
+# Average hours per month
+HOURS_PER_MONTH = 730
+
+# Base compute costs per hour by provider and engine
+COMPUTE_RATES = {
+    DatabaseProvider.aws: {
+        "postgres": 0.12,  # db.t3.medium equivalent
+        "mysql": 0.10,
+        "mariadb": 0.10,
+        "oracle": 0.35,
+        "sqlserver": 0.25,
+        "aurora": 0.15,
+    },
+    DatabaseProvider.azure: {
+        "postgres": 0.14,  # B_Standard_B2s equivalent
+        "mysql": 0.12,
+        "sqlserver": 0.28,
+        "mariadb": 0.11,
+    }
+}
+
+# Storage costs per GB per month
+STORAGE_RATES = {
+    DatabaseProvider.aws: 0.115,  # GP2 storage
+    DatabaseProvider.azure: 0.12,  # Standard SSD
+}
+
+# Regional multipliers (US East/Central = 1.0 baseline)
+REGION_MULTIPLIERS = {
+    # AWS regions
+    "us-east-1": 1.0,
+    "us-east-2": 1.0,
+    "us-west-1": 1.05,
+    "us-west-2": 1.05,
+    "eu-west-1": 1.1,
+    "eu-central-1": 1.12,
+    "ap-southeast-1": 1.15,
+    "ap-northeast-1": 1.18,
+    # Azure regions
+    "eastus": 1.0,
+    "eastus2": 1.0,
+    "westus": 1.05,
+    "westus2": 1.05,
+    "centralus": 1.0,
+    "northcentralus": 1.0,
+    "westeurope": 1.1,
+    "northeurope": 1.08,
+    "southeastasia": 1.15,
+    "eastasia": 1.15,
+}
+
+
+def _canonical_account_id(column):
+    """SQL form of account_ids.normalize_account_id (the account_id_norm generation expression)."""
+    return case((column.op("~")("^[0-9]{1,12}$"), func.lpad(column, 12, "0")))
+
+
+def _account_id_norm(source):
+    """source.account_id_norm, or the same expression for sources without the column (the summary view)."""
+    column = getattr(source, "account_id_norm", None)
+    if column is not None:
+        return column
+    return _canonical_account_id(source.subscription)
+
+
+def _either_contains(value, key: str):
+    """SQL for Python's `key in value or value in key`."""
+    return or_(func.strpos(value, key) > 0, func.strpos(literal(key), value) > 0)
+
+
+def _hourly_cost_sql(provider, engine, region, count, storage):
+    """
+    SQL form of InventoryStore._estimate_hourly_cost summed over count records with storage GB
+    in total, compiled from the rate tables above so both stay in step.
+    """
+    engine_lower = func.lower(engine)
+    compute = case(
+        *[
+            (and_(provider == rate_provider, _either_contains(engine_lower, key)), rate)
+            for rate_provider, rates in COMPUTE_RATES.items()
+            for key, rate in rates.items()
+        ],
+        else_=0.10,
+    )
+    # An exact key wins over partial matches, which are tried in table order
+    region_key = func.replace(func.lower(region), "-", "")
+    multiplier = case(
+        *[(region_key == key, value) for key, value in REGION_MULTIPLIERS.items()],
+        *[(_either_contains(region_key, key), value) for key, value in REGION_MULTIPLIERS.items()],
+        else_=1.0,
+    )
+    storage_rate = case(
+        *[(provider == rate_provider, rate) for rate_provider, rate in STORAGE_RATES.items()],
+        else_=0.115,
+    )
+    return count * compute * multiplier + storage * storage_rate / HOURS_PER_MONTH
+
+
+def domain_order(host: str) -> str:
+    """Python form of the domain_order() SQL function: hostname labels reversed, lower-cased."""
+    return ".".join(reversed(host.lower().split(".")))
+
+
+def _endpoint_suffix(suffix: str) -> Tuple[str, str]:
+    """(endpoint_rev of the suffix itself, LIKE pattern for hosts below it) for an endpoint_suffix filter."""
+    rev = domain_order(suffix.strip().strip("."))
+    escaped = rev.replace("/", "//").replace("%", "/%").replace("_", "/_")
+    return rev, escaped + ".%"
+
+
+def _summary_answers(filters: Optional[InventoryFilters]) -> bool:
+    """Whether inventory_summary has every column filters need (it lacks search text, tags, endpoints and details)."""
+    if not filters:
+        return True
+    if filters.search or filters.tags or filters.endpoint_suffix:
+        return False
+    return all(getattr(filters, field) is None for field, _, _ in DETAIL_FILTERS)
+
+
+def _row_dict(record: Sequence[Any], tenant_names: Dict[str, str], account_names: Dict[str, str]) -> Dict[str, Any]:
+    """Build a DatabaseRecord-shaped dict from values in LIST_ROW_COLUMNS order."""
+    row = dict(zip(LIST_ROW_COLUMNS, record))
+    provider = row["provider"]
+    row["provider"] = provider.value
+    row["status"] = row["status"].value
+    row["subscription"] = _subscription_display(provider, row["subscription"], account_names)
+    row["tags"] = row["tags"] or []
+    tenant = row["azure_tenant"]
+    row["azure_tenant"] = tenant_names.get(tenant, tenant) if tenant else "-"
+    return row
+
+
+def _by_id(row: Dict[str, Any]) -> str:
+    return row["id"]
+
+
+def _comparable_group(group: tuple) -> tuple:
+    # The summary view stores a missing version as '' and sums as numerics
+    provider, status, engine, version, region, count, storage = group
+    return provider, status, engine, version or None, region, int(count), int(storage)
+
+
+def normalize_engine(name: str) -> str:
+    """Map an engine name to postgres, mysql or mssql ("unknown" for anything else); models.ENGINE_FAMILY_SQL in SQL."""
+    n = (name or "").lower()
+    if "postgre" in n:
+        return "postgres"
+    if "mysql" in n:
+        return "mysql"
+    if "mssql" in n or "sql server" in n or "sqlserver" in n:
+        return "mssql"
+    return "unknown"
+
+
+def _subscription_display(provider: DatabaseProvider, subscription: str, account_names: Dict[str, str]) -> str:
+    """For AWS records, replace the account ID with its friendly name when known."""
+    if provider != DatabaseProvider.aws:
+        return subscription
+    # Try direct mapping first
+    if subscription in account_names:
+        return account_names[subscription]
+    # Try mapping with leading zeros normalized (in case account ID has leading zeros)
+    if subscription.isdigit() and subscription.lstrip('0') in account_names:
+        return account_names[subscription.lstrip('0')]
+    return subscription
+
+
+_FILTER_OPTIONS_EMPTY = {"regions": [], "engines": [], "versions": [], "subscriptions": [], "statuses": []}
+
+
+def _load_filter_options(db: Session) -> Dict[Optional[DatabaseProvider], dict]:
+    """
+    Dropdown values for each provider and for all providers (key None), from one query
+    aggregating every column's distinct values per provider.
+    """
+    query = db.query(
+        DatabaseRecordModel.provider,
+        func.array_agg(DatabaseRecordModel.region.distinct()),
+        func.array_agg(DatabaseRecordModel.engine.distinct()),
+        func.array_agg(DatabaseRecordModel.version.distinct()),
+        func.array_agg(DatabaseRecordModel.subscription.distinct()),
+        func.array_agg(func.cast(DatabaseRecordModel.status, String).distinct()),
+    ).group_by(DatabaseRecordModel.provider)
+
+    # Always map AWS account IDs to friendly names, regardless of provider filter
+    from .aws_account_store import AWSAccountStore
+    account_names = AWSAccountStore(db).get_account_names_map()
+
+    def options(regions, engines, versions, subscriptions, statuses) -> dict:
+        return {
+            "regions": sorted(v for v in regions if v),
+            "engines": sorted(v for v in engines if v),
+            "versions": sorted(v for v in versions if v),
+            # Remove duplicates (in case multiple account IDs map to same name)
+            "subscriptions": sorted({_subscription_display(DatabaseProvider.aws, v, account_names) for v in subscriptions if v}),
+            "statuses": sorted(DatabaseStatus(v) for v in statuses if v),
+        }
+
+    by_provider: Dict[Optional[DatabaseProvider], dict] = {}
+    everything = [set(), set(), set(), set(), set()]
+    for provider, *columns in query:
+        by_provider[provider] = options(*columns)
+        for values, column in zip(everything, columns):
+            values.update(column)
+    by_provider[None] = options(*everything)
+    return by_provider
+
+
+_filter_options = GenerationCache(_load_filter_options)
 
 
 class InventoryStore:
@@ -27,69 +273,141 @@ class InventoryStore:
             for record_data in SEED_DATABASES:
                 db_record = DatabaseRecordModel(**record_data)
                 self.db.add(db_record)
+            bump_generation(self.db)
             self.db.commit()
 
     def list(self, filters: InventoryFilters) -> List[DatabaseRecord]:
-        query = self.db.query(DatabaseRecordModel)
+        db_records = self._apply_filters(self.db.query(DatabaseRecordModel), filters).all()
+        display_names = self._display_names()
+        return [self._model_to_schema(record, display_names) for record in db_records]
+
+    def list_rows(self, filters: InventoryFilters) -> List[Dict[str, Any]]:
+        """
+        Same result as list(), as plain dicts in DatabaseRecord field order.
+        Only the needed columns are selected and no ORM or Pydantic objects are built,
+        so large listings can be serialized straight to JSON.
+        """
+        snapshot = read_model.current(self.db)
+        if snapshot is not None:
+            records = snapshot.databases.select(self._snapshot_mask(snapshot, filters))
+            rows = [_row_dict(record, snapshot.tenant_names, snapshot.account_names) for record in records]
+            if not read_model.verify:
+                return rows
+
+        columns = [getattr(DatabaseRecordModel, name) for name in LIST_ROW_COLUMNS]
+        tenant_names, account_names = self._display_names()
+        sql_rows = [
+            _row_dict(record, tenant_names, account_names)
+            for record in self._apply_filters(self.db.query(*columns), filters)
+        ]
+        if snapshot is not None:
+            read_model.compare("database list", sorted(rows, key=_by_id), sorted(sql_rows, key=_by_id))
+        return sql_rows
+
+    def _snapshot_mask(self, snapshot, filters: Optional[InventoryFilters], exclude_stopped: bool = False):
+        """The read-model equivalent of _apply_filters: a row mask over snapshot.databases."""
+        table = snapshot.databases
+        mask = table.everything()
+        if filters and filters.provider:
+            mask &= table.match("provider", lambda v: v == filters.provider)
+        if filters and filters.region:
+            region = filters.region.lower()
+            mask &= table.match("region", lambda v: v is not None and v.lower() == region)
+        if filters and filters.status:
+            mask &= table.match("status", lambda v: v == filters.status)
+        if filters and filters.engine:
+            engine = filters.engine.lower()
+            mask &= table.match("engine", lambda v: v is not None and engine in v.lower())
+        if filters and filters.version:
+            version = filters.version.lower()
+            mask &= table.match("version", lambda v: v is not None and version in v.lower())
+        if filters and filters.subscription:
+            ids_by_name = account_ids_by_name(snapshot.account_names)
+            mask &= table.match("subscription", subscription_predicate(filters.subscription, ids_by_name))
+        if filters and filters.search:
+            text = filters.search.lower()
+            contains = lambda v: v is not None and text in v.lower()
+            mask &= (
+                table.match("engine", contains)
+                | table.match("service", contains)
+                | table.match("endpoint", contains)
+                | table.match("tags_text", contains)
+            )
+        if filters and filters.tags:
+            wanted = set(filters.tags)
+            if filters.tag_match == "any":
+                mask &= table.match_rows("tags", lambda v: bool(v) and not wanted.isdisjoint(v))
+            else:
+                mask &= table.match_rows("tags", lambda v: wanted.issubset(v or ()))
+        if filters and filters.endpoint_suffix:
+            rev, _ = _endpoint_suffix(filters.endpoint_suffix)
+            mask &= table.match(
+                "endpoint", lambda v: v is not None and (domain_order(v) + ".").startswith(rev + ".")
+            )
+        for field, column, compare in DETAIL_FILTERS:
+            wanted = getattr(filters, field) if filters else None
+            if wanted is not None:
+                mask &= table.match(column, lambda v, wanted=wanted, compare=compare: v is not None and compare(v, wanted))
+        if exclude_stopped:
+            mask &= table.match("status", lambda v: v != DatabaseStatus.stopped)
+        return mask
+
+    def _apply_filters(self, query, filters: InventoryFilters, source=DatabaseRecordModel):
+        """
+        Apply InventoryFilters to a query over DatabaseRecordModel (or its columns).
+        source may instead be inventory_summary.c when _summary_answers(filters).
+        """
+        conditions = self._filter_conditions(filters, source)
+        if conditions:
+            query = query.filter(*conditions.values())
+        return query
 
+    def _filter_conditions(self, filters: InventoryFilters, source=DatabaseRecordModel) -> Dict[str, Any]:
+        """SQL condition for each InventoryFilters field that is set, keyed by field name."""
+        conditions: Dict[str, Any] = {}
         if filters.provider:
-            query = query.filter(DatabaseRecordModel.provider == filters.provider)
+            conditions["provider"] = source.provider == filters.provider
         if filters.region:
-            query = query.filter(
-                func.lower(DatabaseRecordModel.region) == filters.region.lower()
-            )
+            conditions["region"] = func.lower(source.region) == filters.region.lower()
         if filters.status:
-            query = query.filter(DatabaseRecordModel.status == filters.status)
+            conditions["status"] = source.status == filters.status
         if filters.engine:
-            query = query.filter(
-                func.lower(DatabaseRecordModel.engine).contains(filters.engine.lower())
-            )
+            conditions["engine"] = func.lower(source.engine).contains(filters.engine.lower(), autoescape=True)
         if filters.version:
-            query = query.filter(
-                func.lower(DatabaseRecordModel.version).contains(filters.version.lower())
-            )
+            conditions["version"] = func.lower(source.version).contains(filters.version.lower(), autoescape=True)
         if filters.subscription:
-            # Handle AWS account name mapping
-            # Try to find the account ID that maps to the friendly name
+            # Friendly AWS account names and account IDs become an indexed lookup on canonical IDs
             from .aws_account_store import AWSAccountStore
-            aws_store = AWSAccountStore(self.db)
-            account_names = aws_store.get_account_names_map()
-            
-            # Check if the filter is a friendly name and find the corresponding account ID
-            account_id_filter = None
-            for acct_id, friendly_name in account_names.items():
-                if friendly_name.lower() == filters.subscription.lower():
-                    account_id_filter = acct_id
-                    break
-            
-            if account_id_filter:
-                # Filter by the account ID (which may have or not have leading zeros)
-                # We need to check both the direct ID and with leading zeros normalized
-                query = query.filter(
-                    or_(
-                        func.lower(DatabaseRecordModel.subscription).contains(account_id_filter.lower()),
-                        func.lower(DatabaseRecordModel.subscription).contains(account_id_filter.lstrip('0').lower() if account_id_filter.isdigit() else account_id_filter.lower())
-                    )
-                )
+            ids = account_ids(filters.subscription, AWSAccountStore(self.db).get_account_ids_by_name())
+            if ids is not None:
+                conditions["subscription"] = _account_id_norm(source).in_(ids)
             else:
-                # Filter by the subscription as-is (for non-AWS subscriptions or direct ID matching)
-                query = query.filter(
-                    func.lower(DatabaseRecordModel.subscription).contains(filters.subscription.lower())
+                conditions["subscription"] = func.lower(source.subscription).contains(
+                    filters.subscription.lower(), autoescape=True
                 )
         if filters.search:
             text = filters.search.lower()
             # PostgreSQL array contains check for tags
-            query = query.filter(
-                or_(
-                    func.lower(DatabaseRecordModel.engine).contains(text),
-                    func.lower(DatabaseRecordModel.service).contains(text),
-                    func.lower(DatabaseRecordModel.endpoint).contains(text),
-                    func.cast(DatabaseRecordModel.tags, String).ilike(f"%{text}%"),
-                )
+            conditions["search"] = or_(
+                func.lower(source.engine).contains(text, autoescape=True),
+                func.lower(source.service).contains(text, autoescape=True),
+                func.lower(source.endpoint).contains(text, autoescape=True),
+                func.lower(func.cast(source.tags, String)).contains(text, autoescape=True),
             )
-
-        db_records = query.all()
-        return [self._model_to_schema(record) for record in db_records]
+        if filters.tags:
+            # @> / && on the array, both answered by the GIN index on tags
+            wanted = cast(postgresql.array(filters.tags), postgresql.ARRAY(String))
+            conditions["tags"] = source.tags.op("&&" if filters.tag_match == "any" else "@>")(wanted)
+        if filters.endpoint_suffix:
+            # The host itself or any host below it: an equality or prefix range scan on endpoint_rev
+            rev, below = _endpoint_suffix(filters.endpoint_suffix)
+            conditions["endpoint_suffix"] = or_(source.endpoint_rev == rev, source.endpoint_rev.like(below, escape="/"))
+        for field, column, compare in DETAIL_FILTERS:
+            value = getattr(filters, field)
+            if value is not None:
+                # Rows whose detail value is missing or unparseable (NULL) never match
+                conditions[field] = compare(getattr(source, column), value)
+        return conditions
 
     def get(self, record_id: str) -> Optional[DatabaseRecord]:
         db_record = self.db.query(DatabaseRecordModel).filter(
@@ -102,6 +420,7 @@ class InventoryStore:
     def create(self, data: DatabaseRecordCreate) -> DatabaseRecord:
         db_record = DatabaseRecordModel(**data.model_dump())
         self.db.add(db_record)
+        bump_generation(self.db)
         self.db.commit()
         self.db.refresh(db_record)
         return self._model_to_schema(db_record)
@@ -114,19 +433,23 @@ class InventoryStore:
         if not db_record:
             return False
         self.db.delete(db_record)
+        bump_generation(self.db)
         self.db.commit()
         return True
     def purge_all(self) -> int:
         """Delete all database records."""
         count = self.db.query(DatabaseRecordModel).delete()
+        bump_generation(self.db)
         self.db.commit()
         return count
 
-    def bulk_create(self, data_list: List[DatabaseRecordCreate]) -> tuple[List[DatabaseRecord], List[dict]]:
+    def bulk_create(self, data_list: List[DatabaseRecordCreate], commit: bool = True) -> tuple[List[DatabaseRecord], List[dict]]:
         """
         Create multiple records in a single operation, skipping duplicates.
         Returns: (created_records, duplicates_skipped)
         Duplicate detection: service name (matches unique constraint)
+        With commit=False the records are only flushed so the caller can group
+        several batches into one transaction; later batches still see them as duplicates.
         """
         db_records = []
         duplicates = []
@@ -171,15 +494,78 @@ class InventoryStore:
         try:
             if db_records:
                 self.db.add_all(db_records)
+                bump_generation(self.db)
+                if not commit:
+                    self.db.flush()
+                    display_names = self._display_names()
+                    return [self._model_to_schema(record, display_names) for record in db_records], duplicates
                 self.db.commit()
                 for record in db_records:
                     self.db.refresh(record)
-            return [self._model_to_schema(record) for record in db_records], duplicates
+            display_names = self._display_names()
+            return [self._model_to_schema(record, display_names) for record in db_records], duplicates
         except Exception as e:
             self.db.rollback()
             raise
 
-    def delete_records_not_in_csv(self, provider: DatabaseProvider, csv_records: List[DatabaseRecordCreate]) -> List[dict]:
+    def bulk_create_rows(self, rows: List[DatabaseRow], commit: bool = True) -> tuple[int, List[dict]]:
+        """
+        Import fast path: same duplicate rules as bulk_create, but rows stay plain tuples.
+        Existing services are looked up in one query per 5000 rows and the new rows go in
+        through COPY, with no Pydantic or ORM object per row.
+        Returns: (created_count, duplicates_skipped)
+        """
+        duplicates = []
+        existing = set()
+        services = list({row.service for row in rows})
+        for start in range(0, len(services), 5000):
+            existing.update(
+                service for (service,) in self.db.query(DatabaseRecordModel.service)
+                .filter(DatabaseRecordModel.service.in_(services[start:start + 5000]))
+            )
+
+        fresh: dict = {}
+        seen_services = set()
+        for row in rows:
+            if row.service in seen_services:
+                reason = "Duplicate service name in CSV file"
+            elif row.service in existing:
+                reason = "Service name already exists in database"
+            else:
+                seen_services.add(row.service)
+                fresh_row = database_record_row(row)
+                fresh[fresh_row[0]] = fresh_row
+                continue
+            duplicates.append({
+                "provider": row.provider.value,
+                "service": row.service,
+                "region": row.region,
+                "reason": reason,
+            })
+
+        try:
+            _, inserted_ids = copy_rows_ignore_conflicts(
+                self.db, "database_records", DATABASE_RECORD_COLUMNS, fresh.values()
+            )
+            # Rows rejected by the endpoint unique constraint
+            for record_id in fresh.keys() - set(inserted_ids):
+                row = DatabaseRow(*fresh[record_id][1:])
+                duplicates.append({
+                    "provider": row.provider.value,
+                    "service": row.service,
+                    "region": row.region,
+                    "reason": "Endpoint already exists in database",
+                })
+            if inserted_ids:
+                bump_generation(self.db)
+            if commit:
+                self.db.commit()
+            return len(inserted_ids), duplicates
+        except Exception:
+            self.db.rollback()
+            raise
+
+    def delete_records_not_in_csv(self, provider: DatabaseProvider, csv_records: List[DatabaseRecordCreate | DatabaseRow]) -> List[dict]:
         """
         Delete records from database that don't exist in the CSV import.
         CSV is the source of truth. Returns list of deleted records.
@@ -209,6 +595,7 @@ class InventoryStore:
                 self.db.delete(record)
         
         if deleted:
+            bump_generation(self.db)
             self.db.commit()
         
         return deleted
@@ -220,112 +607,14 @@ class InventoryStore:
         if not db_record:
             raise KeyError(record_id)
         db_record.status = status
+        bump_generation(self.db)
         self.db.commit()
         self.db.refresh(db_record)
         return self._model_to_schema(db_record)
 
-    def stats(self, filters: Optional[InventoryFilters] = None) -> dict:
+    def stats(self, filters: Optional[InventoryFilters] = None, exclude_stopped: bool = False) -> dict:
         """Calculate statistics based on optional filters."""
-        # Build base query with filters
-        query = self.db.query(DatabaseRecordModel)
-        
-        if filters:
-            if filters.provider:
-                query = query.filter(DatabaseRecordModel.provider == filters.provider)
-            if filters.region:
-                query = query.filter(
-                    func.lower(DatabaseRecordModel.region) == filters.region.lower()
-                )
-            if filters.status:
-                query = query.filter(DatabaseRecordModel.status == filters.status)
-            if filters.engine:
-                query = query.filter(
-                    func.lower(DatabaseRecordModel.engine).contains(filters.engine.lower())
-                )
-            if filters.version:
-                query = query.filter(
-                    func.lower(DatabaseRecordModel.version).contains(filters.version.lower())
-                )
-            if filters.subscription:
-                # Handle AWS account name mapping (same as in list method)
-                from .aws_account_store import AWSAccountStore
-                aws_store = AWSAccountStore(self.db)
-                account_names = aws_store.get_account_names_map()
-                
-                # Check if the filter is a friendly name and find the corresponding account ID
-                account_id_filter = None
-                for acct_id, friendly_name in account_names.items():
-                    if friendly_name.lower() == filters.subscription.lower():
-                        account_id_filter = acct_id
-                        break
-                
-                if account_id_filter:
-                    # Filter by the account ID (which may have or not have leading zeros)
-                    query = query.filter(
-                        or_(
-                            func.lower(DatabaseRecordModel.subscription).contains(account_id_filter.lower()),
-                            func.lower(DatabaseRecordModel.subscription).contains(account_id_filter.lstrip('0').lower() if account_id_filter.isdigit() else account_id_filter.lower())
-                        )
-                    )
-                else:
-                    # Filter by the subscription as-is (for non-AWS subscriptions or direct ID matching)
-                    query = query.filter(
-                        func.lower(DatabaseRecordModel.subscription).contains(filters.subscription.lower())
-                    )
-            if filters.search:
-                text = filters.search.lower()
-                query = query.filter(
-                    or_(
-                        func.lower(DatabaseRecordModel.engine).contains(text),
-                        func.lower(DatabaseRecordModel.service).contains(text),
-                        func.lower(DatabaseRecordModel.endpoint).contains(text),
-                        func.cast(DatabaseRecordModel.tags, String).ilike(f"%{text}%"),
-                    )
-                )
-        
-        # Count total
-        total = query.with_entities(func.count(DatabaseRecordModel.id)).scalar()
-
-        # Count by provider
-        by_provider_result = (
-            query.with_entities(
-                DatabaseRecordModel.provider,
-                func.count(DatabaseRecordModel.id)
-            )
-            .group_by(DatabaseRecordModel.provider)
-            .all()
-        )
-        by_provider = {
-            (provider.value if hasattr(provider, 'value') else str(provider)): count 
-            for provider, count in by_provider_result
-        }
-
-        # Count by status
-        by_status_result = (
-            query.with_entities(
-                DatabaseRecordModel.status,
-                func.count(DatabaseRecordModel.id)
-            )
-            .group_by(DatabaseRecordModel.status)
-            .all()
-        )
-        by_status = {
-            (status.value if hasattr(status, 'value') else str(status)): count 
-            for status, count in by_status_result
-        }
-
-        # Total storage
-        storage_result = query.with_entities(
-            func.sum(DatabaseRecordModel.storage_gb)
-        ).scalar()
-        storage_gb_total = int(storage_result) if storage_result else 0
-
-        return {
-            "total": total,
-            "by_provider": by_provider,
-            "by_status": by_status,
-            "storage_gb_total": storage_gb_total,
-        }
+        return self.dashboard(filters, exclude_stopped)["stats"]
 
     def find_duplicates(self) -> dict:
         """Find potential duplicate records based on provider + service + region.
@@ -350,6 +639,7 @@ class InventoryStore:
 
         duplicate_groups: list[dict] = []
         total_duplicates = 0
+        display_names = self._display_names()
         for provider, service, region, count in groups:
             # Fetch records for this group
             records = (
@@ -361,7 +651,7 @@ class InventoryStore:
                 )
                 .all()
             )
-            dup_records = [self._model_to_schema(r) for r in records]
+            dup_records = [self._model_to_schema(r, display_names) for r in records]
             duplicate_groups.append({
                 "provider": provider.value if hasattr(provider, "value") else provider,
                 "service": service,
@@ -448,6 +738,7 @@ class InventoryStore:
             )
 
         if deleted_ids:
+            bump_generation(self.db)
             self.db.commit()
 
         return {
@@ -459,171 +750,429 @@ class InventoryStore:
             "details": details,
         }
 
-    def metrics(self) -> dict:
+    def metrics(self, exclude_stopped: bool = False) -> dict:
         """Return RDBMS counts and version breakdown for postgres, mysql, mssql."""
-        db_records = self.db.query(DatabaseRecordModel.engine, DatabaseRecordModel.version).all()
-
-        def normalize_engine(name: str) -> str:
-            n = (name or "").lower()
-            if "postgre" in n:
-                return "postgres"
-            if "mysql" in n:
-                return "mysql"
-            if "mssql" in n or "sql server" in n or "sqlserver" in n:
-                return "mssql"
-            return n or "unknown"
-
-        rdbms_counts: dict[str, int] = {"postgres": 0, "mysql": 0, "mssql": 0}
-        version_counts: dict[str, dict[str, int]] = {"postgres": {}, "mysql": {}, "mssql": {}}
-
-        for engine, version in db_records:
-            key = normalize_engine(engine)
-            if key in rdbms_counts:
-                rdbms_counts[key] += 1
+        return self.dashboard(None, exclude_stopped)["metrics"]
+
+    def upgrades_needed(
+        self,
+        filters: InventoryFilters | None = None,
+        exclude_stopped: bool = False,
+        limit: Optional[int] = None,
+        after: Optional[str] = None,
+    ) -> dict:
+        """
+        Databases below the minimum version of an upgrade policy in force, ordered by service.
+        The policies compile to one predicate over the indexed version key, so the per-engine
+        counts and the page are two queries and nothing is evaluated per row in Python.
+        policies lists every policy with the number of matching databases below its minimum,
+        including policies whose eol_date is still ahead. after is the last service of the
+        previous page (keyset pagination); limit 0 returns only the counts.
+        """
+        if filters is None:
+            filters = InventoryFilters()
+
+        conditions = list(self._filter_conditions(filters).values())
+        if exclude_stopped:
+            conditions.append(DatabaseRecordModel.status != DatabaseStatus.stopped)
+
+        policy_store = UpgradePolicyStore(self.db)
+        minimums = policy_store.minimums()
+        needed = upgrade_predicate(minimums)
+        by_family = [upgrade_predicate({name: minimums[name]} if name in minimums else {}) for name in ENGINE_FAMILIES]
+        below = [
+            upgrade_predicate({policy.engine_family: (policy.min_major, policy.min_minor)})
+            for policy in policy_store.policies()
+        ]
+        counts = self.db.query(
+            *[func.count().filter(predicate) for predicate in by_family + below]
+        ).filter(or_(needed, *below), *conditions).one()
+        by_engine = dict(zip(ENGINE_FAMILIES, counts))
+
+        rows: List[Dict[str, Any]] = []
+        more = False
+        if limit != 0:
+            columns = [getattr(DatabaseRecordModel, name) for name in LIST_ROW_COLUMNS]
+            query = self.db.query(*columns).filter(needed, *conditions)
+            if after:
+                query = query.filter(DatabaseRecordModel.service > after)
+            query = query.order_by(DatabaseRecordModel.service)
+            if limit is not None:
+                query = query.limit(limit + 1)
+            tenant_names, account_names = self._display_names()
+            rows = [_row_dict(record, tenant_names, account_names) for record in query]
+            if limit is not None and len(rows) > limit:
+                rows, more = rows[:limit], True
+
+        return {
+            "total": sum(by_engine.values()),
+            "by_engine": by_engine,
+            "databases": rows,
+            "next_after": rows[-1]["service"] if more else None,
+            "policies": [
+                {**schema.model_dump(mode="json"), "count": count}
+                for schema, count in zip(policy_store.list(), counts[len(ENGINE_FAMILIES):])
+            ],
+        }
+
+    def _dashboard_groups(self, filters: Optional[InventoryFilters], exclude_stopped: bool) -> List[tuple]:
+        """(provider, status, engine, version, region, count, storage) groups from SQL, in one snapshot."""
+        # The isolation level can only be chosen when the transaction starts
+        self.db.rollback()
+        self.db.connection(execution_options={"isolation_level": "REPEATABLE READ"})
+        try:
+            # The materialized summary answers everything but text search, tags, endpoints and details, when it is up to date
+            if _summary_answers(filters) and summary_is_current(self.db):
+                source = inventory_summary.c
+                count = func.sum(source.record_count)
+            else:
+                source = DatabaseRecordModel
+                count = func.count(source.id)
+            group_columns = (source.provider, source.status, source.engine, source.version, source.region)
+            query = self.db.query(*group_columns, count, func.coalesce(func.sum(source.storage_gb), 0))
+            if filters:
+                query = self._apply_filters(query, filters, source)
+            if exclude_stopped:
+                query = query.filter(source.status != DatabaseStatus.stopped)
+            return [tuple(group) for group in query.group_by(*group_columns).all()]
+        finally:
+            self.db.rollback()
+
+    def dashboard(self, filters: Optional[InventoryFilters] = None, exclude_stopped: bool = False) -> dict:
+        """
+        Stats, RDBMS/version metrics, upgrade counts and cost totals for the dashboard.
+        Everything is derived from one aggregate query grouped by provider, status, engine,
+        version and region, run in a REPEATABLE READ snapshot so all numbers agree. When the
+        inventory_summary view is current it is aggregated instead of the base table, and when
+        the columnar read model is enabled and current the groups come from memory.
+        """
+        snapshot = read_model.current(self.db)
+        if snapshot is not None:
+            groups = snapshot.databases.group_sum(
+                ("provider", "status", "engine", "version", "region"),
+                self._snapshot_mask(snapshot, filters, exclude_stopped),
+                "storage_gb",
+            )
+            if read_model.verify:
+                read_model.compare(
+                    "dashboard",
+                    sorted(map(_comparable_group, groups), key=repr),
+                    sorted(map(_comparable_group, self._dashboard_groups(filters, exclude_stopped)), key=repr),
+                )
+        else:
+            groups = self._dashboard_groups(filters, exclude_stopped)
+
+        total = 0
+        storage_gb_total = 0
+        by_provider: dict[str, int] = {}
+        by_status: dict[str, int] = {}
+        rdbms_counts = {family: 0 for family in ENGINE_FAMILIES}
+        version_counts: dict[str, dict[str, int]] = {family: {} for family in ENGINE_FAMILIES}
+        upgrades_by_engine = {family: 0 for family in ENGINE_FAMILIES}
+        minimums = UpgradePolicyStore(self.db).minimums()
+        total_hourly = 0.0
+
+        for provider, status, engine, version, region, count, storage in groups:
+            count = int(count)
+            storage = int(storage)
+            total += count
+            storage_gb_total += storage
+            by_provider[provider.value] = by_provider.get(provider.value, 0) + count
+            by_status[status.value] = by_status.get(status.value, 0) + count
+
+            family = normalize_engine(engine)
+            if family in ENGINE_FAMILIES:
+                rdbms_counts[family] += count
                 v = version or "unknown"
-                vc = version_counts[key]
-                vc[v] = vc.get(v, 0) + 1
+                version_counts[family][v] = version_counts[family].get(v, 0) + count
+                if requires_upgrade(minimums, family, version):
+                    upgrades_by_engine[family] += count
+
+            # Cost is linear in storage, so a group's cost needs only its row count and storage sum
+            total_hourly += (
+                count * self._estimate_hourly_cost(provider, engine, region, 0)
+                + storage * STORAGE_RATES.get(provider, 0.115) / HOURS_PER_MONTH
+            )
 
         total_tracked = sum(rdbms_counts.values())
+        return {
+            "stats": {
+                "total": total,
+                "by_provider": by_provider,
+                "by_status": by_status,
+                "storage_gb_total": storage_gb_total,
+            },
+            "metrics": {
+                "rdbms_counts": rdbms_counts,
+                "rdbms_percentages": {
+                    k: (v / total_tracked * 100 if total_tracked else 0) for k, v in rdbms_counts.items()
+                },
+                "version_counts": version_counts,
+            },
+            "upgrades": {
+                "total": sum(upgrades_by_engine.values()),
+                "by_engine": upgrades_by_engine,
+            },
+            "pricing": {
+                "total_hourly": round(total_hourly, 2),
+                "total_monthly": round(total_hourly * HOURS_PER_MONTH, 2),
+                "count": total,
+            },
+        }
+
+    def facets(self, filters: InventoryFilters, exclude_stopped: bool = False) -> dict:
+        """
+        Record counts per value of every filter dimension. Each dimension is counted under all
+        the other filters but not its own, so the counts are what choosing that value would return.
+        One statement: a grouping set per dimension, with a FILTER aggregate per dimension.
+        """
+        if _summary_answers(filters) and summary_is_current(self.db):
+            source = inventory_summary.c
+            count = func.sum(source.record_count)
+        else:
+            source = DatabaseRecordModel
+            count = func.count(source.id)
+        conditions = self._filter_conditions(filters, source)
+        if exclude_stopped:
+            conditions["exclude_stopped"] = source.status != DatabaseStatus.stopped
+
+        def count_without(dimension: Optional[str]):
+            others = [condition for name, condition in conditions.items() if name != dimension]
+            return func.coalesce(count.filter(and_(*others)) if others else count, 0)
+
+        columns = [getattr(source, dimension) for dimension in FACET_DIMENSIONS]
+        grouping_sets = [
+            # Subscriptions are grouped with their provider, which decides their display name
+            tuple_(source.provider, source.subscription) if dimension == "subscription" else column
+            for dimension, column in zip(FACET_DIMENSIONS, columns)
+        ]
+        query = self.db.query(
+            *columns,
+            *[func.grouping(column) for column in columns],
+            *[count_without(dimension) for dimension in FACET_DIMENSIONS],
+            count_without(None),
+        ).group_by(func.grouping_sets(*grouping_sets, tuple_()))
+
+        from .aws_account_store import AWSAccountStore
+        account_names = AWSAccountStore(self.db).get_account_names_map()
+        n = len(FACET_DIMENSIONS)
+        counts: Dict[str, Dict[str, int]] = {dimension: {} for dimension in FACET_DIMENSIONS}
+        total = 0
+        for row in query:
+            values, grouped, dimension_counts = row[:n], row[n:2 * n], row[2 * n:3 * n]
+            if all(grouped):
+                total = int(row[3 * n])
+                continue
+            # The one dimension (besides subscription's provider) this row is grouped by
+            i = max(k for k in range(n) if not grouped[k])
+            dimension, value = FACET_DIMENSIONS[i], values[i]
+            if value is None or value == "":
+                continue
+            if dimension == "subscription":
+                value = _subscription_display(values[0], value, account_names)
+            elif isinstance(value, Enum):
+                value = value.value
+            counts[dimension][value] = counts[dimension].get(value, 0) + int(dimension_counts[i])
 
         return {
-            "rdbms_counts": rdbms_counts,
-            "rdbms_percentages": {k: (v / total_tracked * 100 if total_tracked else 0) for k, v in rdbms_counts.items()},
-            "version_counts": version_counts,
+            "total": total,
+            "facets": {
+                dimension: [{"value": value, "count": counts[dimension][value]} for value in sorted(counts[dimension])]
+                for dimension in FACET_DIMENSIONS
+            },
         }
 
-    def upgrades_needed(self, filters: InventoryFilters | None = None) -> dict:
-        """Return databases that need version upgrades based on minimum thresholds."""
-        if filters is None:
-            filters = InventoryFilters()
-        
-        # Start with all records then apply filters
-        query = self.db.query(DatabaseRecordModel)
-        
-        if filters.provider:
-            query = query.filter(DatabaseRecordModel.provider == filters.provider)
-        if filters.engine:
+    def tag_counts(self, prefix: Optional[str] = None, limit: int = 100) -> dict:
+        """Distinct tags with the number of records carrying each, most common first."""
+        tags = self.db.query(func.unnest(DatabaseRecordModel.tags).label("tag")).subquery()
+        query = self.db.query(tags.c.tag, func.count().label("count"))
+        if prefix:
+            query = query.filter(tags.c.tag.startswith(prefix, autoescape=True))
+        counts = query.group_by(tags.c.tag).subquery()
+        # The window count is taken before LIMIT, so it is the number of distinct tags
+        rows = (
+            self.db.query(counts.c.tag, counts.c.count, func.count().over())
+            .order_by(counts.c.count.desc(), counts.c.tag)
+            .limit(limit)
+            .all()
+        )
+        return {
+            "distinct_tags": rows[0][2] if rows else 0,
+            "tags": [{"tag": tag, "count": count} for tag, count, _ in rows],
+        }
+
+    def endpoint_domains(self, depth: int = 3, suffix: Optional[str] = None, limit: int = 100) -> dict:
+        """
+        Records and storage per endpoint domain: endpoints rolled up to their last depth labels
+        (depth 3: rds.amazonaws.com), optionally only those under suffix, largest first.
+        """
+        labels = func.string_to_array(DatabaseRecordModel.endpoint_rev, ".", type_=postgresql.ARRAY(String))
+        domain = func.array_to_string(labels[1:depth], ".").label("domain")
+        query = self.db.query(
+            domain,
+            func.count(DatabaseRecordModel.id),
+            func.coalesce(func.sum(DatabaseRecordModel.storage_gb), 0),
+            # Taken before LIMIT, so it is the number of distinct domains
+            func.count().over(),
+        )
+        if suffix:
+            rev, below = _endpoint_suffix(suffix)
             query = query.filter(
-                func.lower(DatabaseRecordModel.engine).contains(filters.engine.lower())
+                or_(DatabaseRecordModel.endpoint_rev == rev, DatabaseRecordModel.endpoint_rev.like(below, escape="/"))
             )
-        if filters.version:
-            query = query.filter(DatabaseRecordModel.version == filters.version)
-        if filters.subscription:
-            query = query.filter(
-                func.lower(DatabaseRecordModel.subscription).contains(filters.subscription.lower())
+        rows = (
+            query.group_by(domain)
+            .order_by(func.count(DatabaseRecordModel.id).desc(), domain)
+            .limit(limit)
+            .all()
+        )
+        return {
+            "distinct_domains": rows[0][3] if rows else 0,
+            "domains": [
+                {"domain": domain_order(rev), "count": count, "storage_gb": int(storage)}
+                for rev, count, storage, _ in rows
+            ],
+        }
+
+    def rollup(
+        self,
+        group_by: Sequence[str],
+        measures: Sequence[str] = ROLLUP_MEASURES,
+        filters: Optional[InventoryFilters] = None,
+        exclude_stopped: bool = False,
+        mode: str = "rollup",
+    ) -> dict:
+        """
+        Measures per combination of the group_by dimensions with their subtotals: one
+        GROUP BY ROLLUP (hierarchical subtotals, in group_by order) or CUBE (every combination)
+        statement under the usual filters. rolled_up lists the dimensions a row totals over.
+        subscription is the AWS account name where known; business_unit comes from aws_accounts.
+        """
+        group_by = list(dict.fromkeys(group_by))
+        measures = list(dict.fromkeys(measures))
+        if not group_by:
+            raise ValueError("group_by needs at least one dimension")
+        unknown = [name for name in group_by if name not in ROLLUP_DIMENSIONS]
+        unknown += [name for name in measures if name not in ROLLUP_MEASURES]
+        if unknown:
+            raise ValueError(f"Unknown dimensions or measures: {', '.join(unknown)}")
+
+        # Cost is linear in record count and storage, so the summary view answers it too
+        if _summary_answers(filters) and summary_is_current(self.db):
+            table, source = inventory_summary, inventory_summary.c
+            count = source.record_count
+        else:
+            table, source = DatabaseRecordModel.__table__, DatabaseRecordModel
+            count = literal(1)
+
+        accounts = None
+        if "subscription" in group_by or "business_unit" in group_by:
+            # One row per canonical account ID, so the join never multiplies records
+            account_id = _canonical_account_id(AWSAccountModel.account_id)
+            accounts = (
+                select(account_id.label("account_id"), AWSAccountModel.account_name, AWSAccountModel.business_unit)
+                .where(account_id.isnot(None))
+                .distinct(account_id)
+                .order_by(account_id, AWSAccountModel.account_id)
+                .subquery()
             )
-        if filters.status:
-            query = query.filter(DatabaseRecordModel.status == filters.status)
-        
-        db_records = query.all()
-
-        def normalize_engine(name: str) -> str:
-            n = (name or "").lower()
-            if "postgre" in n:
-                return "postgres"
-            if "mysql" in n:
-                return "mysql"
-            if "mssql" in n or "sql server" in n or "sqlserver" in n:
-                return "mssql"
-            return "unknown"
-
-        def needs_upgrade(engine: str, version: str) -> bool:
-            """Check if version is below minimum threshold."""
-            if not version:
-                return True  # Unknown version assumed needs upgrade
-            v = version.lower()
-            if engine == "postgres":
-                # Extract major version (e.g., "15.4" -> 15)
-                try:
-                    major = int(v.split('.')[0]) if '.' in v else int(v.split()[0])
-                    return major < 13
-                except (ValueError, IndexError):
-                    return True
-            elif engine == "mysql":
-                # Check >= 8.0
-                try:
-                    parts = v.split('.')
-                    major = int(parts[0])
-                    minor = int(parts[1]) if len(parts) > 1 else 0
-                    return major < 8 or (major == 8 and minor < 0)
-                except (ValueError, IndexError):
-                    return True
-            elif engine == "mssql":
-                # SQL Server 2017 or later
-                if "2017" in v or "2019" in v or "2022" in v or "2025" in v:
-                    return False
-                if "2016" in v or "2014" in v or "2012" in v or "2008" in v:
-                    return True
-                return True  # Unknown
-            return False
+        expressions = {
+            "provider": source.provider,
+            # The stored upgrade-key columns (also carried by the summary view), as /api/upgrades uses
+            "engine_family": source.engine_family,
+            "version_major": source.version_major,
+            "region": source.region,
+            "subscription": func.coalesce(accounts.c.account_name, source.subscription) if accounts is not None else None,
+            "business_unit": accounts.c.business_unit if accounts is not None else None,
+            "status": source.status,
+        }
+        dimensions = [expressions[name] for name in group_by]
+        measure_columns = {
+            "count": func.sum(count),
+            "storage_gb": func.coalesce(func.sum(source.storage_gb), 0),
+            "cost": func.coalesce(
+                func.sum(_hourly_cost_sql(source.provider, source.engine, source.region, count, source.storage_gb)), 0
+            ),
+        }
 
-        upgrade_list = []
-        for rec in db_records:
-            engine_key = normalize_engine(rec.engine)
-            if engine_key in ["postgres", "mysql", "mssql"]:
-                if needs_upgrade(engine_key, rec.version):
-                    upgrade_list.append(self._model_to_schema(rec))
+        query = self.db.query(
+            *dimensions, func.grouping(*dimensions), *[measure_columns[name] for name in measures]
+        ).select_from(table)
+        if accounts is not None:
+            query = query.outerjoin(
+                accounts,
+                and_(source.provider == DatabaseProvider.aws, accounts.c.account_id == _account_id_norm(source)),
+            )
+        conditions = self._filter_conditions(filters, source) if filters else {}
+        if exclude_stopped:
+            conditions["exclude_stopped"] = source.status != DatabaseStatus.stopped
+        if conditions:
+            query = query.filter(*conditions.values())
+        grouping = func.cube if mode == "cube" else func.rollup
+        query = query.group_by(grouping(*dimensions)).order_by(*dimensions)
 
-        # Count by engine
-        counts = {"postgres": 0, "mysql": 0, "mssql": 0}
-        for item in upgrade_list:
-            eng = normalize_engine(item.engine)
-            if eng in counts:
-                counts[eng] += 1
+        n = len(group_by)
+        rows = []
+        for row in query:
+            values, grouped = row[:n], row[n]
+            entry: Dict[str, Any] = {
+                name: value.value if isinstance(value, Enum) else value for name, value in zip(group_by, values)
+            }
+            # grouping() sets the bit of every dimension a row totals over, first dimension highest
+            entry["rolled_up"] = [name for k, name in enumerate(group_by) if grouped & (1 << (n - 1 - k))]
+            for name, value in zip(measures, row[n + 1:]):
+                if name == "cost":
+                    entry["cost_hourly"] = round(float(value), 2)
+                    entry["cost_monthly"] = round(float(value) * HOURS_PER_MONTH, 2)
+                else:
+                    entry[name] = int(value)
+            rows.append(entry)
+        return {"group_by": group_by, "measures": measures, "mode": mode, "rows": rows}
 
-        return {
-            "total": len(upgrade_list),
-            "by_engine": counts,
-            "databases": upgrade_list,
+    def storage_distribution(
+        self,
+        filters: Optional[InventoryFilters] = None,
+        exclude_stopped: bool = False,
+        top: int = 10,
+        top_by: Optional[str] = None,
+    ) -> dict:
+        """
+        storage_gb histogram, percentiles and totals (one GROUPING SETS query) plus the top
+        largest databases overall or within each top_by value (a second query), under the
+        usual filters.
+        """
+        if top_by is not None and top_by not in STORAGE_TOP_DIMENSIONS:
+            raise ValueError(f"Unknown dimension: {top_by}")
+
+        def apply(query):
+            query = self._apply_filters(query, filters) if filters else query
+            if exclude_stopped:
+                query = query.filter(DatabaseRecordModel.status != DatabaseStatus.stopped)
+            return query
+
+        size = DatabaseRecordModel.storage_gb
+        columns = {
+            name: getattr(DatabaseRecordModel, name)
+            for name in ("id", "service", "provider", "engine", "region", "subscription", "status", "storage_gb")
         }
+        result = size_distribution(self.db, apply, size)
+        ranked = largest(
+            self.db, apply, columns, size, top, getattr(DatabaseRecordModel, top_by) if top_by else None
+        )
+        items = [item for group in ranked for item in group["items"]] if top_by else ranked
+        for item in items:
+            item["provider"] = item["provider"].value
+            item["status"] = item["status"].value
+        for group in ranked if top_by else ():
+            if isinstance(group["group"], Enum):
+                group["group"] = group["group"].value
+        result.update(top_by=top_by, largest=ranked)
+        return result
 
     def get_filter_options(self, provider: Optional[DatabaseProvider] = None) -> dict:
         """Return unique values for filter dropdowns, optionally filtered by provider."""
-        # Base query
-        query = self.db.query(DatabaseRecordModel)
-        
-        # Filter by provider if specified
-        if provider:
-            query = query.filter(DatabaseRecordModel.provider == provider)
-        
-        # Get distinct regions
-        regions = [r[0] for r in query.with_entities(DatabaseRecordModel.region).distinct().all() if r[0]]
-        
-        # Get distinct engines
-        engines = [e[0] for e in query.with_entities(DatabaseRecordModel.engine).distinct().all() if e[0]]
-        
-        # Get distinct versions
-        versions = [v[0] for v in query.with_entities(DatabaseRecordModel.version).distinct().all() if v[0]]
-        
-        # Get distinct subscriptions with AWS account name mapping (always apply mapping)
-        subscriptions_raw = [s[0] for s in query.with_entities(DatabaseRecordModel.subscription).distinct().all() if s[0]]
-        
-        # Always map AWS account IDs to friendly names, regardless of provider filter
-        from .aws_account_store import AWSAccountStore
-        aws_store = AWSAccountStore(self.db)
-        account_names = aws_store.get_account_names_map()
-        
-        subscriptions = []
-        for s in subscriptions_raw:
-            # Try direct mapping first
-            if s in account_names:
-                subscriptions.append(account_names[s])
-            # Try mapping with leading zeros normalized (in case account ID has leading zeros)
-            elif s.isdigit() and s.lstrip('0') in account_names:
-                subscriptions.append(account_names[s.lstrip('0')])
-            else:
-                subscriptions.append(s)
-        
-        # Get distinct statuses for this provider
-        statuses = [s[0] for s in query.with_entities(DatabaseRecordModel.status).distinct().all() if s[0]]
-        
-        return {
-            "regions": sorted(regions),
-            "engines": sorted(engines),
-            "versions": sorted(versions),
-            "subscriptions": sorted(set(subscriptions)),  # Remove duplicates (in case multiple account IDs map to same name)
-            "statuses": sorted(statuses),
-        }
+        options = _filter_options.get(self.db)
+        return options.get(provider) or _FILTER_OPTIONS_EMPTY
 
     def calculate_pricing(self) -> Dict[str, Any]:
         """Calculate hourly and monthly pricing estimates for all database instances.
@@ -644,7 +1193,7 @@ class InventoryStore:
                 record.region,
                 record.storage_gb
             )
-            monthly_cost = hourly_cost * 730  # Average hours per month
+            monthly_cost = hourly_cost * HOURS_PER_MONTH
             
             total_hourly += hourly_cost
             total_monthly += monthly_cost
@@ -681,57 +1230,9 @@ class InventoryStore:
         These are simplified estimates for demonstration purposes.
         Actual costs vary based on instance type, IOPS, backups, etc.
         """
-        # Base compute costs per hour by provider and engine
-        compute_rates = {
-            DatabaseProvider.aws: {
-                "postgres": 0.12,  # db.t3.medium equivalent
-                "mysql": 0.10,
-                "mariadb": 0.10,
-                "oracle": 0.35,
-                "sqlserver": 0.25,
-                "aurora": 0.15,
-            },
-            DatabaseProvider.azure: {
-                "postgres": 0.14,  # B_Standard_B2s equivalent
-                "mysql": 0.12,
-                "sqlserver": 0.28,
-                "mariadb": 0.11,
-            }
-        }
-        
-        # Storage costs per GB per month
-        storage_rates = {
-            DatabaseProvider.aws: 0.115,  # GP2 storage
-            DatabaseProvider.azure: 0.12,  # Standard SSD
-        }
-        
-        # Regional multipliers (US East/Central = 1.0 baseline)
-        region_multipliers = {
-            # AWS regions
-            "us-east-1": 1.0,
-            "us-east-2": 1.0,
-            "us-west-1": 1.05,
-            "us-west-2": 1.05,
-            "eu-west-1": 1.1,
-            "eu-central-1": 1.12,
-            "ap-southeast-1": 1.15,
-            "ap-northeast-1": 1.18,
-            # Azure regions
-            "eastus": 1.0,
-            "eastus2": 1.0,
-            "westus": 1.05,
-            "westus2": 1.05,
-            "centralus": 1.0,
-            "northcentralus": 1.0,
-            "westeurope": 1.1,
-            "northeurope": 1.08,
-            "southeastasia": 1.15,
-            "eastasia": 1.15,
-        }
-        
         # Get base compute cost
         engine_lower = engine.lower()
-        provider_rates = compute_rates.get(provider, {})
+        provider_rates = COMPUTE_RATES.get(provider, {})
         
         # Match engine (handle variants like "postgres", "postgresql")
         base_compute = 0.10  # Default fallback
@@ -742,11 +1243,11 @@ class InventoryStore:
         
         # Apply regional multiplier
         region_lower = region.lower().replace("-", "")
-        region_multiplier = region_multipliers.get(region_lower, 1.0)
+        region_multiplier = REGION_MULTIPLIERS.get(region_lower, 1.0)
         
         # If exact match not found, try partial matches
-        if region_multiplier == 1.0 and region_lower not in region_multipliers:
-            for region_key, multiplier in region_multipliers.items():
+        if region_multiplier == 1.0 and region_lower not in REGION_MULTIPLIERS:
+            for region_key, multiplier in REGION_MULTIPLIERS.items():
                 if region_key in region_lower or region_lower in region_key:
                     region_multiplier = multiplier
                     break
@@ -754,31 +1255,29 @@ class InventoryStore:
         compute_cost = base_compute * region_multiplier
         
         # Storage cost (convert monthly to hourly)
-        storage_cost_monthly = storage_gb * storage_rates.get(provider, 0.115)
-        storage_cost_hourly = storage_cost_monthly / 730
+        storage_cost_monthly = storage_gb * STORAGE_RATES.get(provider, 0.115)
+        storage_cost_hourly = storage_cost_monthly / HOURS_PER_MONTH
         
         total_hourly = compute_cost + storage_cost_hourly
         
         return total_hourly
 
-    def _model_to_schema(self, db_record: DatabaseRecordModel) -> DatabaseRecord:
+    def _display_names(self) -> Tuple[Dict[str, str], Dict[str, str]]:
+        """Tenant and AWS account friendly-name maps, loaded once per listing."""
+        from .aws_account_store import AWSAccountStore
+        return get_tenant_names_map(self.db), AWSAccountStore(self.db).get_account_names_map()
+
+    def _model_to_schema(
+        self,
+        db_record: DatabaseRecordModel,
+        display_names: Optional[Tuple[Dict[str, str], Dict[str, str]]] = None,
+    ) -> DatabaseRecord:
         """Convert SQLAlchemy model to Pydantic schema."""
-        # Map tenant ID to friendly name using database lookup
-        tenant_display = get_tenant_name(self.db, db_record.azure_tenant) if db_record.azure_tenant else "-"
-        
-        # For AWS provider, try to replace account ID with friendly name in subscription field
-        subscription_display = db_record.subscription
-        if db_record.provider == DatabaseProvider.aws:
-            from .aws_account_store import AWSAccountStore
-            aws_store = AWSAccountStore(self.db)
-            account_names = aws_store.get_account_names_map()
-            # Try direct mapping first
-            if db_record.subscription in account_names:
-                subscription_display = account_names[db_record.subscription]
-            # Try mapping with leading zeros normalized (in case account ID has leading zeros)
-            elif db_record.subscription.isdigit() and db_record.subscription.lstrip('0') in account_names:
-                subscription_display = account_names[db_record.subscription.lstrip('0')]
-        
+        tenant_names, account_names = display_names or self._display_names()
+        # Map tenant ID to friendly name
+        tenant_display = (
+            tenant_names.get(db_record.azure_tenant, db_record.azure_tenant) if db_record.azure_tenant else "-"
+        )
         return DatabaseRecord(
             id=db_record.id,
             provider=db_record.provider,
@@ -788,8 +1287,15 @@ class InventoryStore:
             endpoint=db_record.endpoint,
             storage_gb=db_record.storage_gb,
             status=db_record.status,
-            subscription=subscription_display,
+            subscription=_subscription_display(db_record.provider, db_record.subscription, account_names),
             tags=db_record.tags or [],
             version=db_record.version,
             azure_tenant=tenant_display,
+            availability_zone=db_record.availability_zone,
+            auto_scaling=db_record.auto_scaling,
+            iops=db_record.iops,
+            high_availability_state=db_record.high_availability_state,
+            replica=db_record.replica,
+            backup_retention_days=db_record.backup_retention_days,
+            geo_redundant_backup=db_record.geo_redundant_backup,
         )
@@ -0,0 +1,160 @@
+"""
+Materialized summary of database_records used for unfiltered and lightly filtered
+dashboard aggregates.
+
+inventory_summary holds one row per (provider, status, engine, version, region,
+subscription) with the record count and storage sum, plus the engine_family and
+version_major upgrade keys derived from them. A background task started in the
+app lifespan refreshes it CONCURRENTLY once writes have settled (debounced on the
+inventory generation counter), and records the generation the refresh reflects.
+Readers only use the view when that generation equals the live one, so they never see
+stale numbers; otherwise they aggregate the base table.
+"""
+import asyncio
+import os
+import time
+
+from sqlalchemy import BigInteger, Column, Integer, MetaData, String, Table, text
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.orm import Session
+
+from .database import Base, SessionLocal
+from .generation import InventoryGeneration
+from .models import DatabaseRecordModel
+
+SUMMARY_REFRESH_ENABLED = os.getenv("SUMMARY_REFRESH_ENABLED", "true").lower() in ("1", "true", "yes")
+# Refresh once no write has happened for this long...
+SUMMARY_DEBOUNCE_SECONDS = float(os.getenv("SUMMARY_DEBOUNCE_SECONDS", "2"))
+# ...but never lag behind continuous writes for longer than this
+SUMMARY_MAX_DELAY_SECONDS = float(os.getenv("SUMMARY_MAX_DELAY_SECONDS", "30"))
+SUMMARY_POLL_SECONDS = float(os.getenv("SUMMARY_POLL_SECONDS", "1"))
+
+# Serializes refreshes across worker processes
+_REFRESH_LOCK_ID = 0x1D5E_5A11
+
+_records = DatabaseRecordModel.__table__.c
+
+inventory_summary = Table(
+    "inventory_summary",
+    MetaData(),
+    Column("provider", _records.provider.type),
+    Column("status", _records.status.type),
+    Column("engine", String),
+    Column("version", String),
+    Column("region", String),
+    Column("subscription", String),
+    Column("engine_family", String),
+    Column("version_major", Integer),
+    Column("record_count", BigInteger),
+    Column("storage_gb", BigInteger),
+)
+
+
+class InventorySummaryState(Base):
+    """Inventory generation reflected by the current contents of inventory_summary."""
+    __tablename__ = "inventory_summary_state"
+
+    id = Column(Integer, primary_key=True)
+    generation = Column(BigInteger, nullable=False)
+
+
+def create_summary_view(conn) -> None:
+    """Create the materialized view and the unique index REFRESH ... CONCURRENTLY needs."""
+    # Views created before the upgrade-key columns were carried are rebuilt
+    outdated = conn.execute(text(
+        """
+        SELECT to_regclass('inventory_summary') IS NOT NULL AND NOT EXISTS (
+            SELECT 1 FROM pg_attribute
+            WHERE attrelid = to_regclass('inventory_summary') AND attname = 'version_major'
+        );
+        """
+    )).scalar()
+    if outdated:
+        conn.execute(text("DROP MATERIALIZED VIEW inventory_summary;"))
+    # version is coalesced so the unique index never has to compare NULLs; engine_family and
+    # version_major are derived from engine and version, so they do not split any group
+    conn.execute(text(
+        """
+        CREATE MATERIALIZED VIEW IF NOT EXISTS inventory_summary AS
+        SELECT provider, status, engine, COALESCE(version, '') AS version, region, subscription,
+               engine_family, version_major,
+               COUNT(*) AS record_count, COALESCE(SUM(storage_gb), 0) AS storage_gb
+        FROM database_records
+        GROUP BY provider, status, engine, COALESCE(version, ''), region, subscription, engine_family, version_major;
+        """
+    ))
+    conn.execute(text(
+        """
+        CREATE UNIQUE INDEX IF NOT EXISTS inventory_summary_key
+        ON inventory_summary (provider, status, engine, version, region, subscription);
+        """
+    ))
+
+
+def refresh_summary(db: Session) -> bool:
+    """
+    Refresh inventory_summary and record the generation it reflects.
+    Returns False if another process is already refreshing.
+    """
+    if not db.execute(text("SELECT pg_try_advisory_xact_lock(:id)"), {"id": _REFRESH_LOCK_ID}).scalar():
+        db.rollback()
+        return False
+    # Read the generation first: the refresh then sees at least this state, and any newer
+    # data comes with a newer generation, so readers will not trust the view for it
+    generation = db.query(InventoryGeneration.generation).filter(InventoryGeneration.id == 1).scalar() or 0
+    db.execute(text("REFRESH MATERIALIZED VIEW CONCURRENTLY inventory_summary"))
+    statement = insert(InventorySummaryState).values(id=1, generation=generation)
+    db.execute(statement.on_conflict_do_update(index_elements=[InventorySummaryState.id], set_={"generation": generation}))
+    db.commit()
+    return True
+
+
+def summary_is_current(db: Session) -> bool:
+    """True when inventory_summary reflects the latest committed generation (as seen by db's snapshot)."""
+    live = db.query(InventoryGeneration.generation).filter(InventoryGeneration.id == 1).scalar() or 0
+    summarized = db.query(InventorySummaryState.generation).filter(InventorySummaryState.id == 1).scalar()
+    return summarized == live
+
+
+def _read_generation() -> int:
+    db = SessionLocal()
+    try:
+        return db.query(InventoryGeneration.generation).filter(InventoryGeneration.id == 1).scalar() or 0
+    finally:
+        db.close()
+
+
+def _refresh() -> bool:
+    db = SessionLocal()
+    try:
+        return refresh_summary(db)
+    finally:
+        db.close()
+
+
+async def run_summary_refresher() -> None:
+    """Background loop: refresh the summary after writes settle (debounced)."""
+    refreshed = None
+    first_change_at = None
+    last_seen = None
+    last_change_at = 0.0
+    while True:
+        try:
+            generation = await asyncio.to_thread(_read_generation)
+            now = time.monotonic()
+            if generation != last_seen:
+                last_seen = generation
+                last_change_at = now
+            if generation != refreshed:
+                first_change_at = first_change_at or now
+                settled = now - last_change_at >= SUMMARY_DEBOUNCE_SECONDS
+                overdue = now - first_change_at >= SUMMARY_MAX_DELAY_SECONDS
+                # Always refresh once at startup: the view may predate writes made while we were down
+                if (settled or overdue or refreshed is None) and await asyncio.to_thread(_refresh):
+                    refreshed = generation
+                    first_change_at = None
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            print(f"Summary refresh failed: {e}")
+        await asyncio.sleep(SUMMARY_POLL_SECONDS)
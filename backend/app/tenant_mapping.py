@@ -45,3 +45,8 @@ def get_tenant_name(db: Session, tenant_id: str) -> str:
     ).first()
     
     return mapping.friendly_name if mapping else tenant_id
+
+
+def get_tenant_names_map(db: Session) -> dict:
+    """Get a mapping of tenant_id -> friendly name for all known tenants."""
+    return {m.tenant_id: m.friendly_name for m in db.query(AzureTenantMapping).all()}
@@ -0,0 +1,17 @@
+from sqlalchemy import Column, Date, Integer, String
+import uuid
+from .database import Base
+
+
+class UpgradePolicyModel(Base):
+    """A minimum version for an engine family, in force from eol_date (or always, without one)."""
+    __tablename__ = "upgrade_policies"
+
+    id = Column(String, primary_key=True, default=lambda: str(uuid.uuid4()))
+    engine_family = Column(String, nullable=False)
+    min_version = Column(String, nullable=False)
+    # min_version parsed like database_records.version_major/version_minor
+    min_major = Column(Integer, nullable=False)
+    min_minor = Column(Integer, nullable=False)
+    eol_date = Column(Date, nullable=True)
+    description = Column(String, nullable=True)
@@ -0,0 +1,179 @@
+"""
+Upgrade policies: per engine family, the minimum version a database must run, optionally from
+an end-of-life date. Policies are rows of upgrade_policies, so thresholds change without a
+deploy; they compile to a predicate over the parsed version key columns of database_records.
+"""
+import re
+from datetime import date
+from typing import Dict, List, Optional, Tuple
+
+from sqlalchemy import and_, false, or_, tuple_
+from sqlalchemy.orm import Session
+
+from .generation import GenerationCache, bump_generation
+from .models import (
+    ENGINE_FAMILIES,
+    VERSION_MINOR_PATTERN,
+    VERSION_NUMBER_PATTERN,
+    VERSION_YEAR_PATTERN,
+    DatabaseRecordModel,
+)
+from .schemas import UpgradePolicy, UpgradePolicyCreate
+from .upgrade_policy_models import UpgradePolicyModel
+
+# Seeded into an empty upgrade_policies table: the thresholds upgrades used to hard-code
+DEFAULT_UPGRADE_POLICIES = (
+    ("postgres", "13", "PostgreSQL 13 or later"),
+    ("mysql", "8.0", "MySQL 8.0 or later"),
+    ("mssql", "2017", "SQL Server 2017 or later"),
+)
+
+# engine family -> minimum (major, minor) of the policies in force
+Minimums = Dict[str, Tuple[int, int]]
+
+
+def version_key(engine_family: str, version: Optional[str]) -> Tuple[Optional[int], int]:
+    """Python form of the version_major/version_minor generation expressions."""
+    text = version or ""
+    if engine_family == "mssql":
+        year = re.search(VERSION_YEAR_PATTERN, text)
+        return (int(year.group(1)) if year else None), 0
+    major = re.match(VERSION_NUMBER_PATTERN, text)
+    minor = re.match(VERSION_MINOR_PATTERN, text)
+    return (int(major.group(1)) if major else None), (int(minor.group(1)) if minor else 0)
+
+
+def upgrade_predicate(minimums: Minimums, source=DatabaseRecordModel):
+    """
+    SQL condition for records below their family's minimum (or with an unparsable version):
+    one (engine_family = f AND (version_major, version_minor) < minimum) range per family,
+    each answered by ix_database_records_upgrade_key.
+    """
+    if not minimums:
+        return false()
+    return or_(*[
+        and_(
+            source.engine_family == family,
+            or_(
+                source.version_major.is_(None),
+                tuple_(source.version_major, source.version_minor) < tuple_(major, minor),
+            ),
+        )
+        for family, (major, minor) in sorted(minimums.items())
+    ])
+
+
+def requires_upgrade(minimums: Minimums, engine_family: str, version: Optional[str]) -> bool:
+    """Python form of upgrade_predicate, for an already normalized engine family."""
+    if engine_family not in minimums:
+        return False
+    major, minor = version_key(engine_family, version)
+    return major is None or (major, minor) < minimums[engine_family]
+
+
+# Columns of the cached policy rows (plain rows rather than ORM objects, as they outlive the session)
+POLICY_COLUMNS = ("id", "engine_family", "min_version", "min_major", "min_minor", "eol_date", "description")
+
+
+def _load_policies(db: Session) -> list:
+    return db.query(*[getattr(UpgradePolicyModel, name) for name in POLICY_COLUMNS]).order_by(
+        UpgradePolicyModel.engine_family, UpgradePolicyModel.min_major, UpgradePolicyModel.min_minor
+    ).all()
+
+
+_policies = GenerationCache(_load_policies)
+
+
+def _in_force(policy, today: date) -> bool:
+    return policy.eol_date is None or policy.eol_date <= today
+
+
+class UpgradePolicyStore:
+    """PostgreSQL-backed store for upgrade policies."""
+
+    def __init__(self, db: Session):
+        self.db = db
+
+    def policies(self) -> list:
+        """Every policy, by engine family and minimum version (cached until the next write)."""
+        return _policies.get(self.db)
+
+    def minimums(self, today: Optional[date] = None) -> Minimums:
+        """The highest minimum version per engine family among the policies in force today."""
+        today = today or date.today()
+        minimums: Minimums = {}
+        for policy in self.policies():
+            if _in_force(policy, today):
+                key = (policy.min_major, policy.min_minor)
+                minimums[policy.engine_family] = max(minimums.get(policy.engine_family, key), key)
+        return minimums
+
+    def list(self) -> List[UpgradePolicy]:
+        """List policies."""
+        today = date.today()
+        return [self._model_to_schema(policy, today) for policy in self.policies()]
+
+    def create(self, data: UpgradePolicyCreate) -> UpgradePolicy:
+        """Create a policy. Raises ValueError for an unknown family or an unparsable minimum version."""
+        policy = UpgradePolicyModel()
+        self._assign(policy, data)
+        self.db.add(policy)
+        bump_generation(self.db)
+        self.db.commit()
+        self.db.refresh(policy)
+        return self._model_to_schema(policy, date.today())
+
+    def update(self, policy_id: str, data: UpgradePolicyCreate) -> Optional[UpgradePolicy]:
+        """Replace a policy's fields; None if it does not exist."""
+        policy = self.db.query(UpgradePolicyModel).filter(UpgradePolicyModel.id == policy_id).first()
+        if not policy:
+            return None
+        self._assign(policy, data)
+        bump_generation(self.db)
+        self.db.commit()
+        self.db.refresh(policy)
+        return self._model_to_schema(policy, date.today())
+
+    def delete(self, policy_id: str) -> bool:
+        """Delete a policy."""
+        result = self.db.query(UpgradePolicyModel).filter(UpgradePolicyModel.id == policy_id).delete()
+        if result:
+            bump_generation(self.db)
+        self.db.commit()
+        return result > 0
+
+    def init_defaults(self) -> None:
+        """Seed DEFAULT_UPGRADE_POLICIES when there are no policies at all."""
+        if self.db.query(UpgradePolicyModel.id).first() is None:
+            for family, min_version, description in DEFAULT_UPGRADE_POLICIES:
+                policy = UpgradePolicyModel()
+                self._assign(
+                    policy, UpgradePolicyCreate(engine_family=family, min_version=min_version, description=description)
+                )
+                self.db.add(policy)
+            bump_generation(self.db)
+            self.db.commit()
+
+    def _assign(self, policy: UpgradePolicyModel, data: UpgradePolicyCreate) -> None:
+        family = data.engine_family.strip().lower()
+        if family not in ENGINE_FAMILIES:
+            raise ValueError(f"engine_family must be one of: {', '.join(ENGINE_FAMILIES)}")
+        major, minor = version_key(family, data.min_version)
+        if major is None:
+            raise ValueError(f"Cannot parse min_version {data.min_version!r} for {family}")
+        policy.engine_family = family
+        policy.min_version = data.min_version.strip()
+        policy.min_major = major
+        policy.min_minor = minor
+        policy.eol_date = data.eol_date
+        policy.description = data.description
+
+    def _model_to_schema(self, policy, today: date) -> UpgradePolicy:
+        return UpgradePolicy(
+            id=policy.id,
+            engine_family=policy.engine_family,
+            min_version=policy.min_version,
+            eol_date=policy.eol_date,
+            description=policy.description,
+            in_force=_in_force(policy, today),
+        )
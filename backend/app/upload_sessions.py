@@ -0,0 +1,172 @@
+"""Resumable chunked uploads spooled to local disk before import."""
+import hashlib
+import json
+import os
+import shutil
+import tempfile
+import time
+import uuid
+from typing import Any, Dict, List, Optional
+
+UPLOAD_SPOOL_DIR = os.getenv(
+    "UPLOAD_SPOOL_DIR",
+    os.path.join(tempfile.gettempdir(), "cloud-db-inventory-uploads"),
+)
+# Sessions untouched for this long are removed when new sessions are created
+UPLOAD_SESSION_TTL_SECONDS = int(os.getenv("UPLOAD_SESSION_TTL_SECONDS", str(24 * 3600)))
+MAX_CHUNK_BYTES = 64 * 1024 * 1024
+UPLOAD_KINDS = ("databases", "azure-vms", "ec2-instances")
+
+
+class UploadSessionStore:
+    """
+    File-backed upload sessions. Each session is a directory holding a manifest and one
+    file per chunk named by its byte offset, plus that chunk's SHA-256, so chunks can be
+    sent in any order, retried, and verified again when the upload is finalized.
+    """
+
+    def __init__(self, root: str = UPLOAD_SPOOL_DIR):
+        self.root = root
+
+    def _dir(self, upload_id: str) -> str:
+        # Ids are generated by create(); reject anything that could escape the spool directory
+        if not upload_id or os.path.basename(upload_id) != upload_id or upload_id.startswith("."):
+            raise KeyError(upload_id)
+        return os.path.join(self.root, upload_id)
+
+    def _manifest(self, upload_id: str) -> Dict[str, Any]:
+        path = os.path.join(self._dir(upload_id), "manifest.json")
+        if not os.path.exists(path):
+            raise KeyError(upload_id)
+        with open(path) as f:
+            return json.load(f)
+
+    def _chunks(self, upload_id: str) -> List[Dict[str, Any]]:
+        chunks = []
+        directory = self._dir(upload_id)
+        for name in os.listdir(directory):
+            if not name.endswith(".part"):
+                continue
+            offset = int(name[:-5])
+            with open(os.path.join(directory, f"{offset:016d}.sha256")) as f:
+                checksum = f.read().strip()
+            size = os.path.getsize(os.path.join(directory, name))
+            chunks.append({"offset": offset, "size": size, "sha256": checksum})
+        return sorted(chunks, key=lambda c: c["offset"])
+
+    def create(self, filename: str, total_size: int, kind: str = "databases") -> Dict[str, Any]:
+        """Start a new upload session."""
+        if kind not in UPLOAD_KINDS:
+            raise ValueError(f"kind must be one of: {', '.join(UPLOAD_KINDS)}")
+        if total_size <= 0:
+            raise ValueError("total_size must be positive")
+        self.purge_expired()
+        upload_id = uuid.uuid4().hex
+        directory = self._dir(upload_id)
+        os.makedirs(directory)
+        manifest = {
+            "upload_id": upload_id,
+            "filename": filename,
+            "kind": kind,
+            "total_size": total_size,
+            "created_at": time.time(),
+        }
+        with open(os.path.join(directory, "manifest.json"), "w") as f:
+            json.dump(manifest, f)
+        return self.status(upload_id)
+
+    def status(self, upload_id: str) -> Dict[str, Any]:
+        """Describe a session, including received chunks and the first missing byte offset."""
+        manifest = self._manifest(upload_id)
+        chunks = self._chunks(upload_id)
+        next_offset = 0
+        for chunk in chunks:
+            if chunk["offset"] != next_offset:
+                break
+            next_offset += chunk["size"]
+        received = sum(c["size"] for c in chunks)
+        return {
+            **manifest,
+            "received_bytes": received,
+            "next_offset": next_offset,
+            "complete": next_offset == manifest["total_size"],
+            "chunks": chunks,
+        }
+
+    def put_chunk(self, upload_id: str, offset: int, data: bytes, checksum: Optional[str] = None) -> Dict[str, Any]:
+        """
+        Store one chunk. Re-sending a chunk at the same offset replaces it, so retries are safe.
+        If checksum (hex SHA-256) is given it must match the received bytes.
+        """
+        manifest = self._manifest(upload_id)
+        if not data:
+            raise ValueError("Chunk is empty")
+        if len(data) > MAX_CHUNK_BYTES:
+            raise ValueError(f"Chunk exceeds {MAX_CHUNK_BYTES} bytes")
+        end = offset + len(data)
+        if offset < 0 or end > manifest["total_size"]:
+            raise ValueError(f"Chunk [{offset}, {end}) is outside the declared size {manifest['total_size']}")
+        digest = hashlib.sha256(data).hexdigest()
+        if checksum and checksum.lower() != digest:
+            raise ValueError(f"Checksum mismatch for chunk at offset {offset}")
+        for chunk in self._chunks(upload_id):
+            if chunk["offset"] != offset and chunk["offset"] < end and offset < chunk["offset"] + chunk["size"]:
+                raise ValueError(f"Chunk at offset {offset} overlaps chunk at offset {chunk['offset']}")
+
+        directory = self._dir(upload_id)
+        part_path = os.path.join(directory, f"{offset:016d}.part")
+        # Write the checksum first and the data last (atomically) so a listed part always has its checksum
+        with open(os.path.join(directory, f"{offset:016d}.sha256"), "w") as f:
+            f.write(digest)
+        tmp_path = part_path + ".tmp"
+        with open(tmp_path, "wb") as f:
+            f.write(data)
+        os.replace(tmp_path, part_path)
+        return {"upload_id": upload_id, "offset": offset, "size": len(data), "sha256": digest}
+
+    def assemble(self, upload_id: str) -> str:
+        """
+        Verify every chunk against its checksum, check they cover the file without gaps,
+        and concatenate them. Returns the path of the assembled file.
+        """
+        manifest = self._manifest(upload_id)
+        directory = self._dir(upload_id)
+        assembled_path = os.path.join(directory, "assembled")
+        expected = 0
+        with open(assembled_path, "wb") as out:
+            for chunk in self._chunks(upload_id):
+                if chunk["offset"] != expected:
+                    raise ValueError(f"Upload is incomplete: missing bytes starting at offset {expected}")
+                part_path = os.path.join(directory, f"{chunk['offset']:016d}.part")
+                digest = hashlib.sha256()
+                with open(part_path, "rb") as part:
+                    for block in iter(lambda: part.read(1024 * 1024), b""):
+                        digest.update(block)
+                        out.write(block)
+                if digest.hexdigest() != chunk["sha256"]:
+                    raise ValueError(f"Stored chunk at offset {chunk['offset']} is corrupt; re-send it")
+                expected += chunk["size"]
+        if expected != manifest["total_size"]:
+            raise ValueError(f"Upload is incomplete: missing bytes starting at offset {expected}")
+        return assembled_path
+
+    def delete(self, upload_id: str) -> bool:
+        directory = self._dir(upload_id)
+        if not os.path.isdir(directory):
+            return False
+        shutil.rmtree(directory, ignore_errors=True)
+        return True
+
+    def purge_expired(self) -> int:
+        """Remove sessions older than UPLOAD_SESSION_TTL_SECONDS."""
+        if not os.path.isdir(self.root):
+            os.makedirs(self.root, exist_ok=True)
+            return 0
+        cutoff = time.time() - UPLOAD_SESSION_TTL_SECONDS
+        removed = 0
+        for name in os.listdir(self.root):
+            path = os.path.join(self.root, name)
+            if os.path.isdir(path) and os.path.getmtime(path) < cutoff:
+                shutil.rmtree(path, ignore_errors=True)
+                removed += 1
+        return removed
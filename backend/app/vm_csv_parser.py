@@ -1,34 +1,69 @@
 """CSV parser for Azure VM data."""
 import csv
+import ipaddress
 from io import StringIO, BytesIO
 from datetime import datetime
-from typing import List, Tuple
+from typing import IO, Iterable, Iterator, List, Optional, Tuple, Union
 
 from .schemas import AzureVMCreate
 
 
-def parse_azure_vm_csv(file_content: bytes) -> Tuple[List[AzureVMCreate], List[dict]]:
+def parse_azure_vm_csv(file_content: Union[bytes, IO[str]]) -> Tuple[List[AzureVMCreate], List[dict]]:
     """Parse Azure VM CSV file.
-    
+
+    Accepts the raw bytes of the file or an already-decoded text stream
+    (e.g. compression.open_text), which is consumed row by row.
+
     Returns:
         Tuple of (parsed_records, skipped_records)
     """
     parsed_records = []
     skipped_records = []
+    for _, record, skip in iter_azure_vm_csv(file_content):
+        if record is not None:
+            parsed_records.append(record)
+        else:
+            skipped_records.append(skip)
+    return parsed_records, skipped_records
 
+
+def ip_address(value: Optional[str]) -> Optional[str]:
+    """
+    The address stored in azure_vms.private_ip (inet) for a private_ip_address value:
+    the first entry of a comma/semicolon separated list, or None when it is not an IP address.
+    """
+    first = (value or "").replace(";", ",").split(",")[0].strip()
     try:
-        text_content = file_content.decode('utf-8')
-    except UnicodeDecodeError:
-        text_content = file_content.decode('utf-8-sig')
+        return str(ipaddress.ip_address(first))
+    except ValueError:
+        return None
 
-    # Remove BOM if present
-    if text_content.startswith('\ufeff'):
-        text_content = text_content[1:]
 
-    reader = csv.DictReader(StringIO(text_content))
+def iter_azure_vm_csv(
+    file_content: Union[bytes, Iterable[str]],
+) -> Iterator[Tuple[int, Optional[AzureVMCreate], Optional[dict]]]:
+    """Streaming form of parse_azure_vm_csv.
+
+    Yields (row_number, record, None) for parsed rows and (row_number, None, skip_entry)
+    for rows that failed to parse.
+    """
+    if isinstance(file_content, bytes):
+        try:
+            text_content = file_content.decode('utf-8')
+        except UnicodeDecodeError:
+            text_content = file_content.decode('utf-8-sig')
+
+        # Remove BOM if present
+        if text_content.startswith('\ufeff'):
+            text_content = text_content[1:]
+
+        reader = csv.DictReader(StringIO(text_content))
+    else:
+        reader = csv.DictReader(file_content)
 
     if not reader.fieldnames:
-        return [], [{"error": "No headers found in CSV"}]
+        yield 1, None, {"error": "No headers found in CSV"}
+        return
 
     for row_num, row in enumerate(reader, start=2):
         try:
@@ -79,12 +114,12 @@ def parse_azure_vm_csv(file_content: bytes) -> Tuple[List[AzureVMCreate], List[d
                 time_created=time_created,
                 tenant_id=row.get("tenantId", "").strip() or None,
             )
-            parsed_records.append(record)
         except Exception as e:
-            skipped_records.append({
+            yield row_num, None, {
                 "row": row_num,
                 "error": str(e),
                 "data": dict(row)
-            })
+            }
+            continue
 
-    return parsed_records, skipped_records
+        yield row_num, record, None
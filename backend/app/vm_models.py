@@ -1,5 +1,6 @@
 """SQLAlchemy models for Azure VMs."""
-from sqlalchemy import Column, String, Integer, DateTime, Enum as SQLEnum
+from sqlalchemy import Column, String, Integer, DateTime, Enum as SQLEnum, Index
+from sqlalchemy.dialects.postgresql import INET
 import uuid
 from .database import Base
 
@@ -11,16 +12,23 @@ class AzureVMModel(Base):
     id = Column(String, primary_key=True, default=lambda: str(uuid.uuid4()))
     computer_name = Column(String, nullable=True)
     private_ip_address = Column(String, nullable=True)
-    subscription = Column(String, nullable=False)
+    subscription = Column(String, nullable=False, index=True)
     resource_group = Column(String, nullable=False)
-    location = Column(String, nullable=False)
-    vm_size = Column(String, nullable=False)
-    os_type = Column(String, nullable=False)
+    location = Column(String, nullable=False, index=True)
+    vm_size = Column(String, nullable=False, index=True)
+    os_type = Column(String, nullable=False, index=True)
     os_name = Column(String, nullable=True)
     os_version = Column(String, nullable=True)
     os_disk_size = Column(Integer, nullable=True)
     data_disk_count = Column(Integer, nullable=True)
-    total_disk_size_gb = Column(Integer, nullable=True)
-    display_status = Column(String, nullable=True)
-    time_created = Column(DateTime, nullable=True)
-    tenant_id = Column(String, nullable=True)
+    total_disk_size_gb = Column(Integer, nullable=True, index=True)
+    display_status = Column(String, nullable=True, index=True)
+    time_created = Column(DateTime, nullable=True, index=True)
+    tenant_id = Column(String, nullable=True, index=True)
+    # private_ip_address as an inet (vm_csv_parser.ip_address), for CIDR and range filters
+    private_ip = Column(INET, nullable=True)
+
+    __table_args__ = (
+        # inet_ops GiST serves containment (<<=) as well as range comparisons
+        Index("ix_azure_vms_private_ip", "private_ip", postgresql_using="gist", postgresql_ops={"private_ip": "inet_ops"}),
+    )
@@ -1,11 +1,60 @@
 """Store for Azure VM inventory."""
-from typing import List, Optional
+import ipaddress
+from datetime import timedelta
+from typing import Any, Dict, List, Optional, Sequence
 from sqlalchemy.orm import Session
-from sqlalchemy import or_, func, String
+from sqlalchemy import and_, cast, or_, func, tuple_, String
+from sqlalchemy.dialects.postgresql import INET
 
+from .distribution import largest, size_distribution
 from .schemas import AzureVM, AzureVMCreate, AzureVMFilters
+from .generation import GenerationCache, bump_generation
+from .read_model import read_model
+from .tenant_mapping import get_tenant_names_map
+from .vm_csv_parser import ip_address
 from .vm_models import AzureVMModel
 
+# AzureVM fields in response order, selected directly by list_rows
+VM_ROW_COLUMNS = tuple(AzureVM.model_fields)
+
+
+# Dimensions analytics() groups by, each a grouping set of the one aggregate query
+VM_ANALYTICS_DIMENSIONS = ("subscription", "location", "vm_size", "os_type", "display_status", "tenant_id")
+
+# Dimensions storage_distribution() can rank the largest VMs within
+VM_TOP_DIMENSIONS = ("subscription", "location", "vm_size", "os_type", "tenant_id")
+
+# Age buckets of time_created: (name, upper bound in days, or None for no bound)
+VM_AGE_BUCKETS = (("0-30d", 30), ("30-180d", 180), ("180d-1y", 365), ("1-3y", 3 * 365), ("3y+", None))
+
+
+def _load_filter_options(db: Session) -> dict:
+    """Distinct values of every filterable column, from one aggregate query."""
+    regions, subscriptions, tenants, statuses, os_types = db.query(
+        func.array_agg(AzureVMModel.location.distinct()),
+        func.array_agg(AzureVMModel.subscription.distinct()),
+        func.array_agg(AzureVMModel.tenant_id.distinct()),
+        func.array_agg(AzureVMModel.display_status.distinct()),
+        func.array_agg(AzureVMModel.os_type.distinct()),
+    ).one()
+    # array_agg over no rows is NULL
+    return {
+        "regions": sorted(v for v in regions or [] if v),
+        "subscriptions": sorted(v for v in subscriptions or [] if v),
+        "tenants": sorted(v for v in tenants or [] if v),
+        "statuses": sorted(v for v in statuses or [] if v),
+        "os_types": sorted(v for v in os_types or [] if v),
+    }
+
+
+_filter_options = GenerationCache(_load_filter_options)
+
+
+def _inet_key(address: str) -> tuple:
+    """Sort key ordering addresses as PostgreSQL orders inet host addresses (IPv4 before IPv6)."""
+    ip = ipaddress.ip_address(address)
+    return ip.version, int(ip)
+
 
 class AzureVMStore:
     """PostgreSQL-backed store for Azure VM inventory."""
@@ -15,15 +64,75 @@ class AzureVMStore:
 
     def list(self, filters: AzureVMFilters) -> List[AzureVM]:
         """List Azure VMs with optional filters."""
-        query = self.db.query(AzureVMModel)
+        vms = self._apply_filters(self.db.query(AzureVMModel), filters).all()
+        return [self._model_to_schema(vm) for vm in vms]
+
+    def list_rows(self, filters: AzureVMFilters) -> List[Dict[str, Any]]:
+        """Same result as list(), as plain dicts in AzureVM field order without ORM or Pydantic objects."""
+        snapshot = read_model.current(self.db)
+        if snapshot is not None:
+            rows = [dict(zip(VM_ROW_COLUMNS, vm)) for vm in snapshot.azure_vms.select(self._snapshot_mask(snapshot, filters))]
+            if not read_model.verify:
+                return rows
+
+        columns = [getattr(AzureVMModel, name) for name in VM_ROW_COLUMNS]
+        query = self._apply_filters(self.db.query(*columns), filters)
+        sql_rows = [dict(zip(VM_ROW_COLUMNS, vm)) for vm in query]
+        if snapshot is not None:
+            by_id = lambda row: row["id"]
+            read_model.compare("azure vm list", sorted(rows, key=by_id), sorted(sql_rows, key=by_id))
+        return sql_rows
 
+    def _snapshot_mask(self, snapshot, filters: AzureVMFilters):
+        """The read-model equivalent of _apply_filters: a row mask over snapshot.azure_vms."""
+        table = snapshot.azure_vms
+        mask = table.everything()
+        if filters.region:
+            region = filters.region.lower()
+            mask &= table.match("location", lambda v: v is not None and v.lower() == region)
+        if filters.subscription:
+            subscription = filters.subscription.lower()
+            mask &= table.match("subscription", lambda v: v is not None and subscription in v.lower())
+        if filters.tenant_id:
+            mask &= table.match("tenant_id", lambda v: v == filters.tenant_id)
+        if filters.status:
+            status = filters.status.lower()
+            mask &= table.match("display_status", lambda v: v is not None and v.lower() == status)
+        if filters.os_type:
+            os_type = filters.os_type.lower()
+            mask &= table.match("os_type", lambda v: v is not None and v.lower() == os_type)
+        if filters.search:
+            text = filters.search.lower()
+            contains = lambda v: v is not None and text in v.lower()
+            mask &= table.match("computer_name", contains) | table.match("resource_group", contains)
+        if filters.cidr or filters.ip_from or filters.ip_to:
+            network = ipaddress.ip_network(filters.cidr, strict=False) if filters.cidr else None
+            low = _inet_key(filters.ip_from) if filters.ip_from else None
+            high = _inet_key(filters.ip_to) if filters.ip_to else None
+
+            def in_range(value):
+                address = ip_address(value)
+                if address is None:
+                    return False
+                key = _inet_key(address)
+                return (
+                    (network is None or ipaddress.ip_address(address) in network)
+                    and (low is None or key >= low)
+                    and (high is None or key <= high)
+                )
+
+            mask &= table.match_rows("private_ip_address", in_range)
+        return mask
+
+    def _apply_filters(self, query, filters: AzureVMFilters):
+        """Apply AzureVMFilters to a query over AzureVMModel (or its columns)."""
         if filters.region:
             query = query.filter(
                 func.lower(AzureVMModel.location) == filters.region.lower()
             )
         if filters.subscription:
             query = query.filter(
-                func.lower(AzureVMModel.subscription).contains(filters.subscription.lower())
+                func.lower(AzureVMModel.subscription).contains(filters.subscription.lower(), autoescape=True)
             )
         if filters.tenant_id:
             query = query.filter(AzureVMModel.tenant_id == filters.tenant_id)
@@ -39,13 +148,112 @@ class AzureVMStore:
             text = filters.search.lower()
             query = query.filter(
                 or_(
-                    func.lower(AzureVMModel.computer_name).contains(text),
-                    func.lower(AzureVMModel.resource_group).contains(text),
+                    func.lower(AzureVMModel.computer_name).contains(text, autoescape=True),
+                    func.lower(AzureVMModel.resource_group).contains(text, autoescape=True),
                 )
             )
+        # Answered by the GiST index on private_ip
+        if filters.cidr:
+            query = query.filter(AzureVMModel.private_ip.op("<<=")(cast(filters.cidr, INET)))
+        if filters.ip_from:
+            query = query.filter(AzureVMModel.private_ip >= cast(filters.ip_from, INET))
+        if filters.ip_to:
+            query = query.filter(AzureVMModel.private_ip <= cast(filters.ip_to, INET))
+        return query
 
-        vms = query.all()
-        return [self._model_to_schema(vm) for vm in vms]
+    def storage_distribution(
+        self, filters: AzureVMFilters, top: int = 10, top_by: Optional[str] = None
+    ) -> Dict[str, Any]:
+        """
+        total_disk_size_gb histogram, percentiles and totals (one GROUPING SETS query) plus the
+        top largest VMs overall or within each top_by value (a second query).
+        """
+        if top_by is not None and top_by not in VM_TOP_DIMENSIONS:
+            raise ValueError(f"Unknown dimension: {top_by}")
+        apply = lambda query: self._apply_filters(query, filters)
+        size = AzureVMModel.total_disk_size_gb
+        columns = {
+            name: getattr(AzureVMModel, name)
+            for name in ("id", "computer_name", "subscription", "location", "vm_size", "os_type", "total_disk_size_gb")
+        }
+        result = size_distribution(self.db, apply, size)
+        ranked = largest(self.db, apply, columns, size, top, getattr(AzureVMModel, top_by) if top_by else None)
+        result.update(top_by=top_by, largest=ranked)
+        return result
+
+    def analytics(self, filters: AzureVMFilters, combine: Sequence[str] = ()) -> Dict[str, Any]:
+        """
+        VM count, disk GB and time_created age buckets per subscription, location, size, OS type,
+        status and tenant, plus the totals, from one GROUPING SETS query. combine names two or
+        more of those dimensions to also group by together (e.g. vm_size and os_type).
+        """
+        columns = [getattr(AzureVMModel, name) for name in VM_ANALYTICS_DIMENSIONS]
+        combine = [name for name in VM_ANALYTICS_DIMENSIONS if name in combine]
+        grouping_sets = [tuple_(column) for column in columns]
+        if len(combine) > 1:
+            grouping_sets.append(tuple_(*[getattr(AzureVMModel, name) for name in combine]))
+
+        # Bucket bounds, youngest first: created after now - upper, and at or before now - lower
+        now = func.now()
+        age_counts = []
+        lower = None
+        for _, upper in VM_AGE_BUCKETS:
+            conditions = []
+            if lower is not None:
+                conditions.append(AzureVMModel.time_created <= now - timedelta(days=lower))
+            if upper is not None:
+                conditions.append(AzureVMModel.time_created > now - timedelta(days=upper))
+            age_counts.append(func.count(AzureVMModel.id).filter(and_(*conditions)))
+            lower = upper
+        age_counts.append(func.count(AzureVMModel.id).filter(AzureVMModel.time_created.is_(None)))
+
+        query = self._apply_filters(
+            self.db.query(
+                *columns,
+                func.grouping(*columns),
+                func.count(AzureVMModel.id),
+                func.coalesce(func.sum(AzureVMModel.total_disk_size_gb), 0),
+                *age_counts,
+            ),
+            filters,
+        ).group_by(func.grouping_sets(*grouping_sets, tuple_()))
+
+        n = len(VM_ANALYTICS_DIMENSIONS)
+        everything = (1 << n) - 1
+        bucket_names = [name for name, _ in VM_AGE_BUCKETS] + ["unknown"]
+        result: Dict[str, Any] = {f"by_{name}": [] for name in VM_ANALYTICS_DIMENSIONS}
+        result["combined"] = []
+        result["total"] = {"count": 0, "disk_gb": 0, "age": dict.fromkeys(bucket_names, 0)}
+        for row in query:
+            values, grouped = row[:n], row[n]
+            metrics = {
+                "count": row[n + 1],
+                "disk_gb": int(row[n + 2]),
+                "age": dict(zip(bucket_names, row[n + 3:])),
+            }
+            if grouped == everything:
+                result["total"] = metrics
+                continue
+            # grouping() sets the bit of every column a row is not grouped by, first column highest
+            present = [k for k in range(n) if not grouped & (1 << (n - 1 - k))]
+            if len(present) > 1:
+                result["combined"].append({**{VM_ANALYTICS_DIMENSIONS[k]: values[k] for k in present}, **metrics})
+            else:
+                result[f"by_{VM_ANALYTICS_DIMENSIONS[present[0]]}"].append({"value": values[present[0]], **metrics})
+        # Largest first; ties in value order (missing values last)
+        for name in VM_ANALYTICS_DIMENSIONS:
+            result[f"by_{name}"].sort(key=lambda group: (-group["count"], group["value"] is None, group["value"] or ""))
+        result["combined"].sort(
+            key=lambda group: (-group["count"], [(group[name] is None, group[name] or "") for name in combine])
+        )
+
+        tenant_names = get_tenant_names_map(self.db)
+        result["tenant_names"] = {
+            group["value"]: tenant_names.get(group["value"], group["value"])
+            for group in result["by_tenant_id"]
+            if group["value"]
+        }
+        return result
 
     def get(self, vm_id: str) -> Optional[AzureVM]:
         """Get a specific VM by ID."""
@@ -58,16 +266,18 @@ class AzureVMStore:
 
     def create(self, data: AzureVMCreate) -> AzureVM:
         """Create a new VM record."""
-        vm = AzureVMModel(**data.model_dump())
+        vm = AzureVMModel(**data.model_dump(), private_ip=ip_address(data.private_ip_address))
         self.db.add(vm)
+        bump_generation(self.db)
         self.db.commit()
         self.db.refresh(vm)
         return self._model_to_schema(vm)
 
     def create_bulk(self, vms: List[AzureVMCreate]) -> int:
         """Bulk create VM records."""
-        vm_models = [AzureVMModel(**vm.model_dump()) for vm in vms]
+        vm_models = [AzureVMModel(**vm.model_dump(), private_ip=ip_address(vm.private_ip_address)) for vm in vms]
         self.db.add_all(vm_models)
+        bump_generation(self.db)
         self.db.commit()
         return len(vm_models)
 
@@ -76,30 +286,21 @@ class AzureVMStore:
         result = self.db.query(AzureVMModel).filter(
             AzureVMModel.id == vm_id
         ).delete()
+        if result:
+            bump_generation(self.db)
         self.db.commit()
         return result > 0
 
     def purge_all(self) -> int:
         """Delete all VM records."""
         count = self.db.query(AzureVMModel).delete()
+        bump_generation(self.db)
         self.db.commit()
         return count
 
     def get_filter_options(self) -> dict:
         """Get available filter options."""
-        regions = self.db.query(AzureVMModel.location).distinct().all()
-        subscriptions = self.db.query(AzureVMModel.subscription).distinct().all()
-        tenants = self.db.query(AzureVMModel.tenant_id).distinct().all()
-        statuses = self.db.query(AzureVMModel.display_status).distinct().all()
-        os_types = self.db.query(AzureVMModel.os_type).distinct().all()
-
-        return {
-            "regions": [r[0] for r in regions if r[0]],
-            "subscriptions": [s[0] for s in subscriptions if s[0]],
-            "tenants": [t[0] for t in tenants if t[0]],
-            "statuses": sorted([s[0] for s in statuses if s[0]]),
-            "os_types": sorted([o[0] for o in os_types if o[0]]),
-        }
+        return _filter_options.get(self.db)
 
     def _model_to_schema(self, vm: AzureVMModel) -> AzureVM:
         """Convert SQLAlchemy model to Pydantic schema."""
@@ -7,7 +7,64 @@ export const apiClient = axios.create({
     baseURL,
     timeout: 8000
 });
+// Files above this size are sent through the resumable chunked upload API
+const CHUNKED_UPLOAD_THRESHOLD = 8 * 1024 * 1024;
+const UPLOAD_CHUNK_SIZE = 4 * 1024 * 1024;
+const CHUNK_RETRIES = 3;
+const sha256Hex = async (data) => {
+    const digest = await crypto.subtle.digest("SHA-256", data);
+    return Array.from(new Uint8Array(digest))
+        .map((b) => b.toString(16).padStart(2, "0"))
+        .join("");
+};
+// Remember session ids per file so a reload or dropped connection resumes the same upload
+const uploadSessionKey = (file) => `upload-session:${file.name}:${file.size}:${file.lastModified}`;
+export const uploadCsvChunked = async (file, provider, sync = false, onProgress) => {
+    const key = uploadSessionKey(file);
+    let session = null;
+    const savedId = localStorage.getItem(key);
+    if (savedId) {
+        try {
+            session = (await apiClient.get(`/uploads/${savedId}`)).data;
+        }
+        catch {
+            localStorage.removeItem(key);
+        }
+    }
+    if (!session) {
+        session = (await apiClient.post("/uploads", { filename: file.name, total_size: file.size, kind: "databases" })).data;
+        localStorage.setItem(key, session.upload_id);
+    }
+    const received = new Set(session.chunks.map((c) => c.offset));
+    for (let offset = 0; offset < file.size; offset += UPLOAD_CHUNK_SIZE) {
+        if (!received.has(offset)) {
+            const chunk = await file.slice(offset, offset + UPLOAD_CHUNK_SIZE).arrayBuffer();
+            const checksum = await sha256Hex(chunk);
+            for (let attempt = 1;; attempt++) {
+                try {
+                    await apiClient.put(`/uploads/${session.upload_id}/chunks?offset=${offset}`, chunk, {
+                        headers: { "Content-Type": "application/octet-stream", "X-Chunk-SHA256": checksum },
+                        timeout: 60000,
+                    });
+                    break;
+                }
+                catch (err) {
+                    if (attempt >= CHUNK_RETRIES)
+                        throw err;
+                }
+            }
+        }
+        onProgress?.(Math.min(offset + UPLOAD_CHUNK_SIZE, file.size), file.size);
+    }
+    // Parsing and saving a large export can take minutes; don't apply the default timeout
+    const response = await apiClient.post(`/uploads/${session.upload_id}/finalize`, { provider, sync }, { timeout: 0 });
+    localStorage.removeItem(key);
+    return response.data;
+};
 export const importCsv = async (file, provider, sync = false) => {
+    if (file.size > CHUNKED_UPLOAD_THRESHOLD) {
+        return uploadCsvChunked(file, provider, sync);
+    }
     const formData = new FormData();
     formData.append("file", file);
     formData.append("provider", provider);
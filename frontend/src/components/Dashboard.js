@@ -1,8 +1,6 @@
 import { jsx as _jsx, jsxs as _jsxs } from "react/jsx-runtime";
 import { Alert, Box, Card, CardContent, Grid, Stack, Typography, Chip } from "@mui/material";
-import { useMetrics } from "../hooks/useMetrics";
-import { useInventory } from "../hooks/useInventory";
-import { useUpgrades } from "../hooks/useUpgrades";
+import { useDashboard } from "../hooks/useDashboard";
 import { PieChart } from "./charts/PieChart";
 import { BarChart } from "./charts/BarChart";
 import { DashboardFiltersBar } from "./DashboardFiltersBar";
@@ -27,9 +25,11 @@ export const Dashboard = () => {
         subscription: "",
         search: ""
     });
-    const { data, loading, error, refetch } = useMetrics(dashboardFilters);
-    const { stats } = useInventory(dashboardFilters);
-    const { data: upgradesData } = useUpgrades(dashboardFilters);
+    // Stats, metrics and upgrade counts come from one request computed in a single snapshot
+    const { data: dashboard, loading, error, refetch } = useDashboard(dashboardFilters);
+    const data = dashboard?.metrics;
+    const stats = dashboard?.stats;
+    const upgradesData = dashboard?.upgrades;
     const pieSlices = data
         ? [
             { label: "Postgres", value: data.rdbms_counts.postgres || 0, color: COLORS.postgres },
@@ -1,7 +1,5 @@
 import { Alert, Box, Card, CardContent, Divider, Grid, Stack, Typography, Chip } from "@mui/material";
-import { useMetrics } from "../hooks/useMetrics";
-import { useInventory } from "../hooks/useInventory";
-import { useUpgrades } from "../hooks/useUpgrades";
+import { useDashboard } from "../hooks/useDashboard";
 import { PieChart } from "./charts/PieChart";
 import { BarChart } from "./charts/BarChart";
 import { DashboardFiltersBar } from "./DashboardFiltersBar";
@@ -30,9 +28,11 @@ export const Dashboard = () => {
     search: ""
   });
 
-  const { data, loading, error, refetch } = useMetrics(dashboardFilters);
-  const { stats } = useInventory(dashboardFilters);
-  const { data: upgradesData } = useUpgrades(dashboardFilters);
+  // Stats, metrics and upgrade counts come from one request computed in a single snapshot
+  const { data: dashboard, loading, error, refetch } = useDashboard(dashboardFilters);
+  const data = dashboard?.metrics;
+  const stats = dashboard?.stats;
+  const upgradesData = dashboard?.upgrades;
 
   const pieSlices = data
     ? [
@@ -0,0 +1,68 @@
+import { useCallback, useEffect, useState } from "react";
+import { apiClient } from "../api/client";
+import { InventoryFilters, StatsSummary } from "../types";
+
+interface DashboardResponse {
+  stats: StatsSummary;
+  metrics: {
+    rdbms_counts: Record<string, number>;
+    rdbms_percentages: Record<string, number>;
+    version_counts: Record<string, Record<string, number>>;
+  };
+  upgrades: {
+    total: number;
+    by_engine: Record<string, number>;
+  };
+  pricing: {
+    total_hourly: number;
+    total_monthly: number;
+    count: number;
+  };
+}
+
+export const useDashboard = (filters?: InventoryFilters) => {
+  const [data, setData] = useState<DashboardResponse | null>(null);
+  const [loading, setLoading] = useState(true);
+  const [error, setError] = useState<string | null>(null);
+
+  const fetchDashboard = useCallback(async () => {
+    setLoading(true);
+    setError(null);
+    try {
+      const searchParams = new URLSearchParams();
+      if (filters?.provider) searchParams.append("provider", filters.provider);
+      // If excludeStopped is true and no specific status is selected, exclude stopped instances
+      if (filters?.excludeStopped && !filters?.status) {
+        searchParams.append("exclude_stopped", "true");
+      } else if (filters?.status) {
+        searchParams.append("status", filters.status);
+      }
+      if (filters?.region) searchParams.append("region", filters.region);
+      if (filters?.engine) searchParams.append("engine", filters.engine);
+      if (filters?.version) searchParams.append("version", filters.version);
+      if (filters?.subscription) searchParams.append("subscription", filters.subscription);
+      if (filters?.search) searchParams.append("search", filters.search);
+      const res = await apiClient.get(`/dashboard?${searchParams.toString()}`);
+      setData(res.data);
+    } catch {
+      setError("Failed to fetch dashboard");
+    } finally {
+      setLoading(false);
+    }
+  }, [
+    filters?.provider,
+    filters?.status,
+    filters?.region,
+    filters?.engine,
+    filters?.version,
+    filters?.subscription,
+    filters?.search,
+    filters?.excludeStopped
+  ]);
+
+  useEffect(() => {
+    fetchDashboard();
+  }, [fetchDashboard]);
+
+  return { data, loading, error, refetch: fetchDashboard };
+};